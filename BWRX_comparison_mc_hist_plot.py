@@ -1,35 +1,24 @@
-import numpy as np
 import matplotlib.pyplot as plt
-import seaborn as sns
-import os
-import pickle
+from kde_curves import draw_kde
+from report import build_report
 
 # Plotting config
-plt.rcParams.update({
+style = {
     "text.usetex": False,
     "font.family": "serif",
     "font.size": 18
-})
-
-# Load NOAK simulation results only
-with open("noak_simulation_results_nuclear_smr.pkl", "rb") as f:
-    noak_results = pickle.load(f)
-
+}
 
-def clean_and_quartiles(data):
-    data = np.array(data)
-    data = data[np.isfinite(data)]
-    if len(data) == 0:
-        return data, None, None, None
-    min_val = np.min(data)
-    p25 = np.percentile(data, 25)
-    median = np.percentile(data, 50)
-    p75 = np.percentile(data, 75)
-    max_val = np.max(data)
-    q1 = (min_val + p25) / 2
-    q2 = median
-    q3 = (p75 + max_val) / 2
-    return data, q1, q2, q3
+# NOAK and LCOE result sets, told apart by their key suffix
+result_names = {"noak": "noak_simulation_results_nuclear_smr", "lcoe": "lcoe_simulation_results_nuclear_smr"}
+result_sets = []
+quartile_sets = list(result_names.values())
+kde_sets = list(result_names.values())
+output_roots = {"noak": "hist_plots_smr_noak", "lcoe": "hist_plots_smr_lcoe"}
+axis_labels = {"noak": "NOAK OCC+GCC [$/kW]", "lcoe": "LCOE [$/MWh]"}
+summary_labels = {"noak": "OCC+GCC [$/kW]", "lcoe": "LCOE [$/MWh]"}
+text_offsets = {"noak": 300, "lcoe": 5}
+summary_xlims = {"noak": (0, 9000), "lcoe": (0, 150)}
 
 
 nuclear_materials = ["premium", "no_premium", "market_price"]
@@ -41,104 +30,32 @@ colors = {
 reactors = {"nuc": "esbwr", "smr": "bwrx"}
 
 
-for rdir in ["esbwr", "bwrx", "summary"]:
-    os.makedirs(f"hist_plots_smr_noak/{rdir}", exist_ok=True)
-
-# KDE plotting
-def plot_kde_results(year_label, learning_type, reactor_prefix, output_dir, result_set, y_label, suffix):
-    fig, axes = plt.subplots(1, 3, figsize=(8, 3))
-    for idx, mat in enumerate(nuclear_materials):
-        ax = axes[idx]
-        key = f"{reactor_prefix}_{suffix}_{learning_type}_{mat}"
-        data, _, q2, _ = clean_and_quartiles(result_set[year_label][key])
-        sns.kdeplot(data, ax=ax, color=colors[mat], fill=True)
-        ax.axvline(q2, color='red', linestyle='-', linewidth=2)
-        ax.text(q2 + 300, ax.get_ylim()[1] * 0.85, f"Q2:\n{q2:.0f}", color='red', fontsize=14)
-        ax.set_title(mat.replace("_", " ").title())
-        ax.set_xlabel(y_label)
-        if idx == 0:
-            ax.set_ylabel("Density")
-        else:
-            ax.set_yticklabels([])
-    plt.tight_layout()
-    plt.savefig(f"hist_plots_smr_noak/{output_dir}/{reactor_prefix}_{year_label.replace(' ', '_').lower()}_{learning_type}_{suffix}.pdf", format="pdf")
-    plt.close()
-
-
-for year in sorted(noak_results.keys(), key=lambda x: int(x.split()[-1])):
-    for prefix, folder in reactors.items():
-        plot_kde_results(year, "fixed", prefix, folder, noak_results, "NOAK OCC+GCC [$/kW]", "noak")
-        plot_kde_results(year, "dynamic", prefix, folder, noak_results, "NOAK OCC+GCC [$/kW]", "noak")
-
-# Summary grid
-def generate_summary_grid(results, prefix, label, ylabel, suffix):
-    years = ["Deployment 2035", "Deployment 2040", "Deployment 2045", "Deployment 2050"]
-    fig, axes = plt.subplots(len(years), 6, figsize=(18, 12), sharey=True)
-    for i, year in enumerate(years):
-        for j, (learning, offset) in enumerate(zip(["fixed", "dynamic"], [0, 3])):
-            for k, mat in enumerate(nuclear_materials):
-                ax = axes[i, offset + k]
-                key = f"{prefix}_{suffix}_{learning}_{mat}"
-                data, _, q2, _ = clean_and_quartiles(results[year][key])
-                sns.kdeplot(data, ax=ax, fill=True, color=colors[mat])
-                ax.axvline(q2, color='red', linestyle='-', linewidth=2)
-                ax.text(q2 + 300, ax.get_ylim()[1] * 0.8, f"Q2:\n{q2:.0f}", color='red', fontsize=18)
-                ax.set_xlim(0, 9000)
-                if i == len(years) - 1:
-                    ax.set_xlabel(label)
-                else:
-                    ax.set_xticklabels([])
-                if offset + k == 0:
-                    ax.set_ylabel(year.replace("Deployment ", ""))
-                else:
-                    ax.set_yticklabels([])
-                if i == 0:
-                    title = f"{mat.replace('_', ' ').title()}\n{'FLR' if learning == 'fixed' else 'OWLR'}"
-                    ax.set_title(title)
-    plt.tight_layout()
-    plt.savefig(f"hist_plots_smr_noak/summary/{prefix}_{suffix}_summary_grid.pdf", format="pdf")
-    plt.close()
-
-generate_summary_grid(noak_results, "nuc", "OCC+GCC [$/kW]", "OCC+GCC [$/kW]", "noak")
-generate_summary_grid(noak_results, "smr", "OCC+GCC [$/kW]", "OCC+GCC [$/kW]", "noak")
-
-print("NOAK-only plots generated successfully.")
-
-#LCOE plotting
-for rdir in ["esbwr", "bwrx", "summary"]:
-    os.makedirs(f"hist_plots_smr_lcoe/{rdir}", exist_ok=True)
-
-# --- Load LCOE simulation results ---
-with open("lcoe_simulation_results_nuclear_smr.pkl", "rb") as f:
-    lcoe_results = pickle.load(f)
 # KDE plot for each year and scenario
-def plot_kde_results(year_label, learning_type, reactor_prefix, output_dir, result_set, y_label, suffix):
+def plot_kde_results(datasets, year_label, learning_type, reactor_prefix, suffix):
+    curve_set = datasets["kde"][result_names[suffix]]
+    quartile_set = datasets["quartiles"][result_names[suffix]]
     fig, axes = plt.subplots(1, 3, figsize=(8, 3))
     for idx, mat in enumerate(nuclear_materials):
         ax = axes[idx]
         key = f"{reactor_prefix}_{suffix}_{learning_type}_{mat}"
-        data, _, q2, _ = clean_and_quartiles(result_set[year_label][key])
-        sns.kdeplot(data, ax=ax, color=colors[mat], fill=True)
+        _, q2, _ = quartile_set[year_label][key]
+        draw_kde(ax, curve_set[year_label][key], colors[mat])
         ax.axvline(q2, color='red', linestyle='-', linewidth=2)
-        ax.text(q2 + 5, ax.get_ylim()[1] * 0.85, f"Q2:\n{q2:.0f}", color='red', fontsize=14)
+        ax.text(q2 + text_offsets[suffix], ax.get_ylim()[1] * 0.85, f"Q2:\n{q2:.0f}", color='red', fontsize=14)
         ax.set_title(mat.replace("_", " ").title())
-        ax.set_xlabel(y_label)
+        ax.set_xlabel(axis_labels[suffix])
         if idx == 0:
             ax.set_ylabel("Density")
         else:
             ax.set_yticklabels([])
     plt.tight_layout()
-    plt.savefig(f"hist_plots_smr_lcoe/{output_dir}/{reactor_prefix}_{year_label.replace(' ', '_').lower()}_{learning_type}_{suffix}.pdf", format="pdf")
-    plt.close()
+    return fig
 
-# Run individual plots
-for year in sorted(lcoe_results.keys(), key=lambda x: int(x.split()[-1])):
-    for prefix, folder in reactors.items():
-        plot_kde_results(year, "fixed", prefix, folder, lcoe_results, "LCOE [$/MWh]", "lcoe")
-        plot_kde_results(year, "dynamic", prefix, folder, lcoe_results, "LCOE [$/MWh]", "lcoe")
 
 # Summary grid
-def generate_summary_grid(results, prefix, label, ylabel, suffix):
+def generate_summary_grid(datasets, prefix, suffix):
+    curves = datasets["kde"][result_names[suffix]]
+    quartiles = datasets["quartiles"][result_names[suffix]]
     years = ["Deployment 2035", "Deployment 2040", "Deployment 2045", "Deployment 2050"]
     fig, axes = plt.subplots(len(years), 6, figsize=(18, 12), sharey=True)
     for i, year in enumerate(years):
@@ -146,13 +63,13 @@ def generate_summary_grid(results, prefix, label, ylabel, suffix):
             for k, mat in enumerate(nuclear_materials):
                 ax = axes[i, offset + k]
                 key = f"{prefix}_{suffix}_{learning}_{mat}"
-                data, _, q2, _ = clean_and_quartiles(results[year][key])
-                sns.kdeplot(data, ax=ax, fill=True, color=colors[mat])
+                _, q2, _ = quartiles[year][key]
+                draw_kde(ax, curves[year][key], colors[mat])
                 ax.axvline(q2, color='red', linestyle='-', linewidth=2)
-                ax.text(q2 + 5, ax.get_ylim()[1] * 0.8, f"Q2:\n{q2:.0f}", color='red', fontsize=18)
-                ax.set_xlim(0, 150)
+                ax.text(q2 + text_offsets[suffix], ax.get_ylim()[1] * 0.8, f"Q2:\n{q2:.0f}", color='red', fontsize=18)
+                ax.set_xlim(*summary_xlims[suffix])
                 if i == len(years) - 1:
-                    ax.set_xlabel(label)
+                    ax.set_xlabel(summary_labels[suffix])
                 else:
                     ax.set_xticklabels([])
                 if offset + k == 0:
@@ -163,11 +80,27 @@ def generate_summary_grid(results, prefix, label, ylabel, suffix):
                     title = f"{mat.replace('_', ' ').title()}\n{'FLR' if learning == 'fixed' else 'OWLR'}"
                     ax.set_title(title)
     plt.tight_layout()
-    plt.savefig(f"hist_plots_smr_lcoe/summary/{prefix}_{suffix}_summary_grid.pdf", format="pdf")
-    plt.close()
-
-
-generate_summary_grid(lcoe_results, "nuc", "LCOE [$/MWh]", "LCOE [$/MWh]", "lcoe")
-generate_summary_grid(lcoe_results, "smr", "LCOE [$/MWh]", "LCOE [$/MWh]", "lcoe")
-
-print("LCOE plots generated and saved in hist_plots_smr_lcoe/")
\ No newline at end of file
+    return fig
+
+
+# --- Figures: (output path, figure function, arguments, savefig options) ---
+def figures(datasets):
+    specs = []
+    for suffix in ["noak", "lcoe"]:
+        root = output_roots[suffix]
+        quartiles = datasets["quartiles"][result_names[suffix]]
+        for year in sorted(quartiles.keys(), key=lambda x: int(x.split()[-1])):
+            for prefix, folder in reactors.items():
+                for learning_type in ["fixed", "dynamic"]:
+                    path = f"{root}/{folder}/{prefix}_{year.replace(' ', '_').lower()}_{learning_type}_{suffix}.pdf"
+                    specs.append((path, "plot_kde_results", (year, learning_type, prefix, suffix), {"format": "pdf"}))
+        for prefix in ["nuc", "smr"]:
+            specs.append((f"{root}/summary/{prefix}_{suffix}_summary_grid.pdf", "generate_summary_grid",
+                          (prefix, suffix), {"format": "pdf"}))
+    return specs
+
+
+if __name__ == "__main__":
+    build_report(["BWRX_comparison_mc_hist_plot"])
+    print("NOAK-only plots generated successfully.")
+    print("LCOE plots generated and saved in hist_plots_smr_lcoe/")
@@ -1,35 +1,19 @@
 import numpy as np
 import matplotlib.pyplot as plt
-import seaborn as sns
-import os
-import pickle
+from kde_curves import draw_kde
+from report import build_report
 
 
-plt.rcParams.update({
+style = {
     "text.usetex": False,
     "font.family": "serif",
     "font.size": 18
-})
-
-# Load LCOE results
-with open("lcoe_simulation_results_fixed_dynamic.pkl", "rb") as f:
-    lcoe_results = pickle.load(f)
-
+}
 
-def clean_and_quartiles(data):
-    data = np.array(data)
-    data = data[np.isfinite(data)]
-    if len(data) == 0:
-        return data, None, None, None
-    min_val = np.min(data)
-    p25 = np.percentile(data, 25)
-    median = np.percentile(data, 50)
-    p75 = np.percentile(data, 75)
-    max_val = np.max(data)
-    q1 = (min_val + p25) / 2
-    q2 = median
-    q3 = (p75 + max_val) / 2
-    return data, q1, q2, q3
+name = "lcoe_simulation_results_fixed_dynamic"
+result_sets = []
+quartile_sets = [name]
+kde_sets = [name]
 
 
 nuclear_materials = ["premium", "no_premium", "market_price"]
@@ -41,70 +25,64 @@ colors = {
 }
 
 output_dir = "hist_plots_lcoe"
-os.makedirs(output_dir, exist_ok=True)
 
 # --- Plotting KDE Histograms ---
-for year_label in sorted(lcoe_results.keys(), key=lambda x: int(x.split()[-1])):
-    for learning_type in ["fixed", "dynamic"]:
-        fig, axes = plt.subplots(2, 3, figsize=(14, 6))
-
-        for i, material in enumerate(nuclear_materials):
-            ax = axes[0, i]
-            data, q1, q2, q3 = clean_and_quartiles(lcoe_results[year_label][learning_type][material])
-            sns.kdeplot(data, ax=ax, fill=True, color=colors[material])
-            if q2:
-                ax.axvline(q2, color='red', linewidth=2)
-                ax.text(q2 + 0.3, ax.get_ylim()[1]*0.85, f"Q2:\n{q2:.1f} $/MWh", color='red', fontsize=12, ha='left')
-            ax.set_title(material.replace('_', ' ').title())
-            ax.set_xlabel("LCOE [$/MWh]")
-            if i == 0:
-                ax.set_ylabel("Density")
-            else:
-                ax.set_yticklabels([])
-                ax.set_ylabel("")
-            ax.grid(True, linestyle='--', alpha=0.5)
-
-        ax = axes[1, 1]
-        data, q1, q2, q3 = clean_and_quartiles(lcoe_results[year_label][learning_type]["wind"])
-        sns.kdeplot(data, ax=ax, fill=True, color=colors["wind"])
+def plot_lcoe_year(datasets, year_label, learning_type):
+    lcoe_curves, lcoe_quartiles = datasets["kde"][name], datasets["quartiles"][name]
+    fig, axes = plt.subplots(2, 3, figsize=(14, 6))
+
+    for i, material in enumerate(nuclear_materials):
+        ax = axes[0, i]
+        q1, q2, q3 = lcoe_quartiles[year_label][learning_type][material]
+        draw_kde(ax, lcoe_curves[year_label][learning_type][material], colors[material])
         if q2:
             ax.axvline(q2, color='red', linewidth=2)
             ax.text(q2 + 0.3, ax.get_ylim()[1]*0.85, f"Q2:\n{q2:.1f} $/MWh", color='red', fontsize=12, ha='left')
-        ax.set_title("Floating Offshore Wind")
+        ax.set_title(material.replace('_', ' ').title())
         ax.set_xlabel("LCOE [$/MWh]")
-        ax.set_ylabel("Density")
+        if i == 0:
+            ax.set_ylabel("Density")
+        else:
+            ax.set_yticklabels([])
+            ax.set_ylabel("")
         ax.grid(True, linestyle='--', alpha=0.5)
 
-        for j in range(3):
-            if j != 1:
-                axes[1, j].axis('off')
+    ax = axes[1, 1]
+    q1, q2, q3 = lcoe_quartiles[year_label][learning_type]["wind"]
+    draw_kde(ax, lcoe_curves[year_label][learning_type]["wind"], colors["wind"])
+    if q2:
+        ax.axvline(q2, color='red', linewidth=2)
+        ax.text(q2 + 0.3, ax.get_ylim()[1]*0.85, f"Q2:\n{q2:.1f} $/MWh", color='red', fontsize=12, ha='left')
+    ax.set_title("Floating Offshore Wind")
+    ax.set_xlabel("LCOE [$/MWh]")
+    ax.set_ylabel("Density")
+    ax.grid(True, linestyle='--', alpha=0.5)
+
+    for j in range(3):
+        if j != 1:
+            axes[1, j].axis('off')
 
-        plt.tight_layout()
-        filename = f"{output_dir}/lcoe_{year_label.replace(' ', '_').lower()}_{learning_type}.pdf"
-        plt.savefig(filename, format="pdf", bbox_inches="tight")
-        plt.close()
+    plt.tight_layout()
+    return fig
 
 # --- Summary KDE Grid for Nuclear ---
-def generate_lcoe_summary_nuclear():
-    years = sorted([y for y in lcoe_results.keys() if not y.endswith("2030")], key=lambda x: int(x.split()[-1]))
+def generate_lcoe_summary_nuclear(datasets):
+    lcoe_curves, lcoe_quartiles = datasets["kde"][name], datasets["quartiles"][name]
+    years = sorted([y for y in lcoe_quartiles.keys() if not y.endswith("2030")], key=lambda x: int(x.split()[-1]))
     materials = nuclear_materials
 
-    all_values = []
-    for year in years:
-        for learning in ["fixed", "dynamic"]:
-            for mat in materials:
-                all_values.extend(lcoe_results[year][learning][mat])
-    all_values = np.array(all_values)
-    xmin = np.floor(np.min(all_values) / 5) * 5
-    xmax = np.ceil(np.max(all_values) / 5) * 5
+    # Shared limits from the sample range kept with each curve
+    shown = [lcoe_curves[year][learning][mat] for year in years for learning in ["fixed", "dynamic"] for mat in materials]
+    xmin = np.floor(min(curve["min"] for curve in shown) / 5) * 5
+    xmax = np.ceil(max(curve["max"] for curve in shown) / 5) * 5
 
     fig, axes = plt.subplots(len(years), 6, figsize=(18, 12), sharey=True)
     for i, year in enumerate(years):
         for j, (learning, col_offset) in enumerate(zip(["fixed", "dynamic"], [0, 3])):
             for k, mat in enumerate(materials):
                 ax = axes[i, col_offset + k]
-                data, _, q2, _ = clean_and_quartiles(lcoe_results[year][learning][mat])
-                sns.kdeplot(data, ax=ax, fill=True, color=colors[mat])
+                _, q2, _ = lcoe_quartiles[year][learning][mat]
+                draw_kde(ax, lcoe_curves[year][learning][mat], colors[mat])
                 ax.axvline(q2, color='red', linestyle='-', linewidth=2)
                 ax.text(q2 + 10, ax.get_ylim()[1] * 0.8, f"Q2:\n{q2:.1f} ", color='red', fontsize=18)
                 ax.set_xlim(xmin, xmax)
@@ -125,30 +103,25 @@ def generate_lcoe_summary_nuclear():
                     ax.set_title("")
 
     plt.tight_layout()
-    os.makedirs("hist_plots_lcoe/summary", exist_ok=True)
-    plt.savefig("hist_plots_lcoe/summary/nuclear_kde_summary_grid.pdf", format="pdf", bbox_inches="tight")
-    plt.close()
+    return fig
 
 
 # --- Summary KDE Grid for Wind ---
-def generate_lcoe_summary_wind():
-    years = sorted([y for y in lcoe_results.keys()], key=lambda x: int(x.split()[-1]))
+def generate_lcoe_summary_wind(datasets):
+    lcoe_curves, lcoe_quartiles = datasets["kde"][name], datasets["quartiles"][name]
+    years = sorted([y for y in lcoe_quartiles.keys()], key=lambda x: int(x.split()[-1]))
 
-    all_data = []
-    for year in years:
-        for learning_type in ["fixed", "dynamic"]:
-            all_data.extend(lcoe_results[year][learning_type]["wind"])
-    all_data = np.array(all_data)
-    xmin = int(np.floor(np.min(all_data) / 5) * 5)
-    xmax = int(np.ceil(np.max(all_data) / 5) * 5)
+    shown = [lcoe_curves[year][learning_type]["wind"] for year in years for learning_type in ["fixed", "dynamic"]]
+    xmin = int(np.floor(min(curve["min"] for curve in shown) / 5) * 5)
+    xmax = int(np.ceil(max(curve["max"] for curve in shown) / 5) * 5)
 
     fig, axes = plt.subplots(len(years), 2, figsize=(10, len(years)*2), sharey=True)
 
     for i, year in enumerate(years):
         for j, learning_type in enumerate(["fixed", "dynamic"]):
             ax = axes[i, j]
-            data, _, q2, _ = clean_and_quartiles(lcoe_results[year][learning_type]["wind"])
-            sns.kdeplot(data, ax=ax, fill=True, color=colors["wind"])
+            _, q2, _ = lcoe_quartiles[year][learning_type]["wind"]
+            draw_kde(ax, lcoe_curves[year][learning_type]["wind"], colors["wind"])
             ax.axvline(q2, color='red', linestyle='-', linewidth=2)
             ax.text(q2 + 20, ax.get_ylim()[1] * 0.6, f"Q2:\n{q2:.1f}", color='red', fontsize=18)
 
@@ -170,21 +143,17 @@ def generate_lcoe_summary_wind():
                 ax.set_title(header)
 
     plt.tight_layout()
-    os.makedirs("hist_plots_lcoe/summary", exist_ok=True)
-    plt.savefig("hist_plots_lcoe/summary/wind_kde_summary_grid.pdf", format="pdf", bbox_inches="tight")
-    plt.close()
+    return fig
 
 
 # --- Generate Initial LCOE (2030) ---
-def plot_lcoe_initial_2030():
+def plot_lcoe_initial_2030(datasets):
+    lcoe_curves, lcoe_quartiles = datasets["kde"][name], datasets["quartiles"][name]
     year = "Deployment 2030"
-    data = lcoe_results[year]["fixed"]["premium"]
-    data = np.array(data)
-    data = data[np.isfinite(data)]
-    q2 = np.percentile(data, 50)
+    _, q2, _ = lcoe_quartiles[year]["fixed"]["premium"]
 
     fig, ax = plt.subplots(figsize=(6, 3))
-    sns.kdeplot(data, ax=ax, fill=True, color=colors["premium"])
+    draw_kde(ax, lcoe_curves[year]["fixed"]["premium"], colors["premium"])
     ax.axvline(q2, color='red', linestyle='-', linewidth=2)
     ax.text(q2 + 10, ax.get_ylim()[1] * 0.7, f"Q2:\n{q2:.1f} $/MWh", color='red', fontsize=12)
 
@@ -194,9 +163,22 @@ def plot_lcoe_initial_2030():
     ax.grid(True, linestyle='--', alpha=0.5)
 
     plt.tight_layout()
-    plt.savefig("hist_plots_lcoe/summary/initial_lcoe_2030_kde.pdf", format="pdf", bbox_inches="tight")
-    plt.close()
+    return fig
+
+
+# --- Figures: (output path, figure function, arguments, savefig options) ---
+def figures(datasets):
+    tight = {"format": "pdf", "bbox_inches": "tight"}
+    specs = []
+    for year_label in sorted(datasets["quartiles"][name].keys(), key=lambda x: int(x.split()[-1])):
+        for learning_type in ["fixed", "dynamic"]:
+            specs.append((f"{output_dir}/lcoe_{year_label.replace(' ', '_').lower()}_{learning_type}.pdf",
+                          "plot_lcoe_year", (year_label, learning_type), tight))
+    specs.append(("hist_plots_lcoe/summary/nuclear_kde_summary_grid.pdf", "generate_lcoe_summary_nuclear", (), tight))
+    specs.append(("hist_plots_lcoe/summary/wind_kde_summary_grid.pdf", "generate_lcoe_summary_wind", (), tight))
+    specs.append(("hist_plots_lcoe/summary/initial_lcoe_2030_kde.pdf", "plot_lcoe_initial_2030", (), tight))
+    return specs
+
 
-generate_lcoe_summary_nuclear()
-generate_lcoe_summary_wind()
-plot_lcoe_initial_2030()
+if __name__ == "__main__":
+    build_report(["LCOE_sim_NOAK_hist_plot"])
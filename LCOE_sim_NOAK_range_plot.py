@@ -1,56 +1,46 @@
 import numpy as np
 import matplotlib.pyplot as plt
-import pickle
-import os
+from report import build_report
 
-# --- Load results ---
-with open("lcoe_simulation_results_fixed_dynamic.pkl", "rb") as f:
-    lcoe_results = pickle.load(f)
+name = "lcoe_simulation_results_fixed_dynamic"
+result_sets = []
+quartile_sets = [name]
+kde_sets = []
 
 years = [2030, 2035, 2040, 2045, 2050]
 year_labels = [f"Deployment {y}" for y in years]
 colors = {"premium": "#4878A8", "no_premium": "#59935B", "market_price": "#FFA500", "wind": "#E75480"}
 
 
-plt.rcParams.update({
+style = {
     "font.size": 18
-})
+}
 
 
-def custom_quartiles(data):
-    data = np.array(data)
-    data = data[np.isfinite(data)]
-    if len(data) == 0:
-        return None, None, None
-    q1 = (np.min(data) + np.percentile(data, 25)) / 2
-    q2 = np.percentile(data, 50)
-    q3 = (np.percentile(data, 75) + np.max(data)) / 2
-    return q1, q2, q3
-
-
-def prepare_nuclear_wind(results, learning_type):
+def prepare_nuclear_wind(quartiles, learning_type):
     nuc_b, nuc_m, nuc_t = [], [], []
     wind_b, wind_m, wind_t = [], [], []
     for year in year_labels:
-        q1_n, q2_n, q3_n = custom_quartiles(results[year][learning_type]["premium"])
-        q1_w, q2_w, q3_w = custom_quartiles(results[year][learning_type]["wind"])
+        q1_n, q2_n, q3_n = quartiles[year][learning_type]["premium"]
+        q1_w, q2_w, q3_w = quartiles[year][learning_type]["wind"]
         nuc_b.append(q1_n); nuc_m.append(q2_n); nuc_t.append(q3_n)
         wind_b.append(q1_w); wind_m.append(q2_w); wind_t.append(q3_w)
     return (nuc_b, nuc_m, nuc_t), (wind_b, wind_m, wind_t)
 
-def prepare_nuclear_all_materials(results, learning_type):
+def prepare_nuclear_all_materials(quartiles, learning_type):
     scenarios = ["premium", "no_premium", "market_price"]
     data = {s: {"bottoms": [], "medians": [], "tops": []} for s in scenarios}
     for year in year_labels:
         for s in scenarios:
-            q1, q2, q3 = custom_quartiles(results[year][learning_type][s])
+            q1, q2, q3 = quartiles[year][learning_type][s]
             data[s]["bottoms"].append(q1)
             data[s]["medians"].append(q2)
             data[s]["tops"].append(q3)
     return data
 
 # --- Plot nuclear vs wind ---
-def plot_nuclear_vs_wind(nuc, wind, learning_type):
+def plot_nuclear_vs_wind(datasets, learning_type):
+    nuc, wind = prepare_nuclear_wind(datasets["quartiles"][name], learning_type)
     nuc_b, nuc_m, nuc_t = nuc
     wind_b, wind_m, wind_t = wind
     x_labels = [f"{y}\nNuclear" for y in years] + [f"{y}\nWind" for y in years]
@@ -82,13 +72,11 @@ def plot_nuclear_vs_wind(nuc, wind, learning_type):
     ax.set_ylim(0, max(tops) + 10)
 
     plt.tight_layout()
-    output_dir = f"range_plots_LCOE/bar_plots/{learning_type}"
-    os.makedirs(output_dir, exist_ok=True)
-    plt.savefig(f"{output_dir}/nuclear_wind_{learning_type}.pdf", format='pdf', bbox_inches='tight')
-    plt.close()
+    return fig
 
 # --- Plot all nuclear scenarios ---
-def plot_nuclear_all(data, learning_type):
+def plot_nuclear_all(datasets, learning_type):
+    data = prepare_nuclear_all_materials(datasets["quartiles"][name], learning_type)
     scenarios = ["premium", "no_premium", "market_price"]
     color_map = [colors[s] for s in scenarios for _ in years]
     markers = ['o', 'o', 'o']
@@ -133,20 +121,20 @@ def plot_nuclear_all(data, learning_type):
     ax.legend(handles=legend_elements, title="Material Scenario", fontsize=18)
 
     plt.tight_layout()
-    output_dir = f"range_plots_LCOE/bar_plots/{learning_type}"
-    os.makedirs(output_dir, exist_ok=True)
-    plt.savefig(f"{output_dir}/nuclear_all_materials_{learning_type}.pdf", format='pdf', bbox_inches='tight')
-    plt.close()
-
-# --- Run Plots ---
-nuc_fixed, wind_fixed = prepare_nuclear_wind(lcoe_results, "fixed")
-plot_nuclear_vs_wind(nuc_fixed, wind_fixed, "fixed")
-
-nuc_dyn, wind_dyn = prepare_nuclear_wind(lcoe_results, "dynamic")
-plot_nuclear_vs_wind(nuc_dyn, wind_dyn, "dynamic")
-
-nuc_fixed_all = prepare_nuclear_all_materials(lcoe_results, "fixed")
-plot_nuclear_all(nuc_fixed_all, "fixed")
-
-nuc_dyn_all = prepare_nuclear_all_materials(lcoe_results, "dynamic")
-plot_nuclear_all(nuc_dyn_all, "dynamic")
+    return fig
+
+# --- Figures: (output path, figure function, arguments, savefig options) ---
+def figures(datasets):
+    tight = {"format": "pdf", "bbox_inches": "tight"}
+    specs = []
+    for learning_type in ["fixed", "dynamic"]:
+        specs.append((f"range_plots_LCOE/bar_plots/{learning_type}/nuclear_wind_{learning_type}.pdf",
+                      "plot_nuclear_vs_wind", (learning_type,), tight))
+    for learning_type in ["fixed", "dynamic"]:
+        specs.append((f"range_plots_LCOE/bar_plots/{learning_type}/nuclear_all_materials_{learning_type}.pdf",
+                      "plot_nuclear_all", (learning_type,), tight))
+    return specs
+
+
+if __name__ == "__main__":
+    build_report(["LCOE_sim_NOAK_range_plot"])
@@ -1,177 +1,63 @@
-import numpy as np
-import pandas as pd
-import pickle
-from tqdm import tqdm
-from scipy.stats import beta
-from lowest_NOAK_comparison_plot import df_manual
-from atb_data import values_from_ATB2024
+import argparse
+from adaptive_runner import (adaptive_metadata, default_batch_size, default_max_simulations, run_adaptive,
+                             save_precision)
+from kde_curves import load_kde_curves
+from result_store import save_results, store_suffix
+from noak_engine import design_methods
+from parallel_runner import default_block_size, run_metadata, run_scenario, sampled_scenario
+from result_cache import cached_run_scenario
+from run_report import stage
+
+
+parser = argparse.ArgumentParser(description="NOAK OCC Monte Carlo with fixed and dynamic learning")
+parser.add_argument("--num-simulations", type=int, default=10000)
+parser.add_argument("--workers", type=int, default=1)
+parser.add_argument("--block-size", type=int, default=default_block_size)
+parser.add_argument("--no-cache", action="store_true", help="always re-run instead of reusing .mc_cache")
+parser.add_argument("--sampling", choices=["random"] + design_methods, default="random",
+                    help="input draws: pseudo-random, scrambled Sobol / Latin hypercube, or antithetic pairs "
+                         "(see qmc_convergence.py)")
+parser.add_argument("--common-draws", action="store_true",
+                    help="share the OCC, learning-rate and deployment draws with benchmark_sim.py --common-draws "
+                         "(same seed, block size and sample count), for paired comparisons (see paired_comparison.py)")
+parser.add_argument("--tolerance", type=float,
+                    help="adaptive mode: add batches until the standard error of every P25/P50/P75 is below "
+                         "this fraction of it (see adaptive_runner.py); --num-simulations is then ignored")
+parser.add_argument("--max-simulations", type=int, default=default_max_simulations, help="sample cap of the adaptive mode")
+parser.add_argument("--batch-size", type=int, default=default_batch_size, help="samples per adaptive batch")
+args = parser.parse_args()
+if args.tolerance is not None and (args.batch_size < 1 or args.max_simulations < args.batch_size):
+    parser.error("--max-simulations must be at least --batch-size, which must be positive")
+scenario = sampled_scenario("common" if args.common_draws else "noak", args.sampling)
 
-
-np.random.seed(42)
-num_simulations = 10000
 years = [2030, 2035, 2040, 2045, 2050]
 
-nuclear_df = df_manual[:-1]
-wind_df = df_manual[-1:]
-
-# --- Nuclear Material Costs ---
-median_mc_premium = np.median(nuclear_df["Material_cost_with_nuclear_premium"].dropna())
-std_mc_premium = np.std(nuclear_df["Material_cost_with_nuclear_premium"].dropna())
-
-median_mc_no_premium = np.median(nuclear_df["Material_cost_wo_nuclear_premium"])
-std_mc_no_premium = np.std(nuclear_df["Material_cost_wo_nuclear_premium"])
-
-median_mc_market_price = np.median(nuclear_df["Material_cost_market_price"].dropna())
-std_mc_market_price = np.std(nuclear_df["Material_cost_market_price"].dropna())
-
-# --- Wind Material Costs ---
-median_mc_wind = wind_df["Material_cost_market_price"].values[0]
-std_mc_wind = 0.35 * median_mc_wind
-
-# --- OCC Ranges ---
-nuclear_occ_range = list(values_from_ATB2024["OCC + GCC"][:3])
-wind_occ_range = list(values_from_ATB2024["OCC + GCC"][6:])
-
-def sample_lr_nuclear():
-    return np.random.triangular(0.05, 0.10, 0.15)
-
-def sample_lr_wind():
-    return np.random.beta(5, 10) * 0.3
-
-def compute_b(lr):
-    return np.log(1 - lr) / np.log(2)
-
-def sample_deployment_triangular(q3, q2, q1):
-    if np.isclose(q3, q1):
-        return q3
-    else:
-        return np.random.triangular(left=q3, mode=q2, right=q1)
-
-results = {f"Deployment {year}": {
-    "noak_fixed_premium": [],
-    "noak_dynamic_premium": [],
-    "noak_fixed_no_premium": [],
-    "noak_dynamic_no_premium": [],
-    "noak_fixed_market_price": [],
-    "noak_dynamic_market_price": [],
-    "noak_wind_fixed": [],
-    "noak_wind_dynamic": []
-} for year in years}
-
 # --- Run Monte Carlo Simulations ---
-for sim in tqdm(range(num_simulations), desc="Running simulations"):
-
-    # --- Sample Initial OCC ---
-    occ_initial_nuclear = np.random.triangular(min(nuclear_occ_range), nuclear_occ_range[1], max(nuclear_occ_range))
-    occ_initial_wind = np.random.triangular(min(wind_occ_range), wind_occ_range[1], max(wind_occ_range))
-
-    # --- Sample MICs ---
-    mic_premium = np.random.normal(median_mc_premium, std_mc_premium)
-    mic_no_premium = np.random.normal(median_mc_no_premium, std_mc_no_premium)
-    mic_market = np.random.normal(median_mc_market_price, std_mc_market_price)
-    mic_wind = np.random.normal(median_mc_wind, std_mc_wind)
-
-    # --- Sample Learning Rates ---
-    lr_nuclear = sample_lr_nuclear()
-    lr_wind = sample_lr_wind()
-    b_fixed_nuclear = compute_b(lr_nuclear)
-    b_fixed_wind = compute_b(lr_wind)
-
-    # --- Sample Deployments for this run ---
-    deployments_nuclear = {}
-    deployments_wind = {}
-    prev_deployment_nuclear = 1
-    prev_deployment_wind = 1
-
-    for year in years:
-        # Nuclear
-        nuclear_adv = values_from_ATB2024.loc[values_from_ATB2024["Category"] == "Nuclear-Adv", f"Deployment {year}"].values[0]
-        nuclear_mod = values_from_ATB2024.loc[values_from_ATB2024["Category"] == "Nuclear-Mod", f"Deployment {year}"].values[0]
-        nuclear_cons = values_from_ATB2024.loc[values_from_ATB2024["Category"] == "Nuclear-Cons", f"Deployment {year}"].values[0]
-
-        while True:
-            sampled = sample_deployment_triangular(nuclear_cons, nuclear_mod, nuclear_adv)
-            if sampled >= prev_deployment_nuclear:
-                deployments_nuclear[year] = sampled
-                prev_deployment_nuclear = sampled
-                break
-
-        # Wind
-        wind_adv = values_from_ATB2024.loc[values_from_ATB2024["Category"] == "FOW-Class11-Adv", f"Deployment {year}"].values[0]
-        wind_mod = values_from_ATB2024.loc[values_from_ATB2024["Category"] == "FOW_Class11-Mod", f"Deployment {year}"].values[0]
-        wind_cons = values_from_ATB2024.loc[values_from_ATB2024["Category"] == "FOW_Class11-Cons", f"Deployment {year}"].values[0]
-
-        while True:
-            sampled = sample_deployment_triangular(wind_cons, wind_mod, wind_adv)
-            if sampled >= prev_deployment_wind:
-                deployments_wind[year] = sampled
-                prev_deployment_wind = sampled
-                break
-
-    # --- Simulate Nuclear ---
-    for mic_name, mic_value in zip(
-        ["premium", "no_premium", "market_price"],
-        [mic_premium, mic_no_premium, mic_market]
-    ):
-        overhead_fixed = occ_initial_nuclear - mic_value
-        overhead_dynamic = occ_initial_nuclear - mic_value
-        occ_prev_fixed = occ_initial_nuclear
-        occ_prev_dynamic = occ_initial_nuclear
-        N_prev = 1
-
-        for year in years:
-            N_curr = deployments_nuclear[year]
-
-            # Fixed Learning
-            overhead_fixed_new = overhead_fixed * (N_curr / N_prev) ** b_fixed_nuclear
-            noak_fixed = mic_value + overhead_fixed_new
-            results[f"Deployment {year}"][f"noak_fixed_{mic_name}"].append(noak_fixed)
-
-            # Dynamic Learning
-            overhead_ratio = overhead_dynamic / occ_prev_dynamic
-            lr_dynamic = min(0.99, lr_nuclear * (1 + overhead_ratio))
-            b_dynamic = compute_b(lr_dynamic)
-            overhead_dynamic_new = overhead_dynamic * (N_curr / N_prev) ** b_dynamic
-            noak_dynamic = mic_value + overhead_dynamic_new
-            results[f"Deployment {year}"][f"noak_dynamic_{mic_name}"].append(noak_dynamic)
-
-            occ_prev_fixed = noak_fixed
-            occ_prev_dynamic = noak_dynamic
-            overhead_fixed = overhead_fixed_new
-            overhead_dynamic = overhead_dynamic_new
-            N_prev = N_curr
-
-    # --- Simulate Wind ---
-    overhead_fixed_wind = occ_initial_wind - mic_wind
-    overhead_dynamic_wind = occ_initial_wind - mic_wind
-    occ_prev_fixed_wind = occ_initial_wind
-    occ_prev_dynamic_wind = occ_initial_wind
-    N_prev = 1
-
-    for year in years:
-        N_curr = deployments_wind[year]
-
-        # Fixed Learning
-        overhead_fixed_new = overhead_fixed_wind * (N_curr / N_prev) ** b_fixed_wind
-        noak_fixed = mic_wind + overhead_fixed_new
-        results[f"Deployment {year}"]["noak_wind_fixed"].append(noak_fixed)
-
-        # Dynamic Learning
-        overhead_ratio_wind = overhead_dynamic_wind / occ_prev_dynamic_wind
-        lr_dynamic_wind = min(0.99, lr_wind * (1 + overhead_ratio_wind))
-        b_dynamic_wind = compute_b(lr_dynamic_wind)
-        overhead_dynamic_new = overhead_dynamic_wind * (N_curr / N_prev) ** b_dynamic_wind
-        noak_dynamic = mic_wind + overhead_dynamic_new
-        results[f"Deployment {year}"]["noak_wind_dynamic"].append(noak_dynamic)
-
-        occ_prev_fixed_wind = noak_fixed
-        occ_prev_dynamic_wind = noak_dynamic
-        overhead_fixed_wind = overhead_fixed_new
-        overhead_dynamic_wind = overhead_dynamic_new
-        N_prev = N_curr
-
-
-with open("noak_simulation_results_fixed_dynamic.pkl", "wb") as f:
-    pickle.dump(results, f)
+# All samples and MIC scenarios are advanced together along the year axis (see noak_engine.py);
+# blocks are seeded independently, so --workers does not change the results (see parallel_runner.py)
+# Stage timings, memory and counters go to run_reports/NOAK_mcsim_with_deployment.json (run_report.py)
+if args.tolerance is None:
+    run = run_scenario if args.no_cache else cached_run_scenario
+    with stage("simulate", samples=args.num_simulations):
+        results = run(scenario, args.num_simulations, seed=42, block_size=args.block_size, workers=args.workers)
+    metadata = run_metadata(scenario, args.num_simulations, 42, args.block_size)
+else:
+    # The sample count and precision reached go into the store metadata, precision.json and the run report
+    with stage("simulate") as record:
+        results, precision, summary = run_adaptive(scenario, args.tolerance, args.max_simulations, args.batch_size,
+                                                   seed=42, workers=args.workers)
+        record.update(samples=summary["num_simulations"], adaptive=summary)
+    metadata = adaptive_metadata(scenario, 42, summary)
+num_simulations = metadata["num_simulations"]
+
+
+name = "noak_simulation_results_fixed_dynamic"
+with stage("save", samples=num_simulations, outputs=[name + store_suffix]):
+    save_results(results[name], name, metadata)
+    if args.tolerance is not None:
+        save_precision(name, precision[name])
+# Density curves for the hist plots, evaluated once and kept in the store (see kde_curves.py)
+with stage("kde", samples=num_simulations):
+    load_kde_curves(name)
 
 print("Simulation completed and saved.")
@@ -1,35 +1,21 @@
 import numpy as np
 import matplotlib.pyplot as plt
-import seaborn as sns
-import os
-import pickle
+from kde_curves import draw_kde
 from atb_data import values_from_ATB2024
+from report import build_report
 
 
-plt.rcParams.update({
+style = {
     "text.usetex": False,
     "font.family": "serif",
     "font.size": 18
-})
-
-with open("noak_simulation_results_fixed_dynamic.pkl", "rb") as f:
-    results = pickle.load(f)
-
-
-def clean_and_quartiles(data):
-    data = np.array(data)
-    data = data[np.isfinite(data)]
-    if len(data) == 0:
-        return data, None, None, None
-    min_val = np.min(data)
-    p25 = np.percentile(data, 25)
-    median = np.percentile(data, 50)
-    p75 = np.percentile(data, 75)
-    max_val = np.max(data)
-    q1 = (min_val + p25) / 2
-    q2 = median
-    q3 = (p75 + max_val) / 2
-    return data, q1, q2, q3
+}
+
+name = "noak_simulation_results_fixed_dynamic"
+result_sets = []
+quartile_sets = [name]
+kde_sets = [name]
+
 
 nuclear_materials = ["premium", "no_premium", "market_price"]
 colors = {
@@ -40,12 +26,9 @@ colors = {
 }
 
 
-os.makedirs("hist_plots/nuclear", exist_ok=True)
-os.makedirs("hist_plots/wind", exist_ok=True)
-os.makedirs("hist_plots/summary", exist_ok=True)
-
 # --- Individual Nuclear KDE plots ---
-def plot_learning_type(results, year_label, learning_type):
+def plot_learning_type(datasets, year_label, learning_type):
+    curves, quartiles = datasets["kde"][name], datasets["quartiles"][name]
     fig, axes = plt.subplots(1, 3, figsize=(8, 3))
     materials = ["premium", "no_premium", "market_price"]
     titles = ["Premium", "Non Premium", "Market"]
@@ -53,8 +36,8 @@ def plot_learning_type(results, year_label, learning_type):
 
     for idx, (material, title, color) in enumerate(zip(materials, titles, colors_local)):
         ax = axes[idx]
-        data, q1, q2, q3 = clean_and_quartiles(results[year_label][f"noak_{learning_type}_{material}"])
-        sns.kdeplot(data, ax=ax, color=color, fill=True)
+        q1, q2, q3 = quartiles[year_label][f"noak_{learning_type}_{material}"]
+        draw_kde(ax, curves[year_label][f"noak_{learning_type}_{material}"], color)
         ax.axvline(q2, color='red', linestyle='solid', linewidth=2)
         ax.text(q2 + 300, ax.get_ylim()[1] * 0.85, f"Q2:\n{q2:.0f} $/kW", color='red', fontsize=14, ha='left')
         ax.set_title(f"{title}")
@@ -67,19 +50,19 @@ def plot_learning_type(results, year_label, learning_type):
         ax.grid(True, linestyle='--', alpha=0.5)
 
     plt.tight_layout(w_pad=0.5)
-    plt.savefig(f"hist_plots/nuclear/nuclear_{year_label.replace(' ', '_').lower()}_{learning_type}.pdf", format='pdf', bbox_inches='tight')
-    plt.close()
+    return fig
 
 # --- Individual Wind KDE plots ---
-def plot_wind_learning_type(results, learning_type):
-    years_sorted = sorted(results.keys(), key=lambda x: int(x.split()[-1]))
+def plot_wind_learning_type(datasets, learning_type):
+    curves, quartiles = datasets["kde"][name], datasets["quartiles"][name]
+    years_sorted = sorted(quartiles.keys(), key=lambda x: int(x.split()[-1]))
     fig, axes = plt.subplots(1, len(years_sorted), figsize=(12, 2.5), sharey=False)
     color = "#E75480"
 
     for idx, year in enumerate(years_sorted):
         ax = axes[idx]
-        data, q1, q2, q3 = clean_and_quartiles(results[year][f"noak_wind_{learning_type}"])
-        sns.kdeplot(data, ax=ax, color=color, fill=True)
+        q1, q2, q3 = quartiles[year][f"noak_wind_{learning_type}"]
+        draw_kde(ax, curves[year][f"noak_wind_{learning_type}"], color)
         ax.axvline(q2, color='red', linestyle='solid', linewidth=2)
         ax.text(q2 + 300, ax.get_ylim()[1] * 0.75, f"Q2:\n{q2:.0f} $/kW", color='red', fontsize=14, ha='left')
         ax.set_title(f"{year.split()[-1]}")
@@ -88,25 +71,24 @@ def plot_wind_learning_type(results, learning_type):
         ax.grid(True, linestyle='--', alpha=0.5)
 
     plt.tight_layout(w_pad=0.5)
-    plt.savefig(f"hist_plots/wind/wind_{learning_type}_learning.pdf", format="pdf", bbox_inches="tight")
-    plt.close()
+    return fig
 
 # --- OCC initial plot for 2030 ---
-def plot_occ_initial_2030(results):
+def plot_occ_initial_2030(datasets):
+    curves = datasets["kde"][name]
     material = "premium"
     color = "#4878A8"
     fig, ax = plt.subplots(1, 1, figsize=(6, 3))
 
-    data = np.array(results["Deployment 2030"][f"noak_fixed_{material}"])
-    data = data[np.isfinite(data)]
+    curve = curves["Deployment 2030"][f"noak_fixed_{material}"]
 
-    sns.kdeplot(data, ax=ax, fill=True, color=color)
+    draw_kde(ax, curve, color)
     q2 = values_from_ATB2024["OCC + GCC"][1]
     ax.axvline(q2, color='red', linestyle='-', linewidth=1)
     ax.text(q2 + 800, ax.get_ylim()[1] * 0.7, f"Q2:\n{q2:.0f} $/kW", color='red', fontsize=14)
 
-    xmin = int(np.floor(np.min(data) / 100.0)) * 100 - 300
-    xmax = int(np.ceil(np.max(data) / 100.0)) * 100 + 300
+    xmin = int(np.floor(curve["min"] / 100.0)) * 100 - 300
+    xmax = int(np.ceil(curve["max"] / 100.0)) * 100 + 300
     ax.set_xlim(xmin, xmax)
 
     ax.set_xlabel("NOAK OCC+GCC [$/kW]",fontsize=12)
@@ -115,21 +97,12 @@ def plot_occ_initial_2030(results):
     ax.grid(True, linestyle='--', alpha=0.5)
 
     plt.tight_layout()
-    plt.savefig("hist_plots/summary/initial_occ_2030_kde.pdf", format="pdf", bbox_inches="tight")
-    plt.close()
-
+    return fig
 
 
-for year in sorted(results.keys(), key=lambda x: int(x.split()[-1])):
-    plot_learning_type(results, year, "fixed")
-    plot_learning_type(results, year, "dynamic")
-
-plot_wind_learning_type(results, "fixed")
-plot_wind_learning_type(results, "dynamic")
-plot_occ_initial_2030(results)
-
 # --- Summary KDE Grid for Nuclear ---
-def generate_noak_summary_nuclear():
+def generate_noak_summary_nuclear(datasets):
+    curves, quartiles = datasets["kde"][name], datasets["quartiles"][name]
     years = ["Deployment 2035", "Deployment 2040", "Deployment 2045", "Deployment 2050"]
     materials = nuclear_materials
 
@@ -138,8 +111,8 @@ def generate_noak_summary_nuclear():
         for j, (learning, col_offset) in enumerate(zip(["fixed", "dynamic"], [0, 3])):
             for k, mat in enumerate(materials):
                 ax = axes[i, col_offset + k]
-                data, _, q2, _ = clean_and_quartiles(results[year][f"noak_{learning}_{mat}"])
-                sns.kdeplot(data, ax=ax, fill=True, color=colors[mat])
+                _, q2, _ = quartiles[year][f"noak_{learning}_{mat}"]
+                draw_kde(ax, curves[year][f"noak_{learning}_{mat}"], colors[mat])
                 ax.axvline(q2, color='red', linestyle='-', linewidth=2)
                 ax.text(q2 + 300, ax.get_ylim()[1] * 0.8, f"Q2:\n{q2:.0f}", color='red', fontsize=18)
                 ax.set_xlim(0, 9000)
@@ -158,11 +131,11 @@ def generate_noak_summary_nuclear():
                     ax.set_title("")
 
     plt.tight_layout()
-    plt.savefig(f"hist_plots/summary/nuclear_kde_summary_grid.pdf", format="pdf")
-    plt.close()
+    return fig
 
 # --- Summary KDE Grid for Wind ---
-def generate_noak_summary_wind():
+def generate_noak_summary_wind(datasets):
+    curves, quartiles = datasets["kde"][name], datasets["quartiles"][name]
     years = ["Deployment 2030", "Deployment 2035", "Deployment 2040", "Deployment 2045", "Deployment 2050"]
     learning_types = ["fixed", "dynamic"]
 
@@ -170,8 +143,8 @@ def generate_noak_summary_wind():
     for i, year in enumerate(years):
         for j, lt in enumerate(learning_types):
             ax = axes[i, j]
-            data, _, q2, _ = clean_and_quartiles(results[year][f"noak_wind_{lt}"])
-            sns.kdeplot(data, ax=ax, fill=True, color=colors["wind"])
+            _, q2, _ = quartiles[year][f"noak_wind_{lt}"]
+            draw_kde(ax, curves[year][f"noak_wind_{lt}"], colors["wind"])
             ax.axvline(q2, color='red', linestyle='-', linewidth=2)
             ax.text(q2 + 2000, ax.get_ylim()[1] * 0.5, f"Q2:\n{q2:.0f}", color='red', fontsize=18)
             ax.set_xlim(0, 15000)
@@ -190,9 +163,26 @@ def generate_noak_summary_wind():
                 ax.set_title(title)
 
     plt.tight_layout()
-    plt.savefig(f"hist_plots/summary/wind_kde_summary_grid.pdf", format="pdf", bbox_inches="tight")
-    plt.close()
-
-
-generate_noak_summary_nuclear()
-generate_noak_summary_wind()
+    return fig
+
+
+# --- Figures: (output path, figure function, arguments, savefig options) ---
+def figures(datasets):
+    tight = {"format": "pdf", "bbox_inches": "tight"}
+    specs = []
+    for year in sorted(datasets["quartiles"][name].keys(), key=lambda x: int(x.split()[-1])):
+        for learning_type in ["fixed", "dynamic"]:
+            specs.append((f"hist_plots/nuclear/nuclear_{year.replace(' ', '_').lower()}_{learning_type}.pdf",
+                          "plot_learning_type", (year, learning_type), tight))
+    for learning_type in ["fixed", "dynamic"]:
+        specs.append((f"hist_plots/wind/wind_{learning_type}_learning.pdf", "plot_wind_learning_type",
+                      (learning_type,), tight))
+    specs.append(("hist_plots/summary/initial_occ_2030_kde.pdf", "plot_occ_initial_2030", (), tight))
+    specs.append(("hist_plots/summary/nuclear_kde_summary_grid.pdf", "generate_noak_summary_nuclear", (),
+                  {"format": "pdf"}))
+    specs.append(("hist_plots/summary/wind_kde_summary_grid.pdf", "generate_noak_summary_wind", (), tight))
+    return specs
+
+
+if __name__ == "__main__":
+    build_report(["NOAK_mcsim_with_deployment_hist_plot"])
@@ -1,59 +1,39 @@
 import numpy as np
 import matplotlib.pyplot as plt
-import pickle
-import os
 from matplotlib.lines import Line2D
+from report import build_report
 
-with open("noak_simulation_results_fixed_dynamic.pkl", "rb") as f:
-    results = pickle.load(f)
+style = {}
+name = "noak_simulation_results_fixed_dynamic"
+result_sets = []
+quartile_sets = [name]
+kde_sets = []
 
-years = list(results.keys())
 
-
-def custom_quartiles(data):
-    data = np.array(data)
-    data = data[np.isfinite(data)]
-    if len(data) == 0:
-        return None, None, None
-    min_val = np.min(data)
-    p25 = np.percentile(data, 25)
-    median = np.percentile(data, 50)
-    p75 = np.percentile(data, 75)
-    max_val = np.max(data)
-    q1 = (min_val + p25) / 2
-    q2 = median
-    q3 = (p75 + max_val) / 2
-    return q1, q2, q3
-
-
-def prepare_data_nuclear_wind(results, learning_type):
+def prepare_data_nuclear_wind(quartiles, learning_type):
     nuclear_bottoms, nuclear_medians, nuclear_tops = [], [], []
     wind_bottoms, wind_medians, wind_tops = [], [], []
 
-    for year in years:
-        nuc_data = results[year][f"noak_{learning_type}_premium"]
-        wind_data = results[year][f"noak_wind_{learning_type}"]
-
-        q1, q2, q3 = custom_quartiles(nuc_data)
+    for year in quartiles:
+        q1, q2, q3 = quartiles[year][f"noak_{learning_type}_premium"]
         nuclear_bottoms.append(q1)
         nuclear_medians.append(q2)
         nuclear_tops.append(q3)
 
-        q1, q2, q3 = custom_quartiles(wind_data)
+        q1, q2, q3 = quartiles[year][f"noak_wind_{learning_type}"]
         wind_bottoms.append(q1)
         wind_medians.append(q2)
         wind_tops.append(q3)
 
     return nuclear_bottoms, nuclear_medians, nuclear_tops, wind_bottoms, wind_medians, wind_tops
 
-def prepare_data_nuclear_all_materials(results, learning_type):
+def prepare_data_nuclear_all_materials(quartiles, learning_type):
     scenarios = ["premium", "no_premium", "market_price"]
     data = {scenario: {"bottoms": [], "medians": [], "tops": []} for scenario in scenarios}
 
-    for year in years:
+    for year in quartiles:
         for scenario in scenarios:
-            nuc_data = results[year][f"noak_{learning_type}_{scenario}"]
-            q1, q2, q3 = custom_quartiles(nuc_data)
+            q1, q2, q3 = quartiles[year][f"noak_{learning_type}_{scenario}"]
             data[scenario]["bottoms"].append(q1)
             data[scenario]["medians"].append(q2)
             data[scenario]["tops"].append(q3)
@@ -61,12 +41,11 @@ def prepare_data_nuclear_all_materials(results, learning_type):
     return data
 
 # --- Bar Plot Functions ---
-def save_plot(fig, folder, filename):
-    os.makedirs(folder, exist_ok=True)
-    fig.savefig(os.path.join(folder, filename), format="pdf", bbox_inches="tight")
-    plt.close(fig)
-
-def plot_nuclear_wind(nuclear, wind, title, filename):
+def plot_nuclear_wind(datasets, learning_type):
+    quartiles = datasets["quartiles"][name]
+    years = list(quartiles.keys())
+    data = prepare_data_nuclear_wind(quartiles, learning_type)
+    nuclear, wind = data[:3], data[3:]
     nuc_bottoms, nuc_medians, nuc_tops = nuclear
     wind_bottoms, wind_medians, wind_tops = wind
 
@@ -110,10 +89,12 @@ def plot_nuclear_wind(nuclear, wind, title, filename):
     ax.legend(handles=custom_lines, fontsize=18, loc='upper left')
     ax.set_ylim(0, max(tops + medians) + 1000)
     plt.tight_layout(rect=[0, 0, 1, 0.95])
-    folder = f"bar_plots/{'fixed' if 'Fixed' in title else 'dynamic'}"
-    save_plot(fig, folder, filename)
+    return fig
 
-def plot_nuclear_all_materials(nuclear_data, title, filename):
+def plot_nuclear_all_materials(datasets, learning_type):
+    quartiles = datasets["quartiles"][name]
+    years = list(quartiles.keys())
+    nuclear_data = prepare_data_nuclear_all_materials(quartiles, learning_type)
     scenarios = ["premium", "no_premium", "market_price"]
     colors = ["#4878A8", "#59935B", "#FFA500"]
     labels = [f"{year.replace('Deployment ', '')}" for year in years]
@@ -157,20 +138,21 @@ def plot_nuclear_all_materials(nuclear_data, title, filename):
     ax.legend(handles=custom_lines,fontsize=18)
 
     plt.tight_layout(rect=[0, 0, 1, 0.95])
-    folder = f"bar_plots/{'fixed' if 'Fixed' in title else 'dynamic'}"
-    save_plot(fig, folder, filename)
-
+    return fig
 
-nuclear_fixed = prepare_data_nuclear_wind(results, "fixed")[:3]
-wind_fixed = prepare_data_nuclear_wind(results, "fixed")[3:]
-plot_nuclear_wind(nuclear_fixed, wind_fixed, "Fixed", "nuclear_wind_fixed.pdf")
 
-nuclear_dynamic = prepare_data_nuclear_wind(results, "dynamic")[:3]
-wind_dynamic = prepare_data_nuclear_wind(results, "dynamic")[3:]
-plot_nuclear_wind(nuclear_dynamic, wind_dynamic, "dynamic", "nuclear_wind_dynamic.pdf")
+# --- Figures: (output path, figure function, arguments, savefig options) ---
+def figures(datasets):
+    tight = {"format": "pdf", "bbox_inches": "tight"}
+    specs = []
+    for learning_type in ["fixed", "dynamic"]:
+        specs.append((f"bar_plots/{learning_type}/nuclear_wind_{learning_type}.pdf", "plot_nuclear_wind",
+                      (learning_type,), tight))
+    for learning_type in ["fixed", "dynamic"]:
+        specs.append((f"bar_plots/{learning_type}/nuclear_all_materials_{learning_type}.pdf",
+                      "plot_nuclear_all_materials", (learning_type,), tight))
+    return specs
 
-nuclear_fixed_all = prepare_data_nuclear_all_materials(results, "fixed")
-plot_nuclear_all_materials(nuclear_fixed_all, "Fixed", "nuclear_all_materials_fixed.pdf")
 
-nuclear_dynamic_all = prepare_data_nuclear_all_materials(results, "dynamic")
-plot_nuclear_all_materials(nuclear_dynamic_all, "dynamic", "nuclear_all_materials_dynamic.pdf")
+if __name__ == "__main__":
+    build_report(["NOAK_mcsim_with_deployment_range_plot"])
@@ -0,0 +1,194 @@
+import argparse
+import json
+import os
+import numpy as np
+from parallel_runner import (allocate_like, default_block_size, fill_chunk, iter_blocks, results_length,
+                             run_metadata, scenarios, slice_results)
+from result_store import flatten_results, save_results, store_suffix
+
+
+# --- Adaptive sample size ---
+# Samples are generated in batches (one block of the block-seeded runner each) until the standard
+# error of every P25/P50/P75 of every series is below `tolerance` times the percentile, or the cap
+# is reached. Block i's stream does not depend on the total count (parallel_runner.block_seeds),
+# so a run that stops at n samples is the same as a fixed run of n samples with block size
+# batch_size, and extend_run.py can grow it later.
+#
+# The precision is checked at min_batches batches and then each time the sample count has grown by
+# check_growth (rounded up to whole batches), and at the cap: the checks cost O(n) in total and a
+# run overshoots the batch it converged at by at most a quarter. The sample buffers double in size.
+# The standard errors come from one np.partition per series over the samples so far:
+# - P25/P50/P75: the order statistics one binomial standard deviation, sqrt(n p (1 - p)),
+#   either side of rank n p span two standard errors of the sample quantile (distribution-free);
+# - min/max: the mean spacing of the extreme_spacings order statistics next to them (a single
+#   spacing is an exponential-like draw and would make the stopping point jump);
+# - Q1 = (min + P25) / 2 and Q3 = (P75 + max) / 2 combine theirs as independent terms.
+# Only the percentiles decide when a run stops: the min/max spacings of unbounded inputs (the
+# normal MICs) do not shrink with n, so the Q1/Q3 errors are reported in precision.json but a
+# Q1/Q3 stopping rule would run every scenario to the cap.
+default_batch_size = default_block_size
+default_max_simulations = 1000000
+default_tolerance = 0.002  # noak stops at about 75k samples, nuclear_smr at about 120k
+min_batches = 2
+check_growth = 1.25
+extreme_spacings = 5
+percentile_levels = [0.25, 0.5, 0.75]
+precision_filename = "precision.json"
+
+
+def quantile_ranks(n, p):
+    # Ranks around n p used for the standard error, and the two np.percentile interpolates between
+    half_width = np.sqrt(n * p * (1 - p))
+    position = (n - 1) * p
+    return (max(int(np.floor(n * p - half_width)), 0), min(int(np.ceil(n * p + half_width)), n - 1),
+            int(np.floor(position)), int(np.ceil(position)), position - np.floor(position))
+
+
+def quartiles_with_errors(values):
+    # {"quartiles", "standard_errors", "percentiles", "percentile_errors"} of one series' finite samples
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    n = values.size
+    k = extreme_spacings
+    if n <= 2 * k:
+        return {"quartiles": (None, None, None), "standard_errors": (np.inf, np.inf, np.inf),
+                "percentiles": (None, None, None), "percentile_errors": (np.inf, np.inf, np.inf)}
+    ranks = {p: quantile_ranks(n, p) for p in percentile_levels}
+    kth = sorted({0, k, n - 1 - k, n - 1} | {rank for p in ranks for rank in ranks[p][:4]})
+    ordered = np.partition(values, kth)
+
+    quantile, error = {}, {}
+    for p, (low, high, below, above, fraction) in ranks.items():
+        quantile[p] = ordered[below] + fraction * (ordered[above] - ordered[below])
+        error[p] = (ordered[high] - ordered[low]) / 2
+    min_error, max_error = (ordered[k] - ordered[0]) / k, (ordered[n - 1] - ordered[n - 1 - k]) / k
+
+    quartiles = ((ordered[0] + quantile[0.25]) / 2, quantile[0.5], (quantile[0.75] + ordered[n - 1]) / 2)
+    errors = (np.hypot(min_error, error[0.25]) / 2, error[0.5], np.hypot(error[0.75], max_error) / 2)
+    return {"quartiles": tuple(float(q) for q in quartiles), "standard_errors": tuple(float(e) for e in errors),
+            "percentiles": tuple(float(quantile[p]) for p in percentile_levels),
+            "percentile_errors": tuple(float(error[p]) for p in percentile_levels)}
+
+
+def relative_errors(values, errors):
+    return [error / abs(value) if value else np.inf for value, error in zip(values, errors)]
+
+
+def result_precision(results):
+    # [(path, entry)] for every series; "relative_errors" are the Q1/Q2/Q3 ones (reported only),
+    # "percentile_relative_errors" the P25/P50/P75 ones the stopping rule uses
+    precision = []
+    for path, values in flatten_results(results):
+        entry = quartiles_with_errors(values)
+        entry["relative_errors"] = relative_errors(entry["quartiles"], entry["standard_errors"])
+        entry["percentile_relative_errors"] = relative_errors(entry["percentiles"], entry["percentile_errors"])
+        precision.append((path, entry))
+    return precision
+
+
+def worst_relative_error(precision, key="percentile_relative_errors"):
+    return max(max(entry[key]) for series in precision.values() for _, entry in series)
+
+
+def check_points(max_simulations, batch_size):
+    # Sample counts the precision is checked at: min_batches batches, growing by check_growth, and the cap
+    points = []
+    n = min_batches * batch_size
+    while n < max_simulations:
+        points.append(n)
+        n = max(n + batch_size, int(np.ceil(n * check_growth / batch_size)) * batch_size)
+    return points + [max_simulations]
+
+
+def grow_like(results, capacity):
+    # The buffers of results with room for capacity samples, the filled part copied over
+    grown = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            grown[key] = grow_like(value, capacity)
+        else:
+            grown[key] = np.empty(capacity)
+            grown[key][:len(value)] = value
+    return grown
+
+
+def run_adaptive(scenario, tolerance=default_tolerance, max_simulations=default_max_simulations,
+                 batch_size=default_batch_size, seed=42, workers=1):
+    # Returns (results cut to the samples used, {result set: precision}, summary)
+    if batch_size < 1 or max_simulations < batch_size:
+        raise ValueError(f"max_simulations ({max_simulations}) must be at least batch_size ({batch_size}), "
+                         "which must be positive")
+    points = set(check_points(max_simulations, batch_size))
+    results = None
+    history = []
+    for start, stop, block in iter_blocks(scenario, max_simulations, seed, batch_size, workers):
+        if results is None:
+            results = allocate_like(block, min(min_batches * batch_size, max_simulations))
+        elif stop > results_length(results):
+            results = grow_like(results, min(max(2 * results_length(results), stop), max_simulations))
+        fill_chunk(results, block, start, stop)
+        if stop not in points:
+            continue
+        precision = {name: result_precision(slice_results(result_set, 0, stop)) for name, result_set in results.items()}
+        worst = worst_relative_error(precision)
+        history.append((stop, worst))
+        print(f"{stop:9d} samples: largest relative standard error of P25/P50/P75 {worst:.4%} "
+              f"(Q1/Q3 {worst_relative_error(precision, 'relative_errors'):.4%})")
+        if worst <= tolerance:
+            break
+
+    num_simulations, worst = history[-1]
+    summary = {
+        "tolerance": tolerance,
+        "max_simulations": max_simulations,
+        "batch_size": batch_size,
+        "num_simulations": num_simulations,
+        "converged": worst <= tolerance,
+        "max_relative_standard_error": worst,
+        "max_quartile_relative_standard_error": worst_relative_error(precision, "relative_errors"),
+        "history": history,
+    }
+    return {name: slice_results(result_set, 0, num_simulations) for name, result_set in results.items()}, precision, summary
+
+
+def adaptive_metadata(scenario, seed, summary):
+    # Run metadata of the stores, with the achieved precision (the history stays in the report)
+    adaptive = {key: value for key, value in summary.items() if key != "history"}
+    return run_metadata(scenario, summary["num_simulations"], seed, summary["batch_size"], adaptive=adaptive)
+
+
+def save_precision(name, precision):
+    # Per-series quartiles and standard errors, next to quartiles.json in the store
+    precision_path = os.path.join(name + store_suffix, precision_filename)
+    with open(precision_path + ".tmp", "w") as f:
+        json.dump({"series": [{"path": list(path), **entry} for path, entry in precision]}, f, indent=1)
+    os.replace(precision_path + ".tmp", precision_path)
+
+
+def save_adaptive_run(results, precision, scenario, seed, summary, names=None):
+    metadata = adaptive_metadata(scenario, seed, summary)
+    for name in names or results:
+        save_results(results[name], name, metadata)
+        save_precision(name, precision[name])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a scenario until its quartiles reach a standard error tolerance")
+    parser.add_argument("scenario", choices=sorted(scenarios))
+    parser.add_argument("--tolerance", type=float, default=default_tolerance,
+                        help="largest standard error of any P25/P50/P75, as a fraction of the percentile")
+    parser.add_argument("--max-simulations", type=int, default=default_max_simulations)
+    parser.add_argument("--batch-size", type=int, default=default_batch_size)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    if args.batch_size < 1 or args.max_simulations < args.batch_size:
+        parser.error("--max-simulations must be at least --batch-size, which must be positive")
+
+    results, precision, summary = run_adaptive(args.scenario, args.tolerance, args.max_simulations, args.batch_size,
+                                               args.seed, args.workers)
+    save_adaptive_run(results, precision, args.scenario, args.seed, summary)
+    status = "converged" if summary["converged"] else "stopped at the cap"
+    print(f"{status} after {summary['num_simulations']} samples "
+          f"(largest relative standard error of P25/P50/P75 {summary['max_relative_standard_error']:.4%}, "
+          f"of Q1/Q3 {summary['max_quartile_relative_standard_error']:.4%})")
@@ -1,6 +1,8 @@
-import pandas as pd
+import numpy as np
 
-values_from_ATB2024 = pd.DataFrame({
+# ATB 2024 inputs as plain columns; the pandas view values_from_ATB2024 is only built when a
+# script asks for it (see __getattr__ below), so the simulation engines never import pandas.
+atb_table = {
     "Category": ["Nuclear-Adv", "Nuclear-Mod", "Nuclear-Cons", "SMR-Adv", "SMR-Mod", "SMR-Cons", "FOW-Class11-Adv", "FOW_Class11-Mod", "FOW_Class11-Cons"],
     "Deployment 2030": [1, 1, 1, 3, 3, 1, 6.4, 4, 1.6],
     "Deployment 2035": [14, 3, 1, 42, 9, 1, 32, 20, 8],
@@ -19,4 +21,69 @@ values_from_ATB2024 = pd.DataFrame({
     "Fuel" : [9.8, 10.9, 12, 10.9, 12, 13.08, 0,0,0],
     "CF" : [0.93, 0.93, 0.93, 0.93, 0.93, 0.93, 0.5, 0.48, 0.46],
     "learning_rate" : [0.08, 0.08, 0.08, 0.095, 0.095, 0.095, 0.142, 0.115, 0.087],
-})
+}
+
+
+# --- Compiled parameter index ---
+# values[technology, scenario, field, year] as a read-only float array, built once at import.
+# Technologies and scenarios come from the "Category" names ("<technology>-<Adv|Mod|Cons>"),
+# so a new category only needs new rows above. Year-independent fields repeat along the year axis.
+atb_scenarios = ("Adv", "Mod", "Cons")
+
+
+def split_category(category):
+    technology, scenario = category.rsplit("-", 1)
+    return technology.replace("_", "-"), scenario
+
+
+class ATBIndex:
+    def __init__(self, table):
+        deployment_columns = [c for c in table if c.startswith("Deployment ")]
+        static_fields = [c for c in table if c != "Category" and c not in deployment_columns]
+        keys = [split_category(c) for c in table["Category"]]
+
+        self.years = tuple(int(c.split()[-1]) for c in deployment_columns)
+        self.fields = ("Deployment",) + tuple(static_fields)
+        self.technologies = tuple(dict.fromkeys(technology for technology, _ in keys))
+        self._technology = {t: i for i, t in enumerate(self.technologies)}
+        self._scenario = {s: i for i, s in enumerate(atb_scenarios)}
+        self._field = {f: i for i, f in enumerate(self.fields)}
+        self._year = {y: i for i, y in enumerate(self.years)}
+
+        values = np.full((len(self.technologies), len(atb_scenarios), len(self.fields), len(self.years)), np.nan)
+        deployments = np.array([table[c] for c in deployment_columns], dtype=float).T
+        statics = np.array([table[c] for c in static_fields], dtype=float).T
+        for row, (technology, scenario) in enumerate(keys):
+            t, s = self._technology[technology], self._scenario[scenario]
+            values[t, s, 0, :] = deployments[row]
+            values[t, s, 1:, :] = statics[row][:, None]
+        values.flags.writeable = False
+        self.values = values
+
+    def get(self, technology, field, scenario=None, year=None):
+        # scenario=None -> (Adv, Mod, Cons) axis; year=None -> year axis for "Deployment" only
+        s = slice(None) if scenario is None else self._scenario[scenario]
+        if year is not None:
+            y = self._year[int(year)]
+        elif field == "Deployment":
+            y = slice(None)
+        else:
+            y = 0
+        return self.values[self._technology[technology], s, self._field[field], y]
+
+    def deployment_quantiles(self, technology, years=None):
+        # (n_years, 3) rows of (Cons, Mod, Adv): left, mode and right of the deployment triangle
+        columns = [self._year[int(y)] for y in (self.years if years is None else years)]
+        return self.values[self._technology[technology], ::-1, 0, :][:, columns].T
+
+
+atb_index = ATBIndex(atb_table)
+
+
+def __getattr__(name):
+    if name == "values_from_ATB2024":
+        import pandas as pd
+
+        globals()[name] = pd.DataFrame(atb_table)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
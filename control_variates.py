@@ -0,0 +1,149 @@
+import argparse
+import json
+import numpy as np
+from deployment_sampler import trajectory_marginals
+from lcoe_engine import build_lcoe_parameters
+from noak_engine import build_noak_parameters, compute_b, design_methods, lr_nuclear_ppf, lr_wind_ppf, years
+from paired_comparison import benchmark_name, default_num_simulations, noak_name, run_common, shared_draws
+from parallel_runner import default_block_size, run_lcoe_on_noak
+from result_store import flatten_results, has_results, load_results, read_run_metadata
+
+
+# --- Control variates ---
+# The classical learning curve C = occ * N^b (benchmark.apply_learning) of a sample moves with its
+# FLR/OWLR NOAK cost and with the LCOE priced on it, and unlike them its expectation is known:
+# occ, the learning rate and the deployment are independent, so E[C] is the mean of the OCC
+# triangle times E[N^b] over the learning rate and the year's deployment marginal
+# (deployment_sampler.trajectory_marginals). A "common" run (parallel_runner.common_block) has C
+# of every sample in its benchmark results. The regression weights
+#   w_i = 1/n + (E[C] - mean(C)) (C_i - mean(C)) / sum_j (C_j - mean(C))^2
+# sum to one and give back E[C] exactly; the weighted mean and the quantiles of the weighted CDF
+# are the control-variate estimates. The variance reduction factor of a statistic is
+# 1 / (1 - rho^2), rho the correlation of C with the series (mean) or with the indicator
+# 1{Y <= quantile} (quantiles); the sample min/max of Q1/Q3 are not changed by the weights.
+lr_points = 1024
+percentiles = [25, 50, 75]
+lr_ppfs = {"nuclear": lr_nuclear_ppf, "wind": lr_wind_ppf}
+benchmark_series = {"nuclear": "noak_nuclear", "wind": "noak_wind"}
+lcoe_name = "lcoe_simulation_results_fixed_dynamic"
+
+
+def benchmark_expectations(params):
+    # {(technology, year): E[occ * N^b]} for the NOAK parameters
+    u = (np.arange(lr_points) + 0.5) / lr_points
+    expectations = {}
+    for tech, lr_ppf in lr_ppfs.items():
+        mean_occ = sum(params[f"occ_range_{tech}"]) / 3
+        b = compute_b(lr_ppf(u))
+        marginals = trajectory_marginals(params[f"deployment_{tech}"])
+        for j, year in enumerate(years):
+            expectations[tech, year] = mean_occ * float(np.mean(marginals[j][:, None] ** b))
+    return expectations
+
+
+def control_weights(control, expectation):
+    deviation = control - control.mean()
+    return 1 / len(control) + (expectation - control.mean()) * deviation / (deviation @ deviation)
+
+
+def weighted_percentiles(values, weights, percentiles):
+    # Inverse of the weighted step CDF; negative weights can make it dip, so it is made monotone
+    order = np.argsort(values)
+    cumulative = np.maximum.accumulate(np.cumsum(weights[order]))
+    ranks = np.minimum(np.searchsorted(cumulative, np.asarray(percentiles) / 100), len(values) - 1)
+    return values[order][ranks]
+
+
+def variance_reduction(target, control):
+    # None where the control explains the series completely (e.g. N = 1, where FLR NOAK is occ)
+    if np.std(target) == 0:
+        return None
+    rho = np.corrcoef(target, control)[0, 1]
+    return float(1 / (1 - rho ** 2)) if rho ** 2 < 1 - 1e-12 else None
+
+
+def control_variate_estimates(values, control, expectation):
+    values, control = np.asarray(values, dtype=float), np.asarray(control, dtype=float)
+    keep = np.isfinite(values) & np.isfinite(control)
+    values, control = values[keep], control[keep]
+    weights = control_weights(control, expectation)
+
+    def quartiles(weights):
+        p25, p50, p75 = weighted_percentiles(values, weights, percentiles)
+        return [float((values.min() + p25) / 2), float(p50), float((p75 + values.max()) / 2)]
+
+    plain_percentiles = weighted_percentiles(values, np.full(len(values), 1 / len(values)), percentiles)
+    return {
+        "mean": float(weights @ values),
+        "plain_mean": float(values.mean()),
+        "quartiles": quartiles(weights),
+        "plain_quartiles": quartiles(np.full(len(values), 1 / len(values))),
+        "variance_reduction": {
+            "mean": variance_reduction(values, control),
+            **{f"P{p}": variance_reduction(values <= q, control) for p, q in zip(percentiles, plain_percentiles)},
+        },
+    }
+
+
+def control_variate_table(result_sets, benchmark_results, expectations):
+    # result_sets: {name: NOAK or LCOE results of the run the benchmark results came from}
+    rows = []
+    for name, results in result_sets.items():
+        for path, values in flatten_results(results):
+            year = int(path[0].split()[-1])
+            tech = "wind" if "wind" in path[-1] else "nuclear"
+            control = benchmark_results[str(year)][benchmark_series[tech]]
+            rows.append({"result_set": name, "year": year, "series": "/".join(path[1:]),
+                         **control_variate_estimates(values, control, expectations[tech, year])})
+    return rows
+
+
+# --- Sources ---
+def load_stored():
+    # NOAK, benchmark and (if priced on them) LCOE stores of one --common-draws run
+    noak_metadata = read_run_metadata(noak_name)
+    if not shared_draws(noak_metadata, read_run_metadata(benchmark_name)):
+        raise ValueError(f"{benchmark_name} does not share the draws of {noak_name}; "
+                         "run NOAK_mcsim_with_deployment.py and benchmark_sim.py with --common-draws")
+    result_sets = {noak_name: load_results(noak_name)}
+    lcoe_metadata = read_run_metadata(lcoe_name) if has_results(lcoe_name) else None
+    if (lcoe_metadata is not None and lcoe_metadata["scenario"] == "lcoe_on_noak"
+            and lcoe_metadata["num_simulations"] == noak_metadata["num_simulations"]):
+        result_sets[lcoe_name] = load_results(lcoe_name)
+    return result_sets, load_results(benchmark_name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Control-variate estimates of the NOAK and LCOE means and quartiles")
+    parser.add_argument("--stored", action="store_true",
+                        help="use the saved stores of a --common-draws run instead of a fresh one")
+    parser.add_argument("--sampling", choices=["random"] + design_methods, default="random")
+    parser.add_argument("--num-simulations", type=int, default=default_num_simulations)
+    parser.add_argument("--block-size", type=int, default=default_block_size)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--year", type=int, choices=years, help="only report this year")
+    parser.add_argument("--output", help="also write the table as JSON")
+    args = parser.parse_args()
+
+    if args.stored:
+        result_sets, benchmark_results = load_stored()
+    else:
+        noak_results, benchmark_results = run_common(args.sampling, args.num_simulations, args.seed, args.block_size,
+                                                     args.workers)
+        lcoe_results = run_lcoe_on_noak(noak_results, build_lcoe_parameters(), args.seed, args.block_size)
+        result_sets = {noak_name: noak_results, lcoe_name: lcoe_results}
+
+    table = [row for row in control_variate_table(result_sets, benchmark_results,
+                                                  benchmark_expectations(build_noak_parameters()))
+             if args.year is None or row["year"] == args.year]
+    print(f"{'set':5s} {'year':4s}  {'series':24s} {'plain mean':>11s} {'CV mean':>11s} {'plain Q2':>10s} "
+          f"{'CV Q2':>10s}   variance reduction: mean   P25   P50   P75")
+    for row in table:
+        reductions = "  ".join(f"{value:5.1f}" if value else "exact" for value in row["variance_reduction"].values())
+        print(f"{row['result_set'][:4]:5s} {row['year']:4d}  {row['series']:24s} {row['plain_mean']:11.2f} "
+              f"{row['mean']:11.2f} {row['plain_quartiles'][1]:10.2f} {row['quartiles'][1]:10.2f}   "
+              f"{'':19s}{reductions}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(table, f, indent=1)
@@ -0,0 +1,87 @@
+import numpy as np
+from atb_data import atb_index
+from run_report import count
+
+
+years = [2030, 2035, 2040, 2045, 2050]
+
+
+def deployment_quantiles(technology, years=years):
+    # (cons, mod, adv) per year -> left, mode, right of the triangular deployment draw
+    return atb_index.deployment_quantiles(technology, years)
+
+
+# --- Triangular distribution ---
+def triangular_cdf(x, left, mode, right):
+    x = np.clip(x, left, right)
+    width = right - left
+    lower = (x - left) ** 2 / (width * (mode - left)) if mode > left else np.zeros_like(x)
+    upper = 1 - (right - x) ** 2 / (width * (right - mode)) if right > mode else np.ones_like(x)
+    return np.where(x <= mode, lower, upper)
+
+
+def triangular_ppf(u, left, mode, right):
+    width = right - left
+    f_mode = (mode - left) / width
+    lower = left + np.sqrt(u * width * (mode - left))
+    upper = right - np.sqrt((1 - u) * width * (right - mode))
+    return np.where(u < f_mode, lower, upper)
+
+
+# --- Monotone trajectories ---
+def monotone_trajectories_from_uniforms(u, quantiles):
+    # u: (n_sims, n_years) uniforms in [0, 1); quantiles: (n_years, 3) rows of (cons, mod, adv).
+    # Year j is drawn from its triangle truncated below at year j-1, which is the distribution
+    # the old `while True:` rejection loop converged to, at one inverse-CDF step per year.
+    n_sims, n_years = u.shape
+    trajectories = np.empty((n_sims, n_years))
+    prev = np.ones(n_sims)
+    for j in range(n_years):
+        cons, mod, adv = quantiles[j]
+        if np.isclose(cons, adv):
+            sampled = np.full(n_sims, cons)
+        else:
+            f_prev = triangular_cdf(prev, cons, mod, adv)
+            sampled = triangular_ppf(f_prev + u[:, j] * (1 - f_prev), cons, mod, adv)
+            # Draws the truncation applied to, and the redraws the rejection loop would have needed
+            # (unbounded where the previous year already reached the top of the triangle)
+            truncated = f_prev > 0
+            bounded = truncated & (f_prev < 1)
+            count("deployment_truncated_draws", int(truncated.sum()))
+            count("deployment_expected_rejections", float((f_prev[bounded] / (1 - f_prev[bounded])).sum()))
+        sampled = np.maximum(sampled, prev)
+        trajectories[:, j] = sampled
+        prev = sampled
+    return trajectories
+
+
+# --- Marginal distribution of each year ---
+# The year-j deployment of a monotone trajectory is not its triangle: it is the triangle truncated
+# below at year j-1, mixed over year j-1's distribution. Each year is carried as `atoms` equally
+# weighted points: every point of year j-1 is pushed through the truncated inverse CDF at `inner`
+# midpoint uniforms, and the sorted mixture is averaged back down to `atoms` points.
+marginal_atoms = 2048
+marginal_inner = 64
+
+
+def trajectory_marginals(quantiles, atoms=marginal_atoms, inner=marginal_inner):
+    # (n_years, atoms) sorted, equally weighted deployment values per year
+    v = (np.arange(inner) + 0.5) / inner
+    prev = np.ones(atoms)
+    marginals = np.empty((len(quantiles), atoms))
+    for j, (cons, mod, adv) in enumerate(quantiles):
+        if np.isclose(cons, adv):
+            current = np.maximum(cons, prev)
+        else:
+            f_prev = triangular_cdf(prev, cons, mod, adv)[:, None]
+            mixture = np.maximum(triangular_ppf(f_prev + v * (1 - f_prev), cons, mod, adv), prev[:, None])
+            current = np.sort(mixture, axis=None).reshape(atoms, inner).mean(axis=1)
+        marginals[j] = current
+        prev = current
+    return marginals
+
+
+def sample_deployment_trajectories(technology, size, rng, years=years):
+    # rng: np.random.Generator, or the np.random module for scripts on the global seeded stream
+    quantiles = deployment_quantiles(technology, years)
+    return monotone_trajectories_from_uniforms(rng.random((size, len(years))), quantiles)
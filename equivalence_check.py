@@ -0,0 +1,250 @@
+import argparse
+import sys
+import time
+from functools import lru_cache, partial
+import numpy as np
+from result_store import flatten_results
+import reference_engine
+from noak_engine import (build_noak_parameters, sample_noak_inputs, simulate_noak,
+                         build_nuclear_smr_parameters, sample_nuclear_smr_inputs, simulate_nuclear_smr,
+                         build_benchmark_parameters, sample_benchmark_inputs, simulate_benchmark,
+                         design_methods, mic_scenarios, sample_noak_inputs_qmc, sample_nuclear_smr_inputs_qmc,
+                         sample_common_inputs, years)
+from lcoe_engine import (build_lcoe_parameters, sample_lcoe_year_inputs, lcoe_from_year_inputs,
+                         build_nuclear_smr_lcoe_parameters, sample_nuclear_smr_lcoe_year_inputs,
+                         nuclear_smr_lcoe_from_year_inputs, build_benchmark_lcoe_parameters,
+                         sample_benchmark_lcoe_year_inputs, benchmark_lcoe_from_year_inputs)
+
+
+# --- Reference vs fast ---
+# Every case draws its inputs once and hands the same arrays to the reference loop
+# (reference_engine.py) and to the array engine, then compares the two sample by sample.
+# An LCOE case takes the fast NOAK results of its scenario as its OCCs, so it checks the
+# LCOE stage alone. A new fast path is checked by adding a case with the same reference.
+#
+# The input samplers cannot be checked sample by sample: the deployments come from the truncated
+# inverse CDF (deployment_sampler.monotone_trajectories_from_uniforms) instead of the rejection
+# loop, and the QMC, antithetic and common-draws samplers push designs through inverse CDFs. Their
+# distribution cases compare every input column (each MIC scenario, each deployment year) with
+# the same column of the original per-sample draws (reference_engine.reference_noak_inputs and
+# friends) by a two-sample Kolmogorov-Smirnov test at fixed seeds; a case fails if any column's
+# p-value is below default_alpha over the number of columns. QMC and antithetic rows are not
+# independent but spread more evenly than random ones, which only makes their statistics smaller.
+default_num_simulations = 2000
+default_distribution_samples = 10000
+default_rtol = 1e-9
+default_atol = 1e-9
+default_alpha = 1e-3
+
+
+def noak_case(size, rng):
+    inputs = sample_noak_inputs(build_noak_parameters(), size, rng)
+    return (inputs,), reference_engine.reference_noak, simulate_noak
+
+
+def nuclear_smr_case(size, rng):
+    inputs = sample_nuclear_smr_inputs(build_nuclear_smr_parameters(), size, rng)
+    return (inputs,), reference_engine.reference_nuclear_smr, simulate_nuclear_smr
+
+
+def benchmark_case(size, rng):
+    inputs = sample_benchmark_inputs(build_benchmark_parameters(), size, rng)
+    return (inputs,), reference_engine.reference_benchmark, simulate_benchmark
+
+
+def lcoe_case(size, rng):
+    noak_results = simulate_noak(sample_noak_inputs(build_noak_parameters(), size, rng))
+    params = build_lcoe_parameters()
+    args = (noak_results, sample_lcoe_year_inputs(noak_results, params, rng), params)
+    return args, reference_engine.reference_lcoe, lcoe_from_year_inputs
+
+
+def nuclear_smr_lcoe_case(size, rng):
+    noak_results = simulate_nuclear_smr(sample_nuclear_smr_inputs(build_nuclear_smr_parameters(), size, rng))
+    params = build_nuclear_smr_lcoe_parameters()
+    args = (noak_results, sample_nuclear_smr_lcoe_year_inputs(noak_results, params, rng), params)
+    return args, reference_engine.reference_nuclear_smr_lcoe, nuclear_smr_lcoe_from_year_inputs
+
+
+def benchmark_lcoe_case(size, rng):
+    benchmark_results = simulate_benchmark(sample_benchmark_inputs(build_benchmark_parameters(), size, rng))
+    params = build_benchmark_lcoe_parameters()
+    args = (benchmark_results, sample_benchmark_lcoe_year_inputs(benchmark_results, params, rng), params)
+    return args, reference_engine.reference_benchmark_lcoe, benchmark_lcoe_from_year_inputs
+
+
+# name -> case(size, rng) returning (arguments, reference, fast)
+cases = {
+    "noak": noak_case,
+    "lcoe": lcoe_case,
+    "nuclear_smr": nuclear_smr_case,
+    "nuclear_smr_lcoe": nuclear_smr_lcoe_case,
+    "benchmark": benchmark_case,
+    "benchmark_lcoe": benchmark_lcoe_case,
+}
+
+
+# --- Distribution cases: fast samplers vs the rejection-loop draws ---
+@lru_cache(maxsize=None)
+def reference_draws(kind, size, seed):
+    # Shared by every sampler of a scenario; a stream disjoint from the fast samplers'
+    rng = np.random.default_rng([seed, 1])
+    if kind == "noak":
+        return reference_engine.reference_noak_inputs(build_noak_parameters(), size, rng)
+    if kind == "nuclear_smr":
+        return reference_engine.reference_nuclear_smr_inputs(build_nuclear_smr_parameters(), size, rng)
+    return reference_engine.reference_benchmark_inputs(build_benchmark_parameters(), size, rng)
+
+
+def noak_inputs_case(method, size, seed):
+    params = build_noak_parameters()
+    rng = np.random.default_rng(seed)
+    fast = sample_noak_inputs(params, size, rng) if method == "random" else sample_noak_inputs_qmc(params, size, rng,
+                                                                                                  method)
+    return reference_draws("noak", size, seed), fast
+
+
+def nuclear_smr_inputs_case(method, size, seed):
+    params = build_nuclear_smr_parameters()
+    rng = np.random.default_rng(seed)
+    fast = (sample_nuclear_smr_inputs(params, size, rng) if method == "random"
+            else sample_nuclear_smr_inputs_qmc(params, size, rng, method))
+    return reference_draws("nuclear_smr", size, seed), fast
+
+
+def benchmark_inputs_case(size, seed):
+    return reference_draws("benchmark", size, seed), sample_benchmark_inputs(build_benchmark_parameters(), size,
+                                                                             np.random.default_rng(seed))
+
+
+def common_inputs_case(method, size, seed):
+    # The common draws carry the NOAK inputs plus the benchmark's SMR OCC and deployment
+    fast = sample_common_inputs(build_noak_parameters(), build_benchmark_parameters(), size,
+                                np.random.default_rng(seed), method)
+    reference = {**reference_draws("benchmark", size, seed), **reference_draws("noak", size, seed)}
+    return reference, fast
+
+
+# name -> case(size, seed) returning (reference inputs, fast inputs)
+sampling_methods = ["random"] + design_methods
+distribution_cases = {
+    **{f"noak_inputs_{method}": partial(noak_inputs_case, method) for method in sampling_methods},
+    **{f"nuclear_smr_inputs_{method}": partial(nuclear_smr_inputs_case, method) for method in sampling_methods},
+    "benchmark_inputs_random": benchmark_inputs_case,
+    **{f"common_inputs_{method}": partial(common_inputs_case, method) for method in sampling_methods},
+}
+
+
+def input_columns(inputs):
+    # [(label, samples)]: one column per scalar input, MIC scenario and deployment year
+    columns = []
+    for key, values in inputs.items():
+        if key.startswith("deployment_"):
+            columns += [(f"{key}/{year}", values[:, j]) for j, year in enumerate(years)]
+        elif values.ndim == 2:
+            columns += [(f"{key}/{name}", row) for name, row in zip(mic_scenarios, values)]
+        else:
+            columns.append((key, values))
+    return columns
+
+
+def compare_distributions(reference, fast, alpha=default_alpha):
+    # Returns (all columns as (label, KS statistic, p-value), failing columns)
+    from scipy.stats import ks_2samp
+    reference_columns = dict(input_columns(reference))
+    tests = []
+    for label, values in input_columns(fast):
+        test = ks_2samp(reference_columns[label], values)
+        tests.append((label, float(test.statistic), float(test.pvalue)))
+    return tests, [test for test in tests if test[2] < alpha / len(tests)]
+
+
+def run_distribution_case(name, num_simulations=default_distribution_samples, seed=42, alpha=default_alpha):
+    tests, failures = compare_distributions(*distribution_cases[name](num_simulations, seed), alpha)
+    return {
+        "mismatches": failures,
+        "columns": len(tests),
+        "max_statistic": max(test[1] for test in tests),
+        "min_pvalue": min(test[2] for test in tests),
+    }
+
+
+def timed(function, args):
+    start = time.perf_counter()
+    results = function(*args)
+    return results, time.perf_counter() - start
+
+
+def compare_series(reference, fast, rtol=default_rtol, atol=default_atol):
+    # Returns a list of (path, mismatched samples, max abs difference); an empty list if all agree
+    reference_series = dict(flatten_results(reference))
+    fast_series = dict(flatten_results(fast))
+    if reference_series.keys() != fast_series.keys():
+        missing = sorted(reference_series.keys() ^ fast_series.keys())
+        return [(path, None, None) for path in missing]
+    mismatches = []
+    for path, expected in reference_series.items():
+        expected, actual = np.asarray(expected, dtype=float), np.asarray(fast_series[path], dtype=float)
+        if expected.shape != actual.shape:
+            mismatches.append((path, None, None))
+            continue
+        close = np.isclose(actual, expected, rtol=rtol, atol=atol, equal_nan=True)
+        if not close.all():
+            with np.errstate(invalid="ignore"):
+                worst = float(np.nanmax(np.abs(actual - expected)[~close]))
+            mismatches.append((path, int((~close).sum()), worst))
+    return mismatches
+
+
+def run_case(name, num_simulations=default_num_simulations, seed=42, rtol=default_rtol, atol=default_atol):
+    args, reference, fast = cases[name](num_simulations, np.random.default_rng(seed))
+    reference_results, reference_seconds = timed(reference, args)
+    fast_results, fast_seconds = timed(fast, args)
+    return {
+        "mismatches": compare_series(reference_results, fast_results, rtol, atol),
+        "reference_seconds": reference_seconds,
+        "fast_seconds": fast_seconds,
+        "speedup": reference_seconds / fast_seconds if fast_seconds > 0 else float("inf"),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the array engines against the original per-sample loops, "
+                                                 "and the input samplers against the original draws")
+    parser.add_argument("cases", nargs="*",
+                        help=f"cases to check (default: all of {', '.join(cases)} and {', '.join(distribution_cases)})")
+    parser.add_argument("--num-simulations", type=int, default=default_num_simulations)
+    parser.add_argument("--distribution-samples", type=int, default=default_distribution_samples,
+                        help="samples per side of the distribution cases")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rtol", type=float, default=default_rtol)
+    parser.add_argument("--atol", type=float, default=default_atol)
+    parser.add_argument("--alpha", type=float, default=default_alpha,
+                        help="significance of a distribution case, split over its columns")
+    args = parser.parse_args()
+    unknown = [name for name in args.cases if name not in cases and name not in distribution_cases]
+    if unknown:
+        parser.error(f"unknown cases {unknown}")
+
+    failed = False
+    for name in args.cases or list(cases) + list(distribution_cases):
+        if name in distribution_cases:
+            result = run_distribution_case(name, args.distribution_samples, args.seed, args.alpha)
+            status = "FAIL" if result["mismatches"] else "ok"
+            print(f"{status:4s} {name:30s} {result['columns']:3d} columns  largest KS statistic "
+                  f"{result['max_statistic']:.4f}  smallest p-value {result['min_pvalue']:.3g}")
+            for label, statistic, pvalue in result["mismatches"]:
+                print(f"     {label}: KS statistic {statistic:.4f}, p-value {pvalue:.3g}")
+            failed = failed or bool(result["mismatches"])
+            continue
+        result = run_case(name, args.num_simulations, args.seed, args.rtol, args.atol)
+        status = "FAIL" if result["mismatches"] else "ok"
+        print(f"{status:4s} {name:30s} reference {result['reference_seconds']:8.3f} s  "
+              f"fast {result['fast_seconds']:8.4f} s  speedup x{result['speedup']:.0f}")
+        for path, count, worst in result["mismatches"]:
+            if count is None:
+                print(f"     {'/'.join(path)}: missing or different shape")
+            else:
+                print(f"     {'/'.join(path)}: {count} samples differ, max abs difference {worst:.3g}")
+        failed = failed or bool(result["mismatches"])
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,152 @@
+import argparse
+import os
+import time
+import numpy as np
+from kde_curves import load_kde_curves
+from lcoe_engine import build_lcoe_parameters
+from mc_stats import load_quartiles
+from parallel_runner import block_layout, iter_blocks, iter_lcoe_blocks, run_block, run_metadata, scenarios
+from result_cache import default_cache_directory, lcoe_from_noak_key, scenario_key, store_entry
+from result_store import StoreWriter, flatten_results, load_store, manifest_name, read_run_metadata, store_suffix
+
+
+# --- Incremental extension of stored runs ---
+# A stored run of n samples is grown to m > n samples without recomputing it: block i of a run
+# always draws from SeedSequence(seed).spawn(n_blocks)[i] (see parallel_runner.py), so the complete
+# blocks of the old run are copied as they are and only the trailing partial block (samplers draw
+# whole arrays, so its samples change once the block is full) and the new blocks are simulated.
+# With the default block size (parallel_runner.default_block_size) that is at most one block of
+# redrawn samples. The result is identical to a one-shot run of m samples with the same seed and
+# block size.
+#
+# Every store tagged with the same run (the result sets one scenario run produced) is extended
+# together, followed by the LCOE stores priced on it by LCOE_sim_NOAK.py ("lcoe_on_noak"). Unless
+# disabled, the extended runs are added to .mc_cache under the keys a one-shot run of m samples
+# would use.
+#
+# Limitation: the quartiles.json and kde.json caches of each changed store are not updated
+# incrementally but rebuilt in one batched pass over all m samples. The exact custom quartiles need
+# the order statistics of the whole run, and merging the old values with the new blocks
+# (streaming.SeriesAggregate's histograms or sketches) would only give approximate ones.
+copy_step = 1000000
+
+
+def stored_runs(directory="."):
+    runs = {}
+    for entry in sorted(os.listdir(directory)):
+        if entry.endswith(store_suffix) and os.path.isfile(os.path.join(directory, entry, manifest_name)):
+            name = os.path.join(directory, entry[:-len(store_suffix)])
+            metadata = read_run_metadata(name)
+            if metadata is not None:
+                runs[name] = metadata
+    return runs
+
+
+def same_run(a, b):
+    return all(a[key] == b[key] for key in ["scenario", "num_simulations", "seed", "block_size"])
+
+
+def copy_prefix(writer, results, stop):
+    # The kept blocks are copied from the memory-mapped old store in slices
+    for path, values in flatten_results(results):
+        for start in range(0, stop, copy_step):
+            writer.write(path, start, values[start:min(start + copy_step, stop)])
+
+
+def extend_results(names, metadata, num_simulations, new_blocks):
+    # new_blocks(block indices) yields (start, stop, {name: block results}) for the recomputed blocks
+    layout = block_layout(num_simulations, metadata["block_size"])
+    first_block = metadata["num_simulations"] // metadata["block_size"]
+    kept = first_block * metadata["block_size"]
+    # An adaptive run's precision (adaptive_runner.py) no longer describes the extended run
+    new_metadata = {**{key: value for key, value in metadata.items() if key != "adaptive"},
+                    "num_simulations": num_simulations}
+
+    old_results = {name: load_store(name + store_suffix) for name in names}
+    writers = {name: StoreWriter(name + store_suffix, num_simulations, new_metadata) for name in names}
+    for name in names:
+        copy_prefix(writers[name], old_results[name], kept)
+    for start, stop, block in new_blocks(range(first_block, len(layout))):
+        for name in names:
+            writers[name].write_chunk(block[os.path.basename(name)], start)
+    for writer in writers.values():
+        writer.close()
+    return kept
+
+
+def extend_run(name, num_simulations, workers=1, directory=".", cache=True, cache_directory=default_cache_directory):
+    runs = stored_runs(directory)
+    name = os.path.join(directory, name)
+    if name not in runs:
+        raise ValueError(f"{name} has no run metadata; re-run it with the current scripts to make it extendable")
+    metadata = runs[name]
+    if metadata["scenario"] == "lcoe_on_noak":
+        raise ValueError(f"{name} is priced on {metadata['source']}; extend that run instead")
+    if num_simulations <= metadata["num_simulations"]:
+        raise ValueError(f"{name} already holds {metadata['num_simulations']} samples")
+
+    # --- Scenario result sets ---
+    names = [other for other, other_metadata in runs.items() if same_run(other_metadata, metadata)]
+
+    def scenario_blocks(blocks):
+        return iter_blocks(metadata["scenario"], num_simulations, metadata["seed"], metadata["block_size"], workers,
+                           blocks=blocks)
+
+    kept = extend_results(names, metadata, num_simulations, scenario_blocks)
+    print(f"Extended {', '.join(os.path.basename(n) for n in names)}: kept {kept} samples, "
+          f"simulated {num_simulations - kept}")
+    changed = list(names)
+    sources = {os.path.basename(n) for n in names}
+    # A cache entry must hold every result set of the scenario (a one-sample block names them)
+    params = scenarios[metadata["scenario"]][0]()
+    outputs = run_block(metadata["scenario"], params, np.random.SeedSequence(0), 1)
+    if cache and sources == set(outputs):
+        key = scenario_key(metadata["scenario"], params, metadata["seed"], num_simulations, metadata["block_size"])
+        store_entry(key, {os.path.basename(n): load_store(n + store_suffix) for n in names},
+                    {"kind": "scenario", **run_metadata(metadata["scenario"], num_simulations, metadata["seed"],
+                                                        metadata["block_size"])}, cache_directory)
+
+    # --- LCOE priced on the extended NOAK results ---
+    lcoe_params = build_lcoe_parameters()
+    for lcoe_name, lcoe_metadata in runs.items():
+        if lcoe_metadata["scenario"] != "lcoe_on_noak" or lcoe_metadata["source"] not in sources:
+            continue
+        if lcoe_metadata["num_simulations"] != metadata["num_simulations"]:
+            print(f"Skipping {os.path.basename(lcoe_name)}: priced on a different run of {lcoe_metadata['source']}")
+            continue
+        noak_results = load_store(os.path.join(directory, lcoe_metadata["source"]) + store_suffix)
+
+        def lcoe_blocks(blocks):
+            for start, stop, block in iter_lcoe_blocks(noak_results, lcoe_params, lcoe_metadata["seed"],
+                                                       lcoe_metadata["block_size"], blocks):
+                yield start, stop, {os.path.basename(lcoe_name): block}
+
+        kept = extend_results([lcoe_name], lcoe_metadata, num_simulations, lcoe_blocks)
+        print(f"Extended {os.path.basename(lcoe_name)}: kept {kept} samples, simulated {num_simulations - kept}")
+        changed.append(lcoe_name)
+        if cache:
+            key = lcoe_from_noak_key(noak_results, lcoe_params, lcoe_metadata["seed"], lcoe_metadata["block_size"])
+            store_entry(key, {os.path.basename(lcoe_name): load_store(lcoe_name + store_suffix)},
+                        {"kind": "lcoe_from_noak", "seed": lcoe_metadata["seed"],
+                         "block_size": lcoe_metadata["block_size"]}, cache_directory)
+
+    # Full pass over each changed store, not an incremental update (see the limitation above)
+    for changed_name in changed:
+        start = time.perf_counter()
+        load_quartiles(changed_name)
+        load_kde_curves(changed_name)
+        print(f"Rebuilt the quartile and KDE caches of {os.path.basename(changed_name)} from all {num_simulations} "
+              f"samples (full pass, {time.perf_counter() - start:.2f} s)")
+    return changed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grow a stored Monte Carlo run to more samples")
+    parser.add_argument("name", help="result set to extend, e.g. noak_simulation_results_fixed_dynamic")
+    parser.add_argument("--num-simulations", type=int, required=True, help="total number of samples after extension")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--directory", default=".")
+    parser.add_argument("--no-cache", action="store_true", help="do not add the extended runs to .mc_cache")
+    args = parser.parse_args()
+
+    extend_run(args.name, args.num_simulations, args.workers, args.directory, cache=not args.no_cache)
@@ -0,0 +1,295 @@
+import argparse
+import time
+import numpy as np
+from deployment_sampler import trajectory_marginals, triangular_cdf, triangular_ppf
+from lcoe_engine import build_lcoe_parameters
+import mc_stats
+from mc_stats import nest
+from noak_engine import build_noak_parameters, compute_b, lr_nuclear_ppf, lr_wind_ppf, mic_scenarios, years
+from parallel_runner import run_lcoe_on_noak, run_scenario
+from result_store import flatten_results
+
+
+# --- Semi-analytic FLR distributions ---
+# Under fixed learning NOAK = MIC + (OCC0 - MIC) N^b = g OCC0 + (1 - g) MIC with the learning
+# factor g = N^b in (0, 1]. Given g this is a scaled OCC triangle plus a scaled MIC normal, whose
+# CDF has a closed form (integrating Phi twice by parts over each linear piece of the triangle),
+# so the NOAK CDF is the weighted mean of that closed form over atoms of g. The atoms come from the
+# learning-rate inverse CDF and the year's deployment marginal (the monotone trajectories make it
+# a truncated-triangle chain, not the ATB triangle; see deployment_sampler.trajectory_marginals).
+# The g atoms are weighted and clustered towards both tails (tail_nodes), which decide the sample
+# min and max. The LCOE is the NOAK scaled and shifted by independent triangular inputs: its CDF
+# is the NOAK CDF (interpolated on a grid) averaged over equally weighted quantile atoms of those
+# inputs, sums of two sorted and averaged back down. Quantiles are bisected on the CDF to
+# `tolerance`; the custom Q1/Q3 need the sample min and max, so they are given as their
+# expectations at a sample size n.
+factor_atoms = 256
+deployment_atoms = 1024
+lr_points = 256
+input_atoms = 64
+grid_points = 1024
+tail_stds = 8  # the MIC normal is cut this many standard deviations out
+default_tolerance = 1e-7
+default_num_simulations = 100000
+probabilities = [0.25, 0.5, 0.75]
+extreme_exponent = 40
+extreme_points = 512
+
+
+def midpoints(count):
+    return (np.arange(count) + 0.5) / count
+
+
+def triangle(occ_range):
+    return min(occ_range), occ_range[1], max(occ_range)
+
+
+def triangle_atoms(left, mode, right, count=input_atoms):
+    return triangular_ppf(midpoints(count), left, mode, right)
+
+
+def sum_atoms(a, b, count=input_atoms):
+    # Atoms of the sum of two independent atom sets
+    return np.sort(np.add.outer(a, b), axis=None).reshape(count, -1).mean(axis=1)
+
+
+def tail_nodes(count):
+    # Weighted nodes in (0, 1), midpoints in theta for u = (1 - cos theta) / 2: they cluster towards
+    # both ends, so the tails that decide the sample min and max are resolved as well as the middle
+    theta = np.pi * midpoints(count)
+    weights = np.sin(theta)
+    return (1 - np.cos(theta)) / 2, weights / weights.sum()
+
+
+def compress_atoms(values, weights, count):
+    # count weighted atoms of a weighted sample: the sorted values cut into blocks at tail-clustered
+    # probability edges, each block replaced by its weighted mean
+    order = np.argsort(values)
+    values, weights = values[order], weights[order]
+    edges = (1 - np.cos(np.pi * np.arange(1, count) / count)) / 2
+    block = np.searchsorted(edges, np.cumsum(weights) - weights / 2)
+    block_weights = np.bincount(block, weights, count)
+    block_sums = np.bincount(block, weights * values, count)
+    keep = block_weights > 0
+    return block_sums[keep] / block_weights[keep], block_weights[keep]
+
+
+def learning_factors(deployment_quantiles, lr_ppf):
+    # [(atoms, weights) of g = N^b for every year]
+    u, lr_weights = tail_nodes(lr_points)
+    b = compute_b(lr_ppf(u))
+    factors = []
+    for deployments in trajectory_marginals(deployment_quantiles, deployment_atoms):
+        weights = np.outer(np.full(len(deployments), 1 / len(deployments)), lr_weights)
+        factors.append(compress_atoms((deployments[:, None] ** b).ravel(), weights.ravel(), factor_atoms))
+    return factors
+
+
+# --- NOAK ---
+def mixed_cdf(y, g, occ_triangle, mic):
+    # P(g T + (1 - g) M <= y) for T ~ triangle, M ~ normal(mic); y and g broadcast together
+    from scipy.special import ndtr
+    left, mode, right = occ_triangle
+    mean, std = mic
+    spread = (1 - g) * std
+    exact = spread == 0  # g = 1: the MIC drops out and NOAK is the OCC itself
+    spread = np.where(exact, 1.0, spread)
+    shift = y - (1 - g) * mean
+    scale = spread / g
+
+    # Each linear piece (t0, t1, density at t0, slope) of the triangle integrates to
+    # [-scale f(t) psi1(x(t)) - scale^2 slope psi2(x(t))] from t0 to t1, x(t) = (shift - g t) / spread,
+    # psi1 and psi2 the first and second antiderivatives of Phi; the terms are gathered per point
+    peak = 2 / (right - left)
+    pieces = []
+    if mode > left:
+        pieces.append((left, mode, 0.0, peak / (mode - left)))
+    if right > mode:
+        pieces.append((mode, right, peak, -peak / (right - mode)))
+    coefficients = {}
+    for t0, t1, density, slope in pieces:
+        for t, value, sign in [(t1, density + slope * (t1 - t0), 1), (t0, density, -1)]:
+            coefficient = coefficients.setdefault(t, [0.0, 0.0])
+            coefficient[0] -= sign * value
+            coefficient[1] -= sign * slope
+
+    cdf = 0
+    for t, (psi1_coefficient, psi2_coefficient) in coefficients.items():
+        x = (shift - g * t) / spread
+        cdf_x, pdf_x = ndtr(x), np.exp(-x ** 2 / 2) / np.sqrt(2 * np.pi)
+        cdf = cdf + scale ** 2 * psi2_coefficient * ((x ** 2 + 1) * cdf_x + x * pdf_x) / 2
+        if psi1_coefficient:
+            cdf = cdf + scale * psi1_coefficient * (x * cdf_x + pdf_x)
+    return np.where(exact, triangular_cdf(np.broadcast_to(y, np.shape(cdf)), left, mode, right), np.clip(cdf, 0, 1))
+
+
+def noak_support(occ_triangle, mic):
+    mean, std = mic
+    return min(occ_triangle[0], mean - tail_stds * std), max(occ_triangle[2], mean + tail_stds * std)
+
+
+def noak_distribution(factors, occ_triangle, mic):
+    # {"cdf": y -> P(NOAK <= y), "support": (low, high)} of one FLR series in one year
+    atoms, weights = factors
+
+    def cdf(y):
+        y = np.asarray(y, dtype=float)
+        return mixed_cdf(y[..., None], atoms, occ_triangle, mic) @ weights
+    return {"cdf": cdf, "support": noak_support(occ_triangle, mic)}
+
+
+def on_grid(distribution):
+    # The CDF tabulated on first use for interpolation by the LCOE stage
+    table = {}
+
+    def cdf(value):
+        if not table:
+            table["x"] = np.linspace(*distribution["support"], grid_points)
+            table["cdf"] = distribution["cdf"](table["x"])
+        return np.interp(value, table["x"], table["cdf"])
+    return {"cdf": cdf, "support": distribution["support"]}
+
+
+# --- LCOE (lcoe_engine.lcoe_from_noak) ---
+def nuclear_lcoe_distribution(noak_grid, params):
+    # LCOE = B (crf pff cff NOAK + fom) + vom + fuel, B = 1000 / (cf 8760)
+    factor = 1000 / (params["cf_nuclear"] * 8760)
+    cost = params["crf_nuc"] * params["pff_nuc"] * triangle_atoms(*params["cff_range_nuclear"])
+    offset = sum_atoms(factor * triangle_atoms(*params["fom_range_nuclear"]),
+                       sum_atoms(triangle_atoms(*params["vom_range_nuclear"]),
+                                 triangle_atoms(*params["fuel_range_nuclear"])))
+    scale = factor * cost
+
+    def cdf(lcoe):
+        lcoe = np.asarray(lcoe, dtype=float)[..., None, None]
+        return noak_grid["cdf"]((lcoe - offset[:, None]) / scale).mean(axis=(-2, -1))
+
+    low, high = noak_grid["support"]
+    return {"cdf": cdf, "support": (scale.min() * low + offset.min(), scale.max() * high + offset.max())}
+
+
+def wind_lcoe_distribution(noak_grid, params):
+    # LCOE = (crf pff cff NOAK + fom) 1000 / (cf 8760) with a triangular capacity factor
+    cost = params["crf_wind"] * params["pff_wind"] * params["cff_wind"]
+    cf_range = params["cf_range_wind"]
+    fom = triangle_atoms(*params["fom_range_wind"])
+    factor = 1000 / (triangle_atoms(cf_range[2], cf_range[1], cf_range[0]) * 8760)
+
+    def cdf(lcoe):
+        lcoe = np.asarray(lcoe, dtype=float)[..., None, None]
+        return noak_grid["cdf"]((lcoe / factor[:, None] - fom) / cost).mean(axis=(-2, -1))
+
+    low, high = noak_grid["support"]
+    return {"cdf": cdf, "support": (factor.min() * (cost * low + fom.min()), factor.max() * (cost * high + fom.max()))}
+
+
+# --- Statistics ---
+def quantiles(distribution, probabilities=probabilities, tolerance=default_tolerance):
+    # Bisection on the CDF until the bracket is below tolerance times the support width
+    low, high = distribution["support"]
+    probabilities = np.asarray(probabilities, dtype=float)
+    lower, upper = np.full(len(probabilities), low), np.full(len(probabilities), high)
+    while (upper - lower).max() > tolerance * (high - low):
+        middle = (lower + upper) / 2
+        below = distribution["cdf"](middle) < probabilities
+        lower, upper = np.where(below, middle, lower), np.where(below, upper, middle)
+    return (lower + upper) / 2
+
+
+def expected_extremes(distribution, num_simulations):
+    # E[min] = low + integral of (1 - F)^n, E[max] = high - integral of F^n over the support; the
+    # integrands are below e^-extreme_exponent beyond the matching tail quantiles, so only the
+    # tails out to the support ends are integrated
+    cdf = distribution["cdf"]
+    low, high = distribution["support"]
+    tail = 1 - np.exp(-extreme_exponent / num_simulations)
+    lower_cut, upper_cut = quantiles(distribution, [tail, 1 - tail])
+    x_low, x_high = np.linspace(low, lower_cut, extreme_points), np.linspace(upper_cut, high, extreme_points)
+    return (low + np.trapezoid((1 - np.clip(cdf(x_low), 0, 1)) ** num_simulations, x_low),
+            high - np.trapezoid(np.clip(cdf(x_high), 0, 1) ** num_simulations, x_high))
+
+
+def expected_custom_quartiles(distribution, num_simulations=default_num_simulations, tolerance=default_tolerance):
+    # Expected custom quartiles of a run of num_simulations samples (see mc_stats.custom_quartiles)
+    p25, median, p75 = quantiles(distribution, probabilities, tolerance)
+    low, high = expected_extremes(distribution, num_simulations)
+    return float((low + p25) / 2), float(median), float((p75 + high) / 2)
+
+
+def flr_distributions(noak_params=None, lcoe_params=None):
+    # {(result set, path): distribution} for the fixed-learning series, keyed like the MC results
+    noak_params = noak_params or build_noak_parameters()
+    lcoe_params = lcoe_params or build_lcoe_parameters()
+    factors = {"nuclear": learning_factors(noak_params["deployment_nuclear"], lr_nuclear_ppf),
+               "wind": learning_factors(noak_params["deployment_wind"], lr_wind_ppf)}
+    distributions = {}
+    for j, year in enumerate(years):
+        year_label = f"Deployment {year}"
+        for mic_name in mic_scenarios:
+            noak = noak_distribution(factors["nuclear"][j], triangle(noak_params["occ_range_nuclear"]),
+                                     noak_params["mic_nuclear"][mic_name])
+            distributions["noak", (year_label, f"noak_fixed_{mic_name}")] = noak
+            distributions["lcoe", (year_label, "fixed", mic_name)] = nuclear_lcoe_distribution(on_grid(noak),
+                                                                                               lcoe_params)
+        noak = noak_distribution(factors["wind"][j], triangle(noak_params["occ_range_wind"]), noak_params["mic_wind"])
+        distributions["noak", (year_label, "noak_wind_fixed")] = noak
+        distributions["lcoe", (year_label, "fixed", "wind")] = wind_lcoe_distribution(on_grid(noak), lcoe_params)
+    return distributions
+
+
+def flr_quartiles(num_simulations=default_num_simulations, tolerance=default_tolerance, distributions=None):
+    # {"noak": ..., "lcoe": ...} nested like mc_stats.result_quartiles of the MC results
+    distributions = distributions or flr_distributions()
+    return {result_set: nest((path, expected_custom_quartiles(distribution, num_simulations, tolerance))
+                             for (name, path), distribution in distributions.items() if name == result_set)
+            for result_set in ["noak", "lcoe"]}
+
+
+# --- Accuracy against the Monte Carlo ---
+def monte_carlo_series(num_simulations, seed=42):
+    noak_results = run_scenario("noak", num_simulations, seed=seed)["noak_simulation_results_fixed_dynamic"]
+    lcoe_results = run_lcoe_on_noak(noak_results, build_lcoe_parameters(), seed)
+    return {"noak": dict(flatten_results(noak_results)), "lcoe": dict(flatten_results(lcoe_results))}
+
+
+def compare_with_monte_carlo(distributions, num_simulations, seed=42, tolerance=default_tolerance):
+    # (result set, path, relative differences of P25/P50/P75, relative differences of Q1/Q2/Q3);
+    # P25-P75 differences are the MC's sampling error, Q1/Q3 also carry its min/max scatter
+    series = monte_carlo_series(num_simulations, seed)
+    rows = []
+    for (result_set, path), distribution in sorted(distributions.items(), key=lambda item: item[0][0] != "noak"):
+        values = series[result_set][path]
+        exact = quantiles(distribution, probabilities, tolerance)
+        sampled = np.percentile(values, [100 * p for p in probabilities])
+        expected = expected_custom_quartiles(distribution, num_simulations, tolerance)
+        quartiles = mc_stats.custom_quartiles(values)
+        rows.append((result_set, path, (exact - sampled) / np.abs(sampled),
+                     [(a - q) / abs(q) for a, q in zip(expected, quartiles)]))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Semi-analytic NOAK and LCOE quartiles under fixed learning")
+    parser.add_argument("--num-simulations", type=int, default=default_num_simulations,
+                        help="sample size the expected min/max of Q1/Q3 refer to (and of the --compare run)")
+    parser.add_argument("--tolerance", type=float, default=default_tolerance,
+                        help="quantile bracket, as a fraction of the support width")
+    parser.add_argument("--compare", action="store_true", help="also run the Monte Carlo and show the differences")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    distributions = flr_distributions()
+    analytic = flr_quartiles(args.num_simulations, args.tolerance, distributions)
+    print(f"Semi-analytic quartiles in {(time.perf_counter() - start) * 1000:.0f} ms")
+    for result_set, quartiles_by_path in analytic.items():
+        for path, quartiles in flatten_results(quartiles_by_path):
+            print(f"{result_set:4s} {'/'.join(path):40s} " + " ".join(f"{q:10.2f}" for q in quartiles))
+
+    if args.compare:
+        print(f"\nRelative difference to a Monte Carlo run of {args.num_simulations} samples")
+        print(f"{'':45s} {'P25':>8s} {'P50':>8s} {'P75':>8s}   {'Q1':>8s} {'Q2':>8s} {'Q3':>8s}")
+        for result_set, path, percentile_differences, quartile_differences in compare_with_monte_carlo(
+                distributions, args.num_simulations, args.seed, args.tolerance):
+            print(f"{result_set:4s} {'/'.join(path):40s} " + " ".join(f"{d:+8.3%}" for d in percentile_differences)
+                  + "   " + " ".join(f"{d:+8.3%}" for d in quartile_differences))
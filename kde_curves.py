@@ -0,0 +1,136 @@
+import json
+import os
+import numpy as np
+from mc_stats import finite_values, nest
+from result_store import aggregates_suffix, flatten_results, has_results, load_results, store_suffix
+
+
+# --- Binned FFT kernel density estimates ---
+# The estimate sns.kdeplot draws by default (Gaussian kernel, Scott's bandwidth
+# std * n^(-1/5), grid_size points from min - cut * bw to max + cut * bw), computed by linearly
+# binning the samples onto fine_bins points and convolving with the kernel in one FFT:
+# O(n + fine_bins log fine_bins) per series instead of O(n * grid_size). Each curve also keeps
+# the sample min and max, so plot limits need no samples either.
+grid_size = 200
+cut = 3
+fine_bins = 4096
+
+
+def scott_bandwidth(data):
+    return np.std(data, ddof=1) * len(data) ** (-1 / 5)
+
+
+def binned_kde(data):
+    # Returns {"support", "density", "min", "max"} or None when the density is undefined
+    # (fewer than two samples or zero variance, where sns.kdeplot draws nothing either)
+    data = finite_values(data)
+    if len(data) < 2 or np.ptp(data) == 0:
+        return None
+    bw = scott_bandwidth(data)
+    low, high = data.min() - cut * bw, data.max() + cut * bw
+    delta = (high - low) / (fine_bins - 1)
+
+    position = (data - low) / delta
+    index = np.minimum(position.astype(np.int64), fine_bins - 2)
+    weight = position - index
+    counts = (np.bincount(index, 1 - weight, minlength=fine_bins)
+              + np.bincount(index + 1, weight, minlength=fine_bins))
+
+    offsets = np.arange(-(fine_bins - 1), fine_bins) * delta
+    kernel = np.exp(-0.5 * (offsets / bw) ** 2) / (bw * np.sqrt(2 * np.pi))
+    size = 1 << int(np.ceil(np.log2(len(counts) + len(kernel) - 1)))
+    convolved = np.fft.irfft(np.fft.rfft(counts, size) * np.fft.rfft(kernel, size), size)
+    fine_density = np.maximum(convolved[fine_bins - 1:2 * fine_bins - 1], 0) / len(data)
+
+    support = np.linspace(low, high, grid_size)
+    density = np.interp(support, np.linspace(low, high, fine_bins), fine_density)
+    return {"support": support, "density": density, "min": float(data.min()), "max": float(data.max())}
+
+
+def histogram_kde(aggregate):
+    # The same estimate from a fixed-bin histogram (streaming.SeriesAggregate) for runs that kept
+    # no samples: each bin's count sits at its centre, while the bandwidth and the support use the
+    # exact count, standard deviation, min and max the aggregate keeps. Samples in the under- or
+    # overflow are left out of the curve. Costs grid_size x filled bins.
+    count = aggregate.count
+    if count < 2 or aggregate.max == aggregate.min:
+        return None
+    bw = aggregate.std() * np.sqrt(count / (count - 1)) * count ** (-1 / 5)
+    support = np.linspace(aggregate.min - cut * bw, aggregate.max + cut * bw, grid_size)
+    filled = aggregate.counts > 0
+    centres = ((aggregate.edges[:-1] + aggregate.edges[1:]) / 2)[filled]
+    kernel = np.exp(-0.5 * ((support[:, None] - centres) / bw) ** 2)
+    density = kernel @ aggregate.counts[filled] / (count * bw * np.sqrt(2 * np.pi))
+    return {"support": support, "density": density, "min": float(aggregate.min), "max": float(aggregate.max)}
+
+
+def result_kde_curves(results):
+    # (path, curve) for every series of a result set
+    return [(path, binned_kde(values)) for path, values in flatten_results(results)]
+
+
+# --- Cache ---
+# Curves of a stored result set are kept in "<name>.store/kde.json", next to quartiles.json
+# (see mc_stats.py), and disappear with it when the store is rewritten.
+kde_filename = "kde.json"
+memory_cache = {}
+
+
+def curve_from_json(entry):
+    if entry["support"] is None:
+        return None
+    return {"support": np.linspace(*entry["support"], grid_size), "density": np.array(entry["density"]),
+            "min": entry["min"], "max": entry["max"]}
+
+
+def curve_to_json(path, curve):
+    if curve is None:
+        return {"path": list(path), "support": None}
+    return {"path": list(path), "support": [float(curve["support"][0]), float(curve["support"][-1])],
+            "density": curve["density"].tolist(), "min": curve["min"], "max": curve["max"]}
+
+
+def load_kde_curves(name):
+    cache_path = os.path.join(name + store_suffix, kde_filename)
+    if os.path.isfile(cache_path):
+        key = (cache_path, os.path.getmtime(cache_path))
+        if key not in memory_cache:
+            with open(cache_path) as f:
+                memory_cache[key] = nest((tuple(entry["path"]), curve_from_json(entry))
+                                         for entry in json.load(f)["series"])
+        return memory_cache[key]
+
+    if name in memory_cache:
+        return memory_cache[name]
+    if not has_results(name) and os.path.isfile(name + aggregates_suffix):
+        from streaming import load_aggregates
+        memory_cache[name] = nest((path, histogram_kde(aggregate))
+                                  for path, aggregate in flatten_results(load_aggregates(name)))
+        return memory_cache[name]
+    series = result_kde_curves(load_results(name))
+    curves = nest(series)
+    if os.path.isdir(name + store_suffix):
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"series": [curve_to_json(path, curve) for path, curve in series]}, f)
+        os.replace(tmp_path, cache_path)
+    else:
+        memory_cache[name] = curves
+    return curves
+
+
+# --- Drawing ---
+def draw_kde(ax, curve, color):
+    # Draws a stored curve the way sns.kdeplot(data, ax=ax, fill=True, color=color) draws its estimate
+    from matplotlib.colors import to_rgba
+
+    if curve is None:
+        return ax
+    artist = ax.fill_between(curve["support"], 0, curve["density"], facecolor=to_rgba(color, 0.25),
+                             edgecolor=to_rgba(color, 1))
+    artist.sticky_edges.x[:] = []
+    artist.sticky_edges.y[:] = (0, np.inf)
+    if not ax.get_ylabel():
+        # Hidden on axes whose tick labels are hidden by sharey, as seaborn does
+        ax.set_ylabel("Density", visible=any(label.get_visible() for label in ax.get_yticklabels()))
+    return ax
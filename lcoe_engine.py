@@ -0,0 +1,177 @@
+import numpy as np
+from atb_data import atb_index
+from noak_engine import years, mic_scenarios
+
+
+# --- Helper functions (element-wise, so they take scalars or whole arrays) ---
+def calc_crf(wacc, crp):
+    return wacc / (1 - (1 / (1 + wacc) ** crp))
+
+
+def calc_lcoe(crf, pff, cff, occ, fom, cf, vom=0, fuel=0):
+    return ((crf * pff * cff * occ + fom) * 1000 / (cf * 8760)) + vom + fuel
+
+
+# --- Input parameters (same sources as LCOE_sim_NOAK.py) ---
+def build_lcoe_parameters():
+    wacc_nuc = atb_index.get("Nuclear", "WACC", "Mod")
+    wacc_wind = atb_index.get("FOW-Class11", "WACC", "Mod")
+    return {
+        "crf_nuc": calc_crf(wacc_nuc, atb_index.get("Nuclear", "CRP", "Mod")),
+        "crf_wind": calc_crf(wacc_wind, atb_index.get("FOW-Class11", "CRP", "Mod")),
+        "pff_nuc": atb_index.get("Nuclear", "PFF", "Mod"),
+        "pff_wind": atb_index.get("FOW-Class11", "PFF", "Mod"),
+        "cff_wind": atb_index.get("FOW-Class11", "CFF", "Mod"),
+        "cf_nuclear": atb_index.get("Nuclear", "CF", "Mod"),
+        # triangular input ranges
+        "cff_range_nuclear": list(atb_index.get("Nuclear", "CFF")),
+        "fom_range_nuclear": list(atb_index.get("Nuclear", "FOM")),
+        "fom_range_wind": list(atb_index.get("FOW-Class11", "FOM")),
+        "cf_range_wind": list(atb_index.get("FOW-Class11", "CF")),
+        "vom_range_nuclear": list(atb_index.get("Nuclear", "VOM")),
+        "fuel_range_nuclear": list(atb_index.get("Nuclear", "Fuel")),
+    }
+
+
+def sample_lcoe_inputs(params, size, rng):
+    cf_range_wind = params["cf_range_wind"]
+    return {
+        "cff_nuc": rng.triangular(*params["cff_range_nuclear"], size),
+        "fom_nuc": rng.triangular(*params["fom_range_nuclear"], size),
+        "fom_wind": rng.triangular(*params["fom_range_wind"], size),
+        "vom_nuc": rng.triangular(*params["vom_range_nuclear"], size),
+        "fuel_nuc": rng.triangular(*params["fuel_range_nuclear"], size),
+        "cf_wind": rng.triangular(cf_range_wind[2], cf_range_wind[1], cf_range_wind[0], size),
+    }
+
+
+def lcoe_from_noak(noak_year, inputs, params):
+    # noak_year: one year of NOAK results ({"noak_fixed_premium": array, ...})
+    def lcoe_nuc(occ):
+        return calc_lcoe(params["crf_nuc"], params["pff_nuc"], inputs["cff_nuc"], np.asarray(occ), inputs["fom_nuc"],
+                         params["cf_nuclear"], inputs["vom_nuc"], inputs["fuel_nuc"])
+
+    def lcoe_wind(occ):
+        return calc_lcoe(params["crf_wind"], params["pff_wind"], params["cff_wind"], np.asarray(occ), inputs["fom_wind"],
+                         inputs["cf_wind"])
+
+    return {
+        "fixed": {
+            **{scenario: lcoe_nuc(noak_year[f"noak_fixed_{scenario}"]) for scenario in mic_scenarios},
+            "wind": lcoe_wind(noak_year["noak_wind_fixed"]),
+        },
+        "dynamic": {
+            **{scenario: lcoe_nuc(noak_year[f"noak_dynamic_{scenario}"]) for scenario in mic_scenarios},
+            "wind": lcoe_wind(noak_year["noak_wind_dynamic"]),
+        },
+    }
+
+
+def sample_lcoe_year_inputs(noak_results, params, rng):
+    # Uncertain LCOE inputs are drawn independently for every year, as in LCOE_sim_NOAK.py
+    return {f"Deployment {year}": sample_lcoe_inputs(params, len(noak_results[f"Deployment {year}"]["noak_wind_fixed"]), rng)
+            for year in years}
+
+
+def lcoe_from_year_inputs(noak_results, year_inputs, params):
+    return {year_label: lcoe_from_noak(noak_results[year_label], inputs, params)
+            for year_label, inputs in year_inputs.items()}
+
+
+def simulate_lcoe(noak_results, params, rng):
+    return lcoe_from_year_inputs(noak_results, sample_lcoe_year_inputs(noak_results, params, rng), params)
+
+
+# --- ESBWR / BWRX-300 LCOE (BWRX_comparison_montecarlo.py) ---
+def build_nuclear_smr_lcoe_parameters():
+    # The SMR is financed like large nuclear; its capacity factor is the ATB "Adv" value
+    wacc_nuc = atb_index.get("Nuclear", "WACC", "Mod")
+    return {
+        "crf_nuc": calc_crf(wacc_nuc, atb_index.get("Nuclear", "CRP", "Mod")),
+        "pff_nuc": atb_index.get("Nuclear", "PFF", "Mod"),
+        "cf_nuclear": atb_index.get("Nuclear", "CF", "Mod"),
+        "cf_smr": atb_index.get("SMR", "CF", "Adv"),
+        "cff_range_nuclear": list(atb_index.get("Nuclear", "CFF")),
+        "cff_range_smr": list(atb_index.get("SMR", "CFF")),
+        "fom_range_nuclear": list(atb_index.get("Nuclear", "FOM")),
+        "fom_range_smr": list(atb_index.get("SMR", "FOM")),
+        "vom_range_nuclear": list(atb_index.get("Nuclear", "VOM")),
+        "vom_range_smr": list(atb_index.get("SMR", "VOM")),
+        "fuel_range_nuclear": list(atb_index.get("Nuclear", "Fuel")),
+        "fuel_range_smr": list(atb_index.get("SMR", "Fuel")),
+    }
+
+
+def sample_nuclear_smr_lcoe_inputs(params, size, rng):
+    return {
+        f"{field}_{prefix}": rng.triangular(*params[f"{field}_range_{tech}"], size)
+        for field in ["cff", "fom", "vom", "fuel"]
+        for prefix, tech in [("nuc", "nuclear"), ("smr", "smr")]
+    }
+
+
+def lcoe_nuclear_smr(occ, prefix, inputs, params):
+    cf = params["cf_nuclear"] if prefix == "nuc" else params["cf_smr"]
+    return calc_lcoe(params["crf_nuc"], params["pff_nuc"], inputs[f"cff_{prefix}"], np.asarray(occ),
+                     inputs[f"fom_{prefix}"], cf, inputs[f"vom_{prefix}"], inputs[f"fuel_{prefix}"])
+
+
+def sample_nuclear_smr_lcoe_year_inputs(noak_results, params, rng):
+    return {f"Deployment {year}": sample_nuclear_smr_lcoe_inputs(
+                params, len(noak_results[f"Deployment {year}"]["nuc_noak_fixed_premium"]), rng)
+            for year in years}
+
+
+def nuclear_smr_lcoe_from_year_inputs(noak_results, year_inputs, params):
+    lcoe_results = {}
+    for year_label, inputs in year_inputs.items():
+        noak_year = noak_results[year_label]
+        lcoe_results[year_label] = {
+            f"{prefix}_lcoe_{learning}_{scenario}":
+                lcoe_nuclear_smr(noak_year[f"{prefix}_noak_{learning}_{scenario}"], prefix, inputs, params)
+            for prefix in ["nuc", "smr"]
+            for scenario in mic_scenarios
+            for learning in ["fixed", "dynamic"]
+        }
+    return lcoe_results
+
+
+def simulate_nuclear_smr_lcoe(noak_results, params, rng):
+    return nuclear_smr_lcoe_from_year_inputs(
+        noak_results, sample_nuclear_smr_lcoe_year_inputs(noak_results, params, rng), params)
+
+
+# --- Classical learning-curve benchmark LCOE (benchmark_sim.py) ---
+def build_benchmark_lcoe_parameters():
+    return {**build_lcoe_parameters(), **build_nuclear_smr_lcoe_parameters()}
+
+
+def sample_benchmark_lcoe_year_inputs(benchmark_results, params, rng):
+    # benchmark_results is keyed by plain year strings, the LCOE output by "Deployment <year>"
+    year_inputs = {}
+    for year in years:
+        size = len(benchmark_results[str(year)]["noak_nuclear"])
+        inputs = sample_nuclear_smr_lcoe_inputs(params, size, rng)
+        cf_range_wind = params["cf_range_wind"]
+        inputs["fom_wind"] = rng.triangular(*params["fom_range_wind"], size)
+        inputs["cf_wind"] = rng.triangular(cf_range_wind[2], cf_range_wind[1], cf_range_wind[0], size)
+        year_inputs[f"Deployment {year}"] = inputs
+    return year_inputs
+
+
+def benchmark_lcoe_from_year_inputs(benchmark_results, year_inputs, params):
+    lcoe_results = {}
+    for year_label, inputs in year_inputs.items():
+        noak_year = benchmark_results[year_label.split()[-1]]
+        lcoe_results[year_label] = {
+            "lcoe_nuc": lcoe_nuclear_smr(noak_year["noak_nuclear"], "nuc", inputs, params),
+            "lcoe_smr": lcoe_nuclear_smr(noak_year["noak_smr"], "smr", inputs, params),
+            "lcoe_wind": calc_lcoe(params["crf_wind"], params["pff_wind"], params["cff_wind"],
+                                   np.asarray(noak_year["noak_wind"]), inputs["fom_wind"], inputs["cf_wind"]),
+        }
+    return lcoe_results
+
+
+def simulate_benchmark_lcoe(benchmark_results, params, rng):
+    return benchmark_lcoe_from_year_inputs(
+        benchmark_results, sample_benchmark_lcoe_year_inputs(benchmark_results, params, rng), params)
@@ -3,15 +3,9 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import os
 from matplotlib.lines import Line2D
+from material_data import material_and_OCC_data
 
 
-material_and_OCC_data = {
-    "Project": ["PWR","ABWR","ESBWR","EPR","Flamanville 3", "Vogtle 3&4", "Hinkley Point C", "Barakah", "Olkiluoto 3", "Sizewell B", "Floating Offshore Wind"],
-    "Capacity_per_unit_MW": [1000, 1380, 1500, 1600, 1650, 1100, 1600, 1400, 1600, 1345, 450],
-    "Material_cost_with_nuclear_premium": [297.92, 399.42, 270.21, 381.31, 359.95, 402.56, 735.77, 523.62, 319.65, 589.66, None],
-    "Material_cost_wo_nuclear_premium": [144.92, 199.61, 131.66, 189.93, 196.19, 214.29, 386.47, 283.79, 166.03, 317.87, None],
-    "Material_cost_market_price": [74.33, 110.61, 67.87, 104.30, 133.33, 138.54, 242.50, 190.64, 101.50, 211.15, 1700],
-}
 df_manual = pd.DataFrame(material_and_OCC_data)
 
 # --- Group definitions ---
@@ -68,9 +62,6 @@ def plot_group(df_group, group_name):
     plt.savefig(f"material_input_plots/material_cost_range_{group_name.replace(' ', '_').lower()}.pdf", format="pdf")
     plt.close()
 
-plot_group(group_1, "Group 1 - Standard Reactors")
-plot_group(group_2, "Group 2 - Other Reactors")
-
 # --- Print stats---
 def print_median_and_std(label, series):
     clean_data = pd.to_numeric(series, errors='coerce').dropna()
@@ -80,10 +71,6 @@ def print_median_and_std(label, series):
     print(f"  Median: {median:.2f} $/kW")
     print(f"  Std Dev: {std_dev:.2f} $/kW\n")
 
-print_median_and_std("With Nuclear Premium", df_manual["Material_cost_with_nuclear_premium"][:-1])
-print_median_and_std("Without Nuclear Premium", df_manual["Material_cost_wo_nuclear_premium"][:-1])
-print_median_and_std("Market Price", df_manual["Material_cost_market_price"][:-1])
-
 # --- Median + Std bar plot ---
 df_non_wind = df_manual[df_manual["Project"] != "Floating Offshore Wind"]
 
@@ -133,5 +120,13 @@ def plot_median_range(stats, output_dir="material_input_plots"):
     plt.close()
 
 
-material_stats = compute_median_and_std(df_non_wind)
-plot_median_range(material_stats)
+if __name__ == "__main__":
+    plot_group(group_1, "Group 1 - Standard Reactors")
+    plot_group(group_2, "Group 2 - Other Reactors")
+
+    print_median_and_std("With Nuclear Premium", df_manual["Material_cost_with_nuclear_premium"][:-1])
+    print_median_and_std("Without Nuclear Premium", df_manual["Material_cost_wo_nuclear_premium"][:-1])
+    print_median_and_std("Market Price", df_manual["Material_cost_market_price"][:-1])
+
+    material_stats = compute_median_and_std(df_non_wind)
+    plot_median_range(material_stats)
@@ -0,0 +1,367 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from parallel_runner import default_block_size
+from run_report import git_revision, read_report
+
+
+# --- Pipeline ---
+# Every script is a stage with the artifacts it reads and writes. A stage reruns only when one of
+# its outputs is missing or the fingerprint of its inputs changed since its last successful run:
+# its input artifacts, the source of the script and of every local module it imports, and the
+# options that change its samples. Stages run as subprocesses, as soon as the stages producing
+# their inputs are done, so independent branches (nuclear/wind, ESBWR/BWRX, benchmark) run
+# side by side. Each stage's output goes to .pipeline_logs/<stage>.log.
+# After a run, run_report.json lists every stage's status and, for the stages that ran, the wall
+# time, CPU time and peak RSS of its process tree together with the script's own stage report
+# (run_report.py), tagged with the git revision so throughput can be compared between versions.
+state_path = ".pipeline_state.json"
+log_directory = ".pipeline_logs"
+run_report_path = "run_report.json"
+
+stages = {
+    # ESBWR / BWRX-300 branch
+    "bwrx_comparison": {
+        "script": "BWRX_comparison.py",
+        "inputs": [],
+        "outputs": ["comparison_data.pkl", "material_input_plots/material_cost_range_esbwr_bwrs_updated.pdf",
+                    "material_input_plots/installation_cost_range_esbwr_bwrs_updated.pdf"],
+    },
+    "bwrx_montecarlo": {
+        "script": "BWRX_comparison_montecarlo.py",
+        "simulation": True,
+        "inputs": ["comparison_data.pkl"],
+        "outputs": ["noak_simulation_results_nuclear_smr.store", "lcoe_simulation_results_nuclear_smr.store"],
+    },
+    "bwrx_hist_plot": {
+        "script": "BWRX_comparison_mc_hist_plot.py",
+        "inputs": ["noak_simulation_results_nuclear_smr.store", "lcoe_simulation_results_nuclear_smr.store"],
+        "outputs": ["hist_plots_smr_noak", "hist_plots_smr_lcoe"],
+    },
+    "bwrx_range_plot": {
+        "script": "BWRX_comparison_mc_range_plot.py",
+        "inputs": ["noak_simulation_results_nuclear_smr.store", "lcoe_simulation_results_nuclear_smr.store"],
+        "outputs": ["range_plots_smr_noak", "range_plots_smr_lcoe"],
+    },
+    # Nuclear / wind branch
+    "noak_mcsim": {
+        "script": "NOAK_mcsim_with_deployment.py",
+        "simulation": True,
+        "inputs": [],
+        "outputs": ["noak_simulation_results_fixed_dynamic.store"],
+    },
+    "lcoe_sim": {
+        "script": "LCOE_sim_NOAK.py",
+        "inputs": ["noak_simulation_results_fixed_dynamic.store"],
+        "outputs": ["lcoe_simulation_results_fixed_dynamic.store"],
+    },
+    "noak_hist_plot": {
+        "script": "NOAK_mcsim_with_deployment_hist_plot.py",
+        "inputs": ["noak_simulation_results_fixed_dynamic.store"],
+        "outputs": ["hist_plots"],
+    },
+    "noak_range_plot": {
+        "script": "NOAK_mcsim_with_deployment_range_plot.py",
+        "inputs": ["noak_simulation_results_fixed_dynamic.store"],
+        "outputs": ["bar_plots"],
+    },
+    "lcoe_hist_plot": {
+        "script": "LCOE_sim_NOAK_hist_plot.py",
+        "inputs": ["lcoe_simulation_results_fixed_dynamic.store"],
+        "outputs": ["hist_plots_lcoe"],
+    },
+    "lcoe_range_plot": {
+        "script": "LCOE_sim_NOAK_range_plot.py",
+        "inputs": ["lcoe_simulation_results_fixed_dynamic.store"],
+        "outputs": ["range_plots_LCOE"],
+    },
+    # Benchmark branch
+    "benchmark_sim": {
+        "script": "benchmark_sim.py",
+        "simulation": True,
+        "inputs": [],
+        "outputs": ["benchmark_simulation_results.store", "benchmark_lcoe_simulation_results.store"],
+    },
+    "benchmark": {
+        "script": "benchmark.py",
+        "inputs": ["benchmark_simulation_results.store", "noak_simulation_results_fixed_dynamic.store"],
+        "outputs": ["deterministic_noak.pkl", "deterministic_lcoe.pkl", "benchmark_comparison"],
+    },
+    # Summaries (printed, see their logs)
+    "summary_noak": {
+        "script": "summary_noak.py",
+        "inputs": ["noak_simulation_results_fixed_dynamic.store", "benchmark_simulation_results.store",
+                   "noak_simulation_results_nuclear_smr.store", "deterministic_noak.pkl"],
+        "outputs": [],
+    },
+    "summary_lcoe": {
+        "script": "summary_lcoe.py",
+        "inputs": ["lcoe_simulation_results_fixed_dynamic.store", "benchmark_lcoe_simulation_results.store",
+                   "lcoe_simulation_results_nuclear_smr.store", "deterministic_lcoe.pkl"],
+        "outputs": [],
+    },
+    # Material input plots
+    "lowest_noak_comparison_plot": {
+        "script": "lowest_NOAK_comparison_plot.py",
+        "inputs": [],
+        "outputs": ["material_input_plots/material_cost_median_std_ranges_refined.pdf"],
+    },
+    "offshore_wind_plot": {
+        "script": "offshore_wind_learning_and_distance_from_shore.py",
+        "inputs": [],
+        "outputs": ["material_input_plots/mic_fow_piechart.pdf"],
+    },
+}
+
+
+def producers():
+    return {output: name for name, stage in stages.items() for output in stage["outputs"]}
+
+
+def upstream(name):
+    produced_by = producers()
+    return sorted({produced_by[path] for path in stages[name]["inputs"] if path in produced_by})
+
+
+def with_upstream(names):
+    selected = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(upstream(name))
+    return selected
+
+
+def stage_command(name, options):
+    command = [sys.executable, stages[name]["script"]]
+    if stages[name].get("simulation"):
+        command += ["--num-simulations", str(options["num_simulations"]), "--block-size", str(options["block_size"]),
+                    "--workers", str(options["workers"])]
+    return command
+
+
+def stage_options(name, options):
+    # Options that change a stage's samples; --workers does not (see parallel_runner.py)
+    if stages[name].get("simulation"):
+        return {"num_simulations": options["num_simulations"], "block_size": options["block_size"]}
+    return {}
+
+
+# --- Fingerprints ---
+# File digests are remembered by (size, mtime) so unchanged result stores are not re-read.
+def local_modules(script, found=None):
+    # The script and every module of this directory it imports, recursively
+    found = set() if found is None else found
+    if script in found or not os.path.isfile(script):
+        return found
+    found.add(script)
+    with open(script) as f:
+        tree = ast.parse(f.read(), script)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules = [node.module]
+        else:
+            continue
+        for module in modules:
+            local_modules(module.split(".")[0] + ".py", found)
+    return found
+
+
+def file_digest(path, digests):
+    stat = os.stat(path)
+    known = digests.get(path)
+    if known is not None and known[:2] == [stat.st_size, stat.st_mtime_ns]:
+        return known[2]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 22), b""):
+            h.update(chunk)
+    digests[path] = [stat.st_size, stat.st_mtime_ns, h.hexdigest()]
+    return digests[path][2]
+
+
+def artifact_files(path):
+    # A result store is its manifest and the series it lists; derived caches kept next to them
+    # (e.g. quartiles.json) are written by readers and do not count
+    manifest_path = os.path.join(path, "manifest.json")
+    if os.path.isfile(manifest_path):
+        with open(manifest_path) as f:
+            return [manifest_path] + [os.path.join(path, entry["file"]) for entry in json.load(f)["series"]]
+    if os.path.isdir(path):
+        return sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+    return [path]
+
+
+def fingerprint(name, options, digests):
+    stage = stages[name]
+    h = hashlib.sha256(json.dumps(stage_options(name, options), sort_keys=True).encode())
+    for path in sorted(local_modules(stage["script"])) + stage["inputs"]:
+        if not os.path.exists(path):
+            return None
+        for file_path in artifact_files(path):
+            h.update(file_path.encode())
+            h.update(file_digest(file_path, digests).encode())
+    return h.hexdigest()
+
+
+def read_state():
+    if not os.path.isfile(state_path):
+        return {"stages": {}, "digests": {}}
+    with open(state_path) as f:
+        return json.load(f)
+
+
+def write_state(state):
+    with open(state_path + ".tmp", "w") as f:
+        json.dump(state, f, indent=1)
+    os.replace(state_path + ".tmp", state_path)
+
+
+def is_stale(name, state, options):
+    if any(not os.path.exists(path) for path in stages[name]["outputs"]):
+        return True
+    current = fingerprint(name, options, state["digests"])
+    return current is None or state["stages"].get(name) != current
+
+
+# --- Runner ---
+def run_stage(name, options):
+    # wait4 reports the usage of this stage's process and the worker processes it reaped, even
+    # while other stages run side by side
+    os.makedirs(log_directory, exist_ok=True)
+    env = dict(os.environ)
+    env.setdefault("MPLBACKEND", "Agg")
+    start = time.perf_counter()
+    with open(os.path.join(log_directory, name + ".log"), "w") as log:
+        process = subprocess.Popen(stage_command(name, options), stdout=log, stderr=subprocess.STDOUT, env=env)
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    return {
+        "returncode": process.returncode,
+        "wall_seconds": time.perf_counter() - start,
+        "cpu_seconds": usage.ru_utime + usage.ru_stime,
+        "peak_rss_bytes": usage.ru_maxrss * 1024,
+    }
+
+
+def write_run_report(status, usage, options):
+    report = {"finished": time.time(), "git_revision": git_revision(), "options": options, "stages": {}}
+    for name in topological_order(status):
+        entry = {"status": status[name]}
+        if name in usage:
+            entry.update(usage[name])
+            script_report = read_report(os.path.splitext(stages[name]["script"])[0])
+            # Only a report the script wrote during this run
+            if script_report is not None and script_report["finished"] >= usage[name]["started"]:
+                entry["script_report"] = script_report
+        report["stages"][name] = entry
+    with open(run_report_path + ".tmp", "w") as f:
+        json.dump(report, f, indent=1)
+    os.replace(run_report_path + ".tmp", run_report_path)
+
+
+def run_pipeline(targets=None, options=None, jobs=1, force=False, dry_run=False):
+    # Returns {stage: "ran" | "up to date" | "failed" | "skipped"}
+    selected = with_upstream(targets or stages)
+    state = read_state()
+    status = {}
+    if dry_run:
+        # Without running anything, every stage downstream of a stale stage is also out of date
+        for name in topological_order(selected):
+            stale = force or is_stale(name, state, options) or any(status[up] == "would run" for up in upstream(name))
+            status[name] = "would run" if stale else "up to date"
+        return status
+
+    running = {}
+    usage = {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while len(status) < len(selected):
+            for name in sorted(selected - set(status) - set(running.values())):
+                ups = upstream(name)
+                if any(status.get(up) in ("failed", "skipped") for up in ups):
+                    status[name] = "skipped"
+                    print(f"[skip] {name}: upstream stage failed")
+                elif all(up in status for up in ups) and len(running) < jobs:
+                    if not force and not is_stale(name, state, options):
+                        status[name] = "up to date"
+                        print(f"[ok]   {name}")
+                        continue
+                    print(f"[run]  {name}")
+                    usage[name] = {"started": time.time()}
+                    running[executor.submit(run_stage, name, options)] = name
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                usage[name].update(future.result())
+                if usage[name]["returncode"] == 0:
+                    status[name] = "ran"
+                    state["stages"][name] = fingerprint(name, options, state["digests"])
+                    print(f"[done] {name}")
+                else:
+                    status[name] = "failed"
+                    state["stages"].pop(name, None)
+                    print(f"[fail] {name}: see {os.path.join(log_directory, name + '.log')}")
+                write_state(state)
+    write_state(state)
+    write_run_report(status, usage, options)
+    return status
+
+
+def topological_order(names):
+    order = []
+    visited = set()
+
+    def visit(name):
+        if name in visited:
+            return
+        visited.add(name)
+        for up in upstream(name):
+            visit(up)
+        order.append(name)
+
+    for name in sorted(names):
+        visit(name)
+    return order
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the simulation, plot and summary scripts as a pipeline")
+    parser.add_argument("targets", nargs="*", help="stages to bring up to date, with everything upstream (default: all)")
+    parser.add_argument("--num-simulations", type=int, default=10000)
+    parser.add_argument("--block-size", type=int, default=default_block_size)
+    parser.add_argument("--workers", type=int, default=1, help="processes per simulation stage")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="stages run at the same time")
+    parser.add_argument("--force", action="store_true", help="rerun the selected stages even if up to date")
+    parser.add_argument("--dry-run", action="store_true", help="only show which stages would run")
+    parser.add_argument("--list", action="store_true", help="show the stages and their inputs and outputs")
+    args = parser.parse_args()
+    unknown = [name for name in args.targets if name not in stages]
+    if unknown:
+        parser.error(f"unknown stages {unknown}; see --list")
+
+    if args.list:
+        for name in topological_order(stages):
+            print(f"{name} ({stages[name]['script']})")
+            print(f"  after:   {', '.join(upstream(name)) or '-'}")
+            print(f"  outputs: {', '.join(stages[name]['outputs']) or '(log only)'}")
+        sys.exit(0)
+
+    options = {"num_simulations": args.num_simulations, "block_size": args.block_size, "workers": args.workers}
+    status = run_pipeline(args.targets, options, jobs=max(1, args.jobs), force=args.force, dry_run=args.dry_run)
+    if args.dry_run:
+        for name, state in status.items():
+            print(f"{state:10s} {name}")
+    failed = [name for name, state in status.items() if state in ("failed", "skipped")]
+    sys.exit(1 if failed else 0)
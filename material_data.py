@@ -0,0 +1,24 @@
+import numpy as np
+
+
+# --- Material input costs (MIC) per project, $/kW ---
+# Plain columns with no import-time work, so the simulation engines can read them without pandas
+# or matplotlib. The last row is the floating offshore wind reference; lowest_NOAK_comparison_plot.py
+# plots the reactor rows.
+material_and_OCC_data = {
+    "Project": ["PWR","ABWR","ESBWR","EPR","Flamanville 3", "Vogtle 3&4", "Hinkley Point C", "Barakah", "Olkiluoto 3", "Sizewell B", "Floating Offshore Wind"],
+    "Capacity_per_unit_MW": [1000, 1380, 1500, 1600, 1650, 1100, 1600, 1400, 1600, 1345, 450],
+    "Material_cost_with_nuclear_premium": [297.92, 399.42, 270.21, 381.31, 359.95, 402.56, 735.77, 523.62, 319.65, 589.66, None],
+    "Material_cost_wo_nuclear_premium": [144.92, 199.61, 131.66, 189.93, 196.19, 214.29, 386.47, 283.79, 166.03, 317.87, None],
+    "Material_cost_market_price": [74.33, 110.61, 67.87, 104.30, 133.33, 138.54, 242.50, 190.64, 101.50, 211.15, 1700],
+}
+
+
+def nuclear_values(column):
+    # Reactor rows of a column with missing entries dropped
+    values = np.array([np.nan if v is None else v for v in material_and_OCC_data[column][:-1]], dtype=float)
+    return values[np.isfinite(values)]
+
+
+def wind_value(column):
+    return float(material_and_OCC_data[column][-1])
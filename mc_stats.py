@@ -0,0 +1,118 @@
+import json
+import os
+import numpy as np
+from run_report import count
+from result_store import aggregates_suffix, flatten_results, has_results, load_results, store_suffix
+
+
+# --- Custom quartiles ---
+# Q1 = (min + P25) / 2, Q2 = median, Q3 = (P75 + max) / 2 over the finite samples of a series.
+def finite_values(data):
+    data = np.asarray(data, dtype=float)
+    return data[np.isfinite(data)]
+
+
+def custom_quartiles(data):
+    size = np.size(data)
+    data = finite_values(data)
+    count("quartile_nonfinite_dropped", size - len(data))
+    if len(data) == 0:
+        return None, None, None
+    p25, median, p75 = np.percentile(data, [25, 50, 75])
+    return (data.min() + p25) / 2, median, (p75 + data.max()) / 2
+
+
+def clean_and_quartiles(data):
+    data = finite_values(data)
+    return (data,) + custom_quartiles(data)
+
+
+# --- Batched quartiles over a whole result set ---
+# Series of equal length are stacked and reduced with one np.percentile call per batch;
+# batch_elements bounds the size of a stacked batch (8 bytes per element).
+batch_elements = 50000000
+
+
+def stacked_quartiles(series):
+    series = [np.asarray(values, dtype=float) for values in series]
+    quartiles = [None] * len(series)
+    by_length = {}
+    for i, values in enumerate(series):
+        by_length.setdefault(len(values), []).append(i)
+
+    for length, indices in by_length.items():
+        if length == 0:
+            for i in indices:
+                quartiles[i] = (None, None, None)
+            continue
+        rows = max(1, batch_elements // length)
+        for batch_start in range(0, len(indices), rows):
+            batch = np.array(indices[batch_start:batch_start + rows])
+            stack = np.stack([series[i] for i in batch])
+            finite_rows = np.isfinite(stack).all(axis=1)
+            if finite_rows.any():
+                finite_stack = stack[finite_rows]
+                p25, median, p75 = np.percentile(finite_stack, [25, 50, 75], axis=1)
+                q1 = (finite_stack.min(axis=1) + p25) / 2
+                q3 = (p75 + finite_stack.max(axis=1)) / 2
+                for row, i in enumerate(batch[finite_rows]):
+                    quartiles[i] = (float(q1[row]), float(median[row]), float(q3[row]))
+            # Series with NaN/inf samples are cleaned and reduced one by one
+            for i in batch[~finite_rows]:
+                quartiles[i] = custom_quartiles(series[i])
+    return quartiles
+
+
+def result_quartiles(results):
+    # Same nesting as results, with a (q1, q2, q3) tuple in place of every series
+    paths, series = zip(*flatten_results(results)) if results else ((), ())
+    return nest(zip(paths, stacked_quartiles(series)))
+
+
+def nest(items):
+    nested = {}
+    for path, value in items:
+        node = nested
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = value
+    return nested
+
+
+# --- Cache ---
+# Quartiles of a stored result set are kept in "<name>.store/quartiles.json"; write_store
+# replaces the whole directory, so a re-run simulation drops its stale quartiles with it.
+# Legacy pickles are only cached for the lifetime of the process.
+quartiles_filename = "quartiles.json"
+memory_cache = {}
+
+
+def load_quartiles(name):
+    cache_path = os.path.join(name + store_suffix, quartiles_filename)
+    if os.path.isfile(cache_path):
+        key = (cache_path, os.path.getmtime(cache_path))
+        if key not in memory_cache:
+            with open(cache_path) as f:
+                memory_cache[key] = nest((tuple(entry["path"]), tuple(entry["quartiles"]))
+                                         for entry in json.load(f)["series"])
+        return memory_cache[key]
+
+    if name in memory_cache:
+        return memory_cache[name]
+    if not has_results(name) and os.path.isfile(name + aggregates_suffix):
+        # Histogram-only run: quartiles interpolated in the merged histograms (see streaming.py)
+        from streaming import load_aggregates
+        memory_cache[name] = nest((path, aggregate.custom_quartiles())
+                                  for path, aggregate in flatten_results(load_aggregates(name)))
+        return memory_cache[name]
+    quartiles = result_quartiles(load_results(name))
+    if os.path.isdir(name + store_suffix):
+        # Written aside and renamed: scripts run side by side by main.py may read the same store
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"series": [{"path": list(path), "quartiles": list(value)}
+                                  for path, value in flatten_results(quartiles)]}, f, indent=1)
+        os.replace(tmp_path, cache_path)
+    else:
+        memory_cache[name] = quartiles
+    return quartiles
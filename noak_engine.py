@@ -0,0 +1,334 @@
+import pickle
+import warnings
+import numpy as np
+from atb_data import atb_index
+from deployment_sampler import deployment_quantiles, monotone_trajectories_from_uniforms, triangular_ppf
+from material_data import nuclear_values, wind_value
+
+
+years = [2030, 2035, 2040, 2045, 2050]
+mic_scenarios = ["premium", "no_premium", "market_price"]
+
+
+# --- Input parameters (same sources as NOAK_mcsim_with_deployment.py) ---
+def build_noak_parameters():
+    # --- Nuclear Material Costs ---
+    premium = nuclear_values("Material_cost_with_nuclear_premium")
+    no_premium = nuclear_values("Material_cost_wo_nuclear_premium")
+    market = nuclear_values("Material_cost_market_price")
+
+    # --- Wind Material Costs ---
+    median_mc_wind = wind_value("Material_cost_market_price")
+
+    return {
+        "mic_nuclear": {
+            "premium": (np.median(premium), np.std(premium)),
+            "no_premium": (np.median(no_premium), np.std(no_premium)),
+            "market_price": (np.median(market), np.std(market)),
+        },
+        "mic_wind": (median_mc_wind, 0.35 * median_mc_wind),
+        "occ_range_nuclear": list(atb_index.get("Nuclear", "OCC + GCC")),
+        "occ_range_wind": list(atb_index.get("FOW-Class11", "OCC + GCC")),
+        "deployment_nuclear": deployment_quantiles("Nuclear", years),
+        "deployment_wind": deployment_quantiles("FOW-Class11", years),
+    }
+
+
+# --- Samplers (one array per input, shape (size,)) ---
+def sample_lr_nuclear(rng, size):
+    return rng.triangular(0.05, 0.10, 0.15, size)
+
+
+def sample_lr_wind(rng, size):
+    return rng.beta(5, 10, size) * 0.3
+
+
+def sample_occ_initial(rng, occ_range, size):
+    return rng.triangular(min(occ_range), occ_range[1], max(occ_range), size)
+
+
+def compute_b(lr):
+    return np.log(1 - lr) / np.log(2)
+
+
+def sample_noak_inputs(params, size, rng):
+    mic_nuclear = params["mic_nuclear"]
+    return {
+        # --- Initial OCC ---
+        "occ_nuclear": sample_occ_initial(rng, params["occ_range_nuclear"], size),
+        "occ_wind": sample_occ_initial(rng, params["occ_range_wind"], size),
+        # --- MICs, one row per scenario ---
+        "mic_nuclear": np.stack([rng.normal(*mic_nuclear[name], size) for name in mic_scenarios]),
+        "mic_wind": rng.normal(*params["mic_wind"], size),
+        # --- Learning rates ---
+        "lr_nuclear": sample_lr_nuclear(rng, size),
+        "lr_wind": sample_lr_wind(rng, size),
+        # --- Deployments ---
+        "deployment_nuclear": monotone_trajectories_from_uniforms(rng.random((size, len(years))), params["deployment_nuclear"]),
+        "deployment_wind": monotone_trajectories_from_uniforms(rng.random((size, len(years))), params["deployment_wind"]),
+    }
+
+
+# --- Quasi-Monte Carlo and antithetic samplers ---
+# Every input dimension (one per scalar input, one per deployment year) is a column of a uniform
+# design, pushed through the inverse CDF of its marginal. The scalar inputs come first, where Sobol
+# points are most uniform. Each block builds its own design from its stream, so blocks are
+# independent replicates (see parallel_runner.scenarios). "antithetic" pairs every pseudo-random
+# row u with 1 - u in the next row: each input, and each deployment year, moves to the opposite
+# tail, so a pair averages out most of the spread of outputs that are monotone in the inputs.
+# Pairs are rows (2i, 2i + 1) of a block, so an even block size keeps them aligned across blocks.
+qmc_methods = ["sobol", "lhs"]
+design_methods = qmc_methods + ["antithetic"]
+qmc_edge = 2.0 ** -53  # keeps the normal and beta inverse CDFs finite at u = 0
+
+
+def design_uniforms(method, size, dimensions, rng):
+    from scipy.stats import qmc
+    if method == "sobol":
+        with warnings.catch_warnings():
+            # Sobol balance needs n = 2^m; a decimal block size only loses a little uniformity
+            warnings.simplefilter("ignore", UserWarning)
+            u = qmc.Sobol(dimensions, scramble=True, rng=rng).random(size)
+    elif method == "lhs":
+        u = qmc.LatinHypercube(dimensions, rng=rng).random(size)
+    elif method == "antithetic":
+        half = rng.random(((size + 1) // 2, dimensions))
+        u = np.empty((2 * len(half), dimensions))
+        u[0::2], u[1::2] = half, 1 - half
+        u = u[:size]
+    elif method == "random":
+        u = rng.random((size, dimensions))
+    else:
+        raise ValueError(f"Unknown sampling method {method!r}; expected random or one of {design_methods}")
+    return np.clip(u, qmc_edge, 1 - qmc_edge)
+
+
+def normal_ppf(u, mean, std):
+    from scipy.special import ndtri
+    return mean + std * ndtri(u)
+
+
+def lr_nuclear_ppf(u):
+    return triangular_ppf(u, 0.05, 0.10, 0.15)
+
+
+def lr_wind_ppf(u):
+    from scipy.special import betaincinv
+    return betaincinv(5, 10, u) * 0.3
+
+
+def occ_initial_ppf(u, occ_range):
+    return triangular_ppf(u, min(occ_range), occ_range[1], max(occ_range))
+
+
+def sample_noak_inputs_qmc(params, size, rng, method="sobol"):
+    # Same inputs as sample_noak_inputs; columns 0-7 scalar inputs, then the deployment years
+    n_years = len(years)
+    u = design_uniforms(method, size, 8 + 2 * n_years, rng)
+    mic_nuclear = params["mic_nuclear"]
+    return {
+        "occ_nuclear": occ_initial_ppf(u[:, 0], params["occ_range_nuclear"]),
+        "occ_wind": occ_initial_ppf(u[:, 1], params["occ_range_wind"]),
+        "mic_nuclear": np.stack([normal_ppf(u[:, 2 + k], *mic_nuclear[name]) for k, name in enumerate(mic_scenarios)]),
+        "mic_wind": normal_ppf(u[:, 5], *params["mic_wind"]),
+        "lr_nuclear": lr_nuclear_ppf(u[:, 6]),
+        "lr_wind": lr_wind_ppf(u[:, 7]),
+        "deployment_nuclear": monotone_trajectories_from_uniforms(u[:, 8:8 + n_years], params["deployment_nuclear"]),
+        "deployment_wind": monotone_trajectories_from_uniforms(u[:, 8 + n_years:], params["deployment_wind"]),
+    }
+
+
+# --- FLR / OWLR recurrences over the year axis ---
+def learning_trajectories(occ_initial, mic, lr, deployments):
+    # occ_initial, lr: (n,); mic: (n,) or (k, n); deployments: (n, n_years)
+    # Returns fixed and dynamic NOAK as (n_years, *mic.shape)
+    n_years = deployments.shape[1]
+    b_fixed = compute_b(lr)
+
+    overhead_fixed = occ_initial - mic
+    overhead_dynamic = overhead_fixed.copy()
+    occ_prev_dynamic = np.broadcast_to(occ_initial, overhead_fixed.shape)
+    N_prev = 1.0
+
+    noak_fixed = np.empty((n_years,) + overhead_fixed.shape)
+    noak_dynamic = np.empty((n_years,) + overhead_fixed.shape)
+    for j in range(n_years):
+        N_curr = deployments[:, j]
+        ratio = N_curr / N_prev
+
+        # Fixed Learning
+        overhead_fixed = overhead_fixed * ratio ** b_fixed
+        noak_fixed[j] = mic + overhead_fixed
+
+        # Dynamic Learning
+        lr_dynamic = np.minimum(0.99, lr * (1 + overhead_dynamic / occ_prev_dynamic))
+        overhead_dynamic = overhead_dynamic * ratio ** compute_b(lr_dynamic)
+        noak_dynamic[j] = mic + overhead_dynamic
+
+        occ_prev_dynamic = noak_dynamic[j]
+        N_prev = N_curr
+    return noak_fixed, noak_dynamic
+
+
+def simulate_noak(inputs):
+    nuc_fixed, nuc_dynamic = learning_trajectories(
+        inputs["occ_nuclear"], inputs["mic_nuclear"], inputs["lr_nuclear"], inputs["deployment_nuclear"])
+    wind_fixed, wind_dynamic = learning_trajectories(
+        inputs["occ_wind"], inputs["mic_wind"], inputs["lr_wind"], inputs["deployment_wind"])
+
+    results = {}
+    for j, year in enumerate(years):
+        series = {}
+        for k, mic_name in enumerate(mic_scenarios):
+            series[f"noak_fixed_{mic_name}"] = nuc_fixed[j, k]
+            series[f"noak_dynamic_{mic_name}"] = nuc_dynamic[j, k]
+        series["noak_wind_fixed"] = wind_fixed[j]
+        series["noak_wind_dynamic"] = wind_dynamic[j]
+        results[f"Deployment {year}"] = series
+    return results
+
+
+def run_noak_simulation(num_simulations, seed=42, params=None):
+    if params is None:
+        params = build_noak_parameters()
+    rng = np.random.default_rng(seed)
+    inputs = sample_noak_inputs(params, num_simulations, rng)
+    return simulate_noak(inputs)
+
+
+# --- ESBWR / BWRX-300 (BWRX_comparison_montecarlo.py) ---
+reactor_mic_columns = {"premium": "MIC_Premium", "no_premium": "MIC_No_Premium", "market_price": "MIC_Market"}
+
+
+def build_nuclear_smr_parameters(comparison_data=None):
+    if comparison_data is None:
+        with open("comparison_data.pkl", "rb") as f:
+            comparison_data = pickle.load(f)
+
+    def reactor_mic(reactor):
+        mics = {}
+        for name in mic_scenarios:
+            mic = comparison_data.loc[comparison_data["Reactor"] == reactor, reactor_mic_columns[name]].values[0]
+            mics[name] = (mic, 0.35 * mic)
+        return mics
+
+    return {
+        "mic_nuclear": reactor_mic("ESBWR"),
+        "mic_smr": reactor_mic("BWRX"),
+        "occ_range_nuclear": list(atb_index.get("Nuclear", "OCC + GCC")),
+        "occ_range_smr": list(atb_index.get("SMR", "OCC + GCC")),
+        "deployment_nuclear": deployment_quantiles("Nuclear", years),
+        "deployment_smr": deployment_quantiles("SMR", years),
+    }
+
+
+def sample_nuclear_smr_inputs(params, size, rng):
+    return {
+        "occ_nuclear": sample_occ_initial(rng, params["occ_range_nuclear"], size),
+        "occ_smr": sample_occ_initial(rng, params["occ_range_smr"], size),
+        "mic_nuclear": np.stack([rng.normal(*params["mic_nuclear"][name], size) for name in mic_scenarios]),
+        "mic_smr": np.stack([rng.normal(*params["mic_smr"][name], size) for name in mic_scenarios]),
+        # both reactors use the nuclear learning-rate triangle
+        "lr_nuclear": sample_lr_nuclear(rng, size),
+        "lr_smr": sample_lr_nuclear(rng, size),
+        "deployment_nuclear": monotone_trajectories_from_uniforms(rng.random((size, len(years))), params["deployment_nuclear"]),
+        "deployment_smr": monotone_trajectories_from_uniforms(rng.random((size, len(years))), params["deployment_smr"]),
+    }
+
+
+def sample_nuclear_smr_inputs_qmc(params, size, rng, method="sobol"):
+    # Same inputs as sample_nuclear_smr_inputs; columns 0-9 scalar inputs, then the deployment years
+    n_years = len(years)
+    u = design_uniforms(method, size, 10 + 2 * n_years, rng)
+    return {
+        "occ_nuclear": occ_initial_ppf(u[:, 0], params["occ_range_nuclear"]),
+        "occ_smr": occ_initial_ppf(u[:, 1], params["occ_range_smr"]),
+        "mic_nuclear": np.stack([normal_ppf(u[:, 2 + k], *params["mic_nuclear"][name])
+                                 for k, name in enumerate(mic_scenarios)]),
+        "mic_smr": np.stack([normal_ppf(u[:, 5 + k], *params["mic_smr"][name]) for k, name in enumerate(mic_scenarios)]),
+        "lr_nuclear": lr_nuclear_ppf(u[:, 8]),
+        "lr_smr": lr_nuclear_ppf(u[:, 9]),
+        "deployment_nuclear": monotone_trajectories_from_uniforms(u[:, 10:10 + n_years], params["deployment_nuclear"]),
+        "deployment_smr": monotone_trajectories_from_uniforms(u[:, 10 + n_years:], params["deployment_smr"]),
+    }
+
+
+def simulate_nuclear_smr(inputs):
+    trajectories = {
+        prefix: learning_trajectories(inputs[f"occ_{tech}"], inputs[f"mic_{tech}"], inputs[f"lr_{tech}"],
+                                      inputs[f"deployment_{tech}"])
+        for prefix, tech in [("nuc", "nuclear"), ("smr", "smr")]
+    }
+    results = {}
+    for j, year in enumerate(years):
+        series = {}
+        for prefix, (noak_fixed, noak_dynamic) in trajectories.items():
+            for k, mic_name in enumerate(mic_scenarios):
+                series[f"{prefix}_noak_fixed_{mic_name}"] = noak_fixed[j, k]
+                series[f"{prefix}_noak_dynamic_{mic_name}"] = noak_dynamic[j, k]
+        results[f"Deployment {year}"] = series
+    return results
+
+
+# --- Classical learning-curve benchmark (benchmark_sim.py) ---
+def build_benchmark_parameters():
+    return {
+        "occ_range_nuclear": list(atb_index.get("Nuclear", "OCC + GCC")),
+        "occ_range_smr": list(atb_index.get("SMR", "OCC + GCC")),
+        "occ_range_wind": list(atb_index.get("FOW-Class11", "OCC + GCC")),
+        "deployment_nuclear": deployment_quantiles("Nuclear", years),
+        "deployment_smr": deployment_quantiles("SMR", years),
+        "deployment_wind": deployment_quantiles("FOW-Class11", years),
+    }
+
+
+def sample_benchmark_inputs(params, size, rng):
+    return {
+        "occ_nuclear": sample_occ_initial(rng, params["occ_range_nuclear"], size),
+        "occ_smr": sample_occ_initial(rng, params["occ_range_smr"], size),
+        "occ_wind": sample_occ_initial(rng, params["occ_range_wind"], size),
+        "lr_nuclear": sample_lr_nuclear(rng, size),
+        "lr_wind": sample_lr_wind(rng, size),
+        "deployment_nuclear": monotone_trajectories_from_uniforms(rng.random((size, len(years))), params["deployment_nuclear"]),
+        "deployment_smr": monotone_trajectories_from_uniforms(rng.random((size, len(years))), params["deployment_smr"]),
+        "deployment_wind": monotone_trajectories_from_uniforms(rng.random((size, len(years))), params["deployment_wind"]),
+    }
+
+
+def simulate_benchmark(inputs):
+    # Whole OCC follows occ * N^b; the SMR shares the nuclear learning rate
+    b_nuclear = compute_b(inputs["lr_nuclear"])
+    b_wind = compute_b(inputs["lr_wind"])
+    results = {}
+    for j, year in enumerate(years):
+        results[str(year)] = {
+            "noak_nuclear": inputs["occ_nuclear"] * inputs["deployment_nuclear"][:, j] ** b_nuclear,
+            "noak_smr": inputs["occ_smr"] * inputs["deployment_smr"][:, j] ** b_nuclear,
+            "noak_wind": inputs["occ_wind"] * inputs["deployment_wind"][:, j] ** b_wind,
+        }
+    return results
+
+
+# --- Common random numbers: NOAK and benchmark on the same draws ---
+# One design row per sample feeds both models: the benchmark reuses the NOAK run's initial OCCs,
+# learning rates and nuclear/wind deployments, plus its own SMR OCC and deployment columns. The
+# three nuclear MIC scenarios share one normal column (mean + std * z with the same z), so the
+# scenarios differ only by their MIC parameters. Each series keeps its marginal distribution;
+# only the dependence between series changes, which is what makes paired differences tight.
+def sample_common_inputs(noak_params, benchmark_params, size, rng, method="random"):
+    n_years = len(years)
+    u = design_uniforms(method, size, 7 + 3 * n_years, rng)
+    mic_nuclear = noak_params["mic_nuclear"]
+    return {
+        "occ_nuclear": occ_initial_ppf(u[:, 0], noak_params["occ_range_nuclear"]),
+        "occ_wind": occ_initial_ppf(u[:, 1], noak_params["occ_range_wind"]),
+        "occ_smr": occ_initial_ppf(u[:, 2], benchmark_params["occ_range_smr"]),
+        "mic_nuclear": np.stack([normal_ppf(u[:, 3], *mic_nuclear[name]) for name in mic_scenarios]),
+        "mic_wind": normal_ppf(u[:, 4], *noak_params["mic_wind"]),
+        "lr_nuclear": lr_nuclear_ppf(u[:, 5]),
+        "lr_wind": lr_wind_ppf(u[:, 6]),
+        "deployment_nuclear": monotone_trajectories_from_uniforms(u[:, 7:7 + n_years], noak_params["deployment_nuclear"]),
+        "deployment_wind": monotone_trajectories_from_uniforms(u[:, 7 + n_years:7 + 2 * n_years],
+                                                               noak_params["deployment_wind"]),
+        "deployment_smr": monotone_trajectories_from_uniforms(u[:, 7 + 2 * n_years:], benchmark_params["deployment_smr"]),
+    }
@@ -0,0 +1,144 @@
+import argparse
+import json
+import numpy as np
+from mc_stats import custom_quartiles
+from noak_engine import design_methods, mic_scenarios, years
+from parallel_runner import default_block_size, run_scenario, sampled_scenario
+from result_store import load_results, read_run_metadata
+
+
+# --- Paired differences ---
+# The reported results are differences: OWLR vs FLR, the MIC scenarios against the market price,
+# and the classical benchmark against FLR. Computed on the same samples ("common" scenario, see
+# parallel_runner.common_block) the difference of sample i cancels the OCC, learning-rate and
+# deployment draws both sides share, so its spread is the spread of the effect itself. Each row
+# reports the mean difference with the standard error of the paired samples, next to the one two
+# independent runs of the same size would give, sqrt(var(a) / n + var(b) / n); the squared ratio
+# of the two is the factor of samples the pairing saves. With antithetic sampling the pairs of rows
+# (2i, 2i + 1) are averaged first, since only the pair means are independent.
+noak_name = "noak_simulation_results_fixed_dynamic"
+benchmark_name = "benchmark_simulation_results"
+default_num_simulations = 20000
+identical_fraction = 1e-9  # a paired SE this small against the independent one is rounding: the series agree
+
+
+def sampling_units(values, antithetic=False):
+    # Independent units of a run: the samples, or the means of the antithetic pairs
+    values = np.asarray(values, dtype=float)
+    if antithetic:
+        values = values[:len(values) // 2 * 2].reshape(-1, 2).mean(axis=1)
+    return values[np.isfinite(values)]
+
+
+def difference_statistics(a, b, antithetic=False):
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    difference = a - b
+    units = sampling_units(difference, antithetic)
+    standard_error = units.std(ddof=1) / np.sqrt(len(units))
+    a, b = a[np.isfinite(a)], b[np.isfinite(b)]
+    independent_error = np.sqrt(a.var(ddof=1) / len(a) + b.var(ddof=1) / len(b))
+    finite = difference[np.isfinite(difference)]
+    return {
+        "mean_difference": float(finite.mean()),
+        "standard_error": float(standard_error),
+        "independent_standard_error": float(independent_error),
+        "variance_reduction": (float((independent_error / standard_error) ** 2)
+                               if standard_error > identical_fraction * independent_error else None),
+        "quartiles": [float(q) for q in custom_quartiles(finite)],
+        "share_positive": float((finite > 0).mean()),
+    }
+
+
+def comparisons(noak_results, benchmark_results=None):
+    # (year, label, a, b) for every reported difference a - b
+    rows = []
+    for year in years:
+        series = noak_results[f"Deployment {year}"]
+        for mic in mic_scenarios:
+            rows.append((year, f"nuclear {mic}: OWLR - FLR", series[f"noak_dynamic_{mic}"], series[f"noak_fixed_{mic}"]))
+        rows.append((year, "wind: OWLR - FLR", series["noak_wind_dynamic"], series["noak_wind_fixed"]))
+        for learning in ["fixed", "dynamic"]:
+            for mic in mic_scenarios[:-1]:
+                rows.append((year, f"nuclear {learning}: {mic} - market_price", series[f"noak_{learning}_{mic}"],
+                             series[f"noak_{learning}_market_price"]))
+        if benchmark_results is not None:
+            benchmark = benchmark_results[str(year)]
+            for mic in mic_scenarios:
+                rows.append((year, f"nuclear {mic}: benchmark - FLR", benchmark["noak_nuclear"],
+                             series[f"noak_fixed_{mic}"]))
+            rows.append((year, "wind: benchmark - FLR", benchmark["noak_wind"], series["noak_wind_fixed"]))
+    return rows
+
+
+def paired_table(noak_results, benchmark_results=None, antithetic=False):
+    return [{"year": year, "comparison": label, **difference_statistics(a, b, antithetic)}
+            for year, label, a, b in comparisons(noak_results, benchmark_results)]
+
+
+# --- Sources ---
+def run_common(sampling="random", num_simulations=default_num_simulations, seed=42, block_size=default_block_size,
+               workers=1):
+    results = run_scenario(sampled_scenario("common", sampling), num_simulations, seed, block_size, workers,
+                           outputs=[noak_name, benchmark_name])
+    return results[noak_name], results[benchmark_name]
+
+
+def shared_draws(noak_metadata, benchmark_metadata):
+    # Stored benchmark results pair with the NOAK ones only if both come from one "common" run
+    if noak_metadata is None or benchmark_metadata is None:
+        return False
+    keys = ["scenario", "num_simulations", "seed", "block_size"]
+    return (noak_metadata["scenario"].startswith("common")
+            and all(noak_metadata[key] == benchmark_metadata[key] for key in keys))
+
+
+def is_antithetic(metadata):
+    # Pairs stay aligned across blocks only with an even block size
+    return (metadata is not None and metadata["scenario"].endswith("_antithetic")
+            and metadata["block_size"] % 2 == 0)
+
+
+def load_stored(noak=noak_name, benchmark=benchmark_name):
+    # (NOAK results, benchmark results or None, antithetic) of the saved stores
+    noak_metadata = read_run_metadata(noak)
+    benchmark_results = None
+    if shared_draws(noak_metadata, read_run_metadata(benchmark)):
+        benchmark_results = load_results(benchmark)
+    else:
+        print(f"{benchmark} does not share the draws of {noak}; run both with --common-draws to compare them")
+    return load_results(noak), benchmark_results, is_antithetic(noak_metadata)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Paired differences of the learning, MIC and benchmark comparisons")
+    parser.add_argument("--stored", action="store_true",
+                        help="use the saved NOAK and benchmark stores instead of a fresh common-draws run")
+    parser.add_argument("--sampling", choices=["random"] + design_methods, default="random")
+    parser.add_argument("--num-simulations", type=int, default=default_num_simulations)
+    parser.add_argument("--block-size", type=int, default=default_block_size)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--year", type=int, choices=years, help="only report this year")
+    parser.add_argument("--output", help="also write the table as JSON")
+    args = parser.parse_args()
+    if args.sampling == "antithetic" and args.block_size % 2:
+        parser.error("antithetic sampling needs an even --block-size")
+
+    if args.stored:
+        noak_results, benchmark_results, antithetic = load_stored()
+    else:
+        noak_results, benchmark_results = run_common(args.sampling, args.num_simulations, args.seed, args.block_size,
+                                                     args.workers)
+        antithetic = args.sampling == "antithetic"
+
+    table = [row for row in paired_table(noak_results, benchmark_results, antithetic)
+             if args.year is None or row["year"] == args.year]
+    print(f"{'year':4s}  {'comparison':40s} {'mean difference':>16s} {'paired SE':>11s} {'independent SE':>15s} "
+          f"{'x samples':>9s} {'P(> 0)':>7s}")
+    for row in table:
+        reduction = f"{row['variance_reduction']:9.1f}" if row["variance_reduction"] else f"{'-':>9s}"
+        print(f"{row['year']:4d}  {row['comparison']:40s} {row['mean_difference']:16.2f} {row['standard_error']:11.3f} "
+              f"{row['independent_standard_error']:15.3f} {reduction} {row['share_positive']:7.1%}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(table, f, indent=1)
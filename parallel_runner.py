@@ -0,0 +1,260 @@
+import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+import run_report
+from result_store import flatten_results, save_results
+from noak_engine import (build_noak_parameters, sample_noak_inputs, simulate_noak,
+                         build_nuclear_smr_parameters, sample_nuclear_smr_inputs, simulate_nuclear_smr,
+                         design_methods, sample_noak_inputs_qmc, sample_nuclear_smr_inputs_qmc, sample_common_inputs,
+                         build_benchmark_parameters, sample_benchmark_inputs, simulate_benchmark)
+from lcoe_engine import (build_lcoe_parameters, simulate_lcoe, build_nuclear_smr_lcoe_parameters,
+                         simulate_nuclear_smr_lcoe, build_benchmark_lcoe_parameters, simulate_benchmark_lcoe)
+
+
+# --- Reproducible blocks ---
+# A run of n samples is cut into fixed-size blocks and block i draws from its own stream,
+# SeedSequence(seed).spawn(n_blocks)[i]. The result depends only on (seed, block_size, n),
+# never on how many workers computed the blocks or in which order they finished. Blocks are kept
+# small so extend_run.py can reuse every complete block of a stored run (a partial block is redrawn),
+# while still large enough for the array engines to run at full speed.
+default_block_size = 5000
+
+
+def block_layout(num_simulations, block_size=default_block_size):
+    return [(start, min(start + block_size, num_simulations)) for start in range(0, num_simulations, block_size)]
+
+
+def block_seeds(seed, n_blocks):
+    return np.random.SeedSequence(seed).spawn(n_blocks)
+
+
+def run_metadata(scenario, num_simulations, seed, block_size, **extra):
+    # Stored with every result set so the run can later be extended (see extend_run.py)
+    return {"scenario": scenario, "num_simulations": num_simulations, "seed": seed, "block_size": block_size, **extra}
+
+
+# --- Scenarios: parameter builder + block simulator, returning {result set name: results} ---
+def noak_block(params, size, rng):
+    return {"noak_simulation_results_fixed_dynamic": simulate_noak(sample_noak_inputs(params["noak"], size, rng))}
+
+
+def noak_lcoe_block(params, size, rng):
+    noak_results = simulate_noak(sample_noak_inputs(params["noak"], size, rng))
+    return {
+        "noak_simulation_results_fixed_dynamic": noak_results,
+        "lcoe_simulation_results_fixed_dynamic": simulate_lcoe(noak_results, params["lcoe"], rng),
+    }
+
+
+def nuclear_smr_results(params, inputs, rng):
+    noak_results = simulate_nuclear_smr(inputs)
+    return {
+        "noak_simulation_results_nuclear_smr": noak_results,
+        "lcoe_simulation_results_nuclear_smr": simulate_nuclear_smr_lcoe(noak_results, params["lcoe"], rng),
+    }
+
+
+def nuclear_smr_block(params, size, rng):
+    return nuclear_smr_results(params, sample_nuclear_smr_inputs(params["noak"], size, rng), rng)
+
+
+# QMC and antithetic variants: the NOAK inputs come from the block's design (noak_engine.design_uniforms);
+# the LCOE inputs are still pseudo-random draws from the block's stream
+def noak_qmc_block(method, params, size, rng):
+    return {"noak_simulation_results_fixed_dynamic": simulate_noak(sample_noak_inputs_qmc(params["noak"], size, rng,
+                                                                                          method))}
+
+
+def nuclear_smr_qmc_block(method, params, size, rng):
+    return nuclear_smr_results(params, sample_nuclear_smr_inputs_qmc(params["noak"], size, rng, method), rng)
+
+
+def benchmark_block(params, size, rng):
+    noak_results = simulate_benchmark(sample_benchmark_inputs(params["noak"], size, rng))
+    return {
+        "benchmark_simulation_results": noak_results,
+        "benchmark_lcoe_simulation_results": simulate_benchmark_lcoe(noak_results, params["lcoe"], rng),
+    }
+
+
+# Common random numbers: the NOAK (FLR/OWLR) and benchmark results of a sample come from the same
+# OCC, learning-rate and deployment draws (noak_engine.sample_common_inputs), so the stores of one
+# run can be compared sample by sample (see paired_comparison.py)
+def common_block(method, params, size, rng):
+    inputs = sample_common_inputs(params["noak"], params["benchmark"], size, rng, method)
+    benchmark_results = simulate_benchmark(inputs)
+    return {
+        "noak_simulation_results_fixed_dynamic": simulate_noak(inputs),
+        "benchmark_simulation_results": benchmark_results,
+        "benchmark_lcoe_simulation_results": simulate_benchmark_lcoe(benchmark_results, params["lcoe"], rng),
+    }
+
+
+def noak_scenario_parameters():
+    return {"noak": build_noak_parameters()}
+
+
+def noak_lcoe_scenario_parameters():
+    return {"noak": build_noak_parameters(), "lcoe": build_lcoe_parameters()}
+
+
+def nuclear_smr_scenario_parameters():
+    return {"noak": build_nuclear_smr_parameters(), "lcoe": build_nuclear_smr_lcoe_parameters()}
+
+
+def benchmark_scenario_parameters():
+    return {"noak": build_benchmark_parameters(), "lcoe": build_benchmark_lcoe_parameters()}
+
+
+def common_scenario_parameters():
+    return {"noak": build_noak_parameters(), "benchmark": build_benchmark_parameters(),
+            "lcoe": build_benchmark_lcoe_parameters()}
+
+
+scenarios = {
+    "noak": (noak_scenario_parameters, noak_block),
+    "noak_lcoe": (noak_lcoe_scenario_parameters, noak_lcoe_block),
+    "nuclear_smr": (nuclear_smr_scenario_parameters, nuclear_smr_block),
+    "benchmark": (benchmark_scenario_parameters, benchmark_block),
+    **{f"noak_{method}": (noak_scenario_parameters, partial(noak_qmc_block, method)) for method in design_methods},
+    **{f"nuclear_smr_{method}": (nuclear_smr_scenario_parameters, partial(nuclear_smr_qmc_block, method))
+       for method in design_methods},
+    "common": (common_scenario_parameters, partial(common_block, "random")),
+    **{f"common_{method}": (common_scenario_parameters, partial(common_block, method)) for method in design_methods},
+}
+
+
+def sampled_scenario(scenario, sampling="random"):
+    # Scenario name of a run with the given input sampling ("random" or one of design_methods)
+    return scenario if sampling == "random" else f"{scenario}_{sampling}"
+
+
+def run_block(scenario, params, seed_sequence, size, reducer=None):
+    # reducer (a picklable callable) shrinks the block inside the worker, e.g. to sketches
+    block = scenarios[scenario][1](params, size, np.random.default_rng(seed_sequence))
+    return block if reducer is None else reducer(block)
+
+
+def counted_run_block(scenario, params, seed_sequence, size, reducer=None):
+    # Pool task: the block plus the run report counters it added in the worker process
+    before = dict(run_report.counters)
+    block = run_block(scenario, params, seed_sequence, size, reducer)
+    return block, run_report.counters_since(before)
+
+
+# --- Runner ---
+def iter_blocks(scenario, num_simulations, seed=42, block_size=default_block_size, workers=1, params=None,
+                reducer=None, blocks=None):
+    # Yields (start, stop, block results) in block order. With workers > 1 at most two blocks
+    # per worker are in flight, so memory stays bounded when the consumer streams the blocks.
+    # blocks: the block indices to run (default: all), e.g. one shard of a larger run
+    if params is None:
+        params = scenarios[scenario][0]()
+    layout = block_layout(num_simulations, block_size)
+    seeds = block_seeds(seed, len(layout))
+    if blocks is None:
+        blocks = range(len(layout))
+    tasks = [(layout[i], seeds[i]) for i in blocks]
+
+    if workers == 1:
+        for (start, stop), seed_sequence in tasks:
+            yield start, stop, run_block(scenario, params, seed_sequence, stop - start, reducer)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for (start, stop), seed_sequence in tasks:
+            future = executor.submit(counted_run_block, scenario, params, seed_sequence, stop - start, reducer)
+            pending.append((start, stop, future))
+            if len(pending) >= 2 * workers:
+                start, stop, future = pending.popleft()
+                block, added = future.result()
+                run_report.merge_counters(added)
+                yield start, stop, block
+        while pending:
+            start, stop, future = pending.popleft()
+            block, added = future.result()
+            run_report.merge_counters(added)
+            yield start, stop, block
+
+
+def allocate_like(results, num_simulations):
+    return {key: allocate_like(value, num_simulations) if isinstance(value, dict) else np.empty(num_simulations)
+            for key, value in results.items()}
+
+
+def fill_chunk(target, chunk, start, stop):
+    for key, value in chunk.items():
+        if isinstance(value, dict):
+            fill_chunk(target[key], value, start, stop)
+        else:
+            target[key][start:stop] = value
+
+
+def slice_results(results, start, stop):
+    return {key: slice_results(value, start, stop) if isinstance(value, dict) else value[start:stop]
+            for key, value in results.items()}
+
+
+def results_length(results):
+    return len(next(values for _, values in flatten_results(results)))
+
+
+def run_scenario(scenario, num_simulations, seed=42, block_size=default_block_size, workers=1, params=None,
+                 outputs=None):
+    # outputs: subset of result set names to keep in memory (default: all of them)
+    results = None
+    for start, stop, block in iter_blocks(scenario, num_simulations, seed, block_size, workers, params):
+        if outputs is not None:
+            block = {name: value for name, value in block.items() if name in outputs}
+        if results is None:
+            results = allocate_like(block, num_simulations)
+        fill_chunk(results, block, start, stop)
+    return results
+
+
+# --- LCOE on stored NOAK results (LCOE_sim_NOAK.py) ---
+# The NOAK samples are cut into the same blocks as the run that produced them, and block i draws
+# its LCOE inputs from SeedSequence([seed, lcoe_stage]).spawn(n_blocks)[i], a stream family
+# disjoint from the NOAK blocks', so appending NOAK blocks only appends LCOE blocks.
+lcoe_stage = 1
+
+
+def iter_lcoe_blocks(noak_results, params, seed=42, block_size=default_block_size, blocks=None):
+    layout = block_layout(results_length(noak_results), block_size)
+    seeds = block_seeds([seed, lcoe_stage], len(layout))
+    if blocks is None:
+        blocks = range(len(layout))
+    for i in blocks:
+        start, stop = layout[i]
+        yield start, stop, simulate_lcoe(slice_results(noak_results, start, stop), params,
+                                         np.random.default_rng(seeds[i]))
+
+
+def run_lcoe_on_noak(noak_results, params, seed=42, block_size=default_block_size):
+    lcoe_results = None
+    for start, stop, block in iter_lcoe_blocks(noak_results, params, seed, block_size):
+        if lcoe_results is None:
+            lcoe_results = allocate_like(block, results_length(noak_results))
+        fill_chunk(lcoe_results, block, start, stop)
+    return lcoe_results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Block-seeded multi-process Monte Carlo runner")
+    parser.add_argument("scenario", choices=sorted(scenarios))
+    parser.add_argument("--num-simulations", type=int, default=10000)
+    parser.add_argument("--block-size", type=int, default=default_block_size)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    results = run_scenario(args.scenario, args.num_simulations, seed=args.seed, block_size=args.block_size,
+                           workers=args.workers)
+    metadata = run_metadata(args.scenario, args.num_simulations, args.seed, args.block_size)
+    for name, result_set in results.items():
+        save_results(result_set, name, metadata)
+        print(f"Saved {name}")
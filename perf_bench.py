@@ -0,0 +1,195 @@
+import argparse
+import importlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from functools import lru_cache
+import numpy as np
+from deployment_sampler import sample_deployment_trajectories
+from kde_curves import result_kde_curves
+from lcoe_engine import build_lcoe_parameters
+from mc_stats import nest, result_quartiles
+from noak_engine import build_noak_parameters, sample_noak_inputs, simulate_noak
+from parallel_runner import run_lcoe_on_noak
+from run_report import git_revision
+
+
+# --- Speed benchmarks ---
+# Not to be confused with benchmark.py / benchmark_sim.py, which compare the model against
+# published estimates. Every case has a setup, run once and not timed, that returns the timed
+# callable; each repeat draws from the same seed, so the work is identical between runs and
+# between versions. "run" writes the timings as JSON; "compare" flags the cases whose median
+# got slower than a saved baseline by more than the threshold.
+seed = 42
+noak_sizes = [10 ** 4, 10 ** 5, 10 ** 6]
+stage_size = 10 ** 5  # samples fed to the LCOE, deployment and quartile cases
+figure_size = 10 ** 4  # samples behind the rendered figures
+figure_module = "NOAK_mcsim_with_deployment_hist_plot"
+default_output = "perf_bench.json"
+default_repeat = 5
+default_threshold = 0.15
+
+
+@lru_cache(maxsize=None)
+def noak_results(size):
+    return simulate_noak(sample_noak_inputs(build_noak_parameters(), size, np.random.default_rng(seed)))
+
+
+def noak_case(size):
+    params = build_noak_parameters()
+    return lambda: simulate_noak(sample_noak_inputs(params, size, np.random.default_rng(seed)))
+
+
+def lcoe_case():
+    params = build_lcoe_parameters()
+    results = noak_results(stage_size)
+    return lambda: run_lcoe_on_noak(results, params, seed)
+
+
+def deployment_case():
+    def run():
+        rng = np.random.default_rng(seed)
+        for technology in ["Nuclear", "FOW-Class11"]:
+            sample_deployment_trajectories(technology, stage_size, rng)
+    return run
+
+
+def quartiles_case():
+    results = noak_results(stage_size)
+    return lambda: result_quartiles(results)
+
+
+def mooring_grid_case():
+    from offshore_wind_learning_and_distance_from_shore import depth_range, line_range, mooring_mic_grid
+    return lambda: mooring_mic_grid(depth_range, line_range)
+
+
+def figure_case(function_name):
+    # Renders one figure of the NOAK hist plot module from in-memory quartiles and KDE curves,
+    # saved to a buffer with the module's own savefig options
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    module = importlib.import_module(figure_module)
+    results = noak_results(figure_size)
+    datasets = {"results": {}, "quartiles": {module.name: result_quartiles(results)},
+                "kde": {module.name: nest(result_kde_curves(results))}}
+    args, savefig_options = next((args, options) for _, name, args, options in module.figures(datasets)
+                                 if name == function_name)
+
+    def run():
+        with plt.rc_context(module.style):
+            fig = getattr(module, function_name)(datasets, *args)
+            fig.savefig(io.BytesIO(), **savefig_options)
+        plt.close(fig)
+    return run
+
+
+# name -> (setup, samples per run or None)
+cases = {
+    **{f"noak_{size}": (lambda size=size: noak_case(size), size) for size in noak_sizes},
+    "lcoe": (lcoe_case, stage_size),
+    "deployment": (deployment_case, 2 * stage_size),
+    "quartiles": (quartiles_case, stage_size),
+    "mooring_grid": (mooring_grid_case, None),
+    "hist_figure": (lambda: figure_case("plot_learning_type"), None),
+    "summary_figure": (lambda: figure_case("generate_noak_summary_nuclear"), None),
+}
+
+
+# --- Running ---
+def time_case(name, repeat=default_repeat):
+    setup, samples = cases[name]
+    run = setup()
+    run()  # warm-up: imports, caches, first-touch allocations
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - start)
+    median = statistics.median(seconds)
+    return {
+        "seconds": seconds,
+        "median_seconds": median,
+        "min_seconds": min(seconds),
+        "samples": samples,
+        "samples_per_second": samples / median if samples else None,
+    }
+
+
+def run_benchmarks(names=None, repeat=default_repeat):
+    results = {}
+    for name in names or cases:
+        results[name] = time_case(name, repeat)
+        print(f"{name:16s} median {results[name]['median_seconds'] * 1000:10.2f} ms  "
+              f"min {results[name]['min_seconds'] * 1000:10.2f} ms")
+    return {
+        "finished": time.time(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+        "cases": results,
+    }
+
+
+def write_results(results, path):
+    with open(path + ".tmp", "w") as f:
+        json.dump(results, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def read_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+# --- Comparing ---
+def compare_results(baseline, current, threshold=default_threshold):
+    # (name, baseline median, current median, ratio, regressed) for the cases present in both
+    rows = []
+    for name, case in current["cases"].items():
+        if name not in baseline["cases"]:
+            continue
+        before = baseline["cases"][name]["median_seconds"]
+        after = case["median_seconds"]
+        ratio = after / before
+        rows.append((name, before, after, ratio, ratio > 1 + threshold))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Speed benchmarks of the engines, statistics and plotting")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="time the cases and write the results as JSON")
+    run_parser.add_argument("cases", nargs="*", help=f"cases to run (default: all of {', '.join(cases)})")
+    run_parser.add_argument("--repeat", type=int, default=default_repeat, help="timed runs per case")
+    run_parser.add_argument("--output", default=default_output)
+    compare_parser = commands.add_parser("compare", help="flag cases slower than a saved baseline")
+    compare_parser.add_argument("baseline", help="results of an earlier run")
+    compare_parser.add_argument("current", nargs="?", default=default_output)
+    compare_parser.add_argument("--threshold", type=float, default=default_threshold,
+                                help="allowed slowdown of the median, as a fraction")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        unknown = [name for name in args.cases if name not in cases]
+        if unknown:
+            parser.error(f"unknown cases {unknown}")
+        write_results(run_benchmarks(args.cases, args.repeat), args.output)
+        print(f"Wrote {args.output}")
+        sys.exit(0)
+
+    baseline, current = read_results(args.baseline), read_results(args.current)
+    rows = compare_results(baseline, current, args.threshold)
+    print(f"baseline {baseline['git_revision'] or '-'} -> current {current['git_revision'] or '-'}")
+    for name, before, after, ratio, regressed in rows:
+        flag = "REGRESSION" if regressed else ""
+        print(f"{name:16s} {before * 1000:10.2f} ms -> {after * 1000:10.2f} ms  x{ratio:5.2f}  {flag}")
+    sys.exit(1 if any(row[4] for row in rows) else 0)
@@ -0,0 +1,103 @@
+import argparse
+import json
+import numpy as np
+from mc_stats import result_quartiles
+from noak_engine import design_methods
+from parallel_runner import run_scenario, sampled_scenario
+from result_store import flatten_results
+
+
+# --- Quartile convergence: pseudo-random vs QMC and antithetic sampling ---
+# Every sample size is run `replications` times with independent seeds (one block per run, so a
+# Sobol run is one balanced design when the size is a power of two, and an antithetic run is whole
+# pairs), and the error at that size is the run-to-run spread of the custom quartiles: the
+# relative standard deviation of each series' Q1/Q2/Q3, averaged over the series. Q1 and Q3 mix
+# in the sample min and max, whose expectation moves with n, so there is no fixed target to
+# measure a bias against; the scatter is what makes them unstable. A log-log fit of error vs n per
+# method then gives the samples each method needs to match the pseudo-random error at the largest
+# size. The min/max terms shrink far slower than 1/sqrt(n), so Q1/Q3 curves can be too flat to
+# extrapolate; those get no sample count, only the measured error ratio at the largest size.
+default_sizes = [2 ** m for m in range(8, 15)]
+default_replications = 16
+result_sets = {"noak": "noak_simulation_results_fixed_dynamic", "nuclear_smr": "noak_simulation_results_nuclear_smr"}
+quartile_labels = ["Q1", "Q2", "Q3"]
+flat_slope = -0.1
+
+
+def quartile_estimates(scenario, method, size, seed):
+    # (series, 3) quartiles of one run
+    name = result_sets[scenario]
+    results = run_scenario(sampled_scenario(scenario, method), size, seed=seed, block_size=size, outputs=[name])
+    return np.array([quartiles for _, quartiles in flatten_results(result_quartiles(results[name]))])
+
+
+def quartile_errors(scenario, method, size, replications, seed=0):
+    # Relative run-to-run standard deviation per quartile, averaged over the series
+    estimates = np.stack([quartile_estimates(scenario, method, size, seed + r) for r in range(replications)])
+    relative = estimates.std(axis=0, ddof=1) / np.abs(estimates.mean(axis=0))
+    return relative.mean(axis=0)
+
+
+def fit_power_law(sizes, errors):
+    # log(error) = intercept + slope * log(n)
+    slope, intercept = np.polyfit(np.log(sizes), np.log(errors), 1)
+    return slope, intercept
+
+
+def samples_for_error(fit, error):
+    slope, intercept = fit
+    if slope > flat_slope:
+        return None
+    return float(np.exp((np.log(error) - intercept) / slope))
+
+
+def convergence_study(scenario="noak", sizes=default_sizes, replications=default_replications, methods=None):
+    methods = methods or ["random"] + design_methods
+    errors = {}
+    for method in methods:
+        errors[method] = []
+        for size in sizes:
+            errors[method].append(quartile_errors(scenario, method, size, replications).tolist())
+            print(f"{method:7s} n={size:7d}  " + "  ".join(
+                f"{label} {error:.4%}" for label, error in zip(quartile_labels, errors[method][-1])))
+
+    # Samples each method needs to reach the pseudo-random error at the largest size
+    summary = {}
+    for method in methods:
+        summary[method] = {}
+        for q, label in enumerate(quartile_labels):
+            random_fit = fit_power_law(sizes, [e[q] for e in errors["random"]])
+            fit = fit_power_law(sizes, [e[q] for e in errors[method]])
+            target = float(np.exp(random_fit[1] + random_fit[0] * np.log(sizes[-1])))
+            needed = samples_for_error(fit, target)
+            summary[method][label] = {"slope": float(fit[0]), "target_error": target, "samples_needed": needed,
+                                      "sample_ratio": sizes[-1] / needed if needed else None,
+                                      "error_ratio": errors["random"][-1][q] / errors[method][-1][q]}
+    return {"scenario": scenario, "sizes": list(sizes), "replications": replications, "errors": errors,
+            "summary": summary}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare quartile convergence of pseudo-random, QMC and antithetic sampling")
+    parser.add_argument("--scenario", choices=sorted(result_sets), default="noak")
+    parser.add_argument("--sizes", type=int, nargs="+", default=default_sizes)
+    parser.add_argument("--replications", type=int, default=default_replications)
+    parser.add_argument("--methods", nargs="+", choices=["random"] + design_methods)
+    parser.add_argument("--output", help="also write the errors and summary as JSON")
+    args = parser.parse_args()
+    methods = args.methods or ["random"] + design_methods
+    if "random" not in methods:
+        methods = ["random"] + methods
+
+    study = convergence_study(args.scenario, sorted(args.sizes), args.replications, methods)
+    print(f"\nSamples needed for the pseudo-random error at n={study['sizes'][-1]}:")
+    for method, quartiles in study["summary"].items():
+        print(f"  {method}")
+        for label, entry in quartiles.items():
+            needed = (f"{entry['samples_needed']:9.0f} (x{entry['sample_ratio']:.2f} fewer)"
+                      if entry["samples_needed"] else "  too flat to extrapolate")
+            print(f"    {label}: {needed}  slope {entry['slope']:.2f}, "
+                  f"error x{entry['error_ratio']:.2f} lower at n={study['sizes'][-1]}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(study, f, indent=1)
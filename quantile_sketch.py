@@ -0,0 +1,98 @@
+import numpy as np
+
+
+# --- KLL quantile sketch ---
+# Level h holds items that each stand for 2^h samples. When a level overflows its capacity it is
+# sorted and every other item (random offset) is promoted to the next level, so the sketch keeps
+# O(k log(n/k)) items however many samples it has seen, and two sketches merge level by level.
+# min and max are tracked exactly.
+#
+# Error bound: a quantile q is returned as a sample whose true rank lies within
+# q +/- rank_error(k) with ~99% confidence, rank_error(k) = 2.296 / k^0.9723
+# (k=200: 1.33% of the samples). Q1/Q3 of custom_quartiles average an exact extreme with such a
+# quantile, so their error is half the error of the P25/P75 estimate.
+default_k = 200
+
+
+def rank_error(k=default_k):
+    return 2.296 / k ** 0.9723
+
+
+class KLLSketch:
+    def __init__(self, k=default_k, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.rng = np.random.default_rng(seed)
+
+    def capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def compress(self):
+        compacted = True
+        while compacted:
+            compacted = False
+            for level in range(len(self.levels)):
+                items = self.levels[level]
+                if len(items) <= self.capacity(level):
+                    continue
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                odd = len(items) % 2
+                promoted = items[odd + self.rng.integers(2)::2]
+                self.levels[level] = items[:odd]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                compacted = True
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+        self.count += values.size
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.compress()
+
+    def merge(self, other):
+        if other.k != self.k:
+            raise ValueError("Cannot merge sketches with different k")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.compress()
+        return self
+
+    def size(self):
+        return sum(len(items) for items in self.levels)
+
+    def quantile(self, q):
+        if self.count == 0:
+            return np.nan
+        if q <= 0:
+            return float(self.min)
+        if q >= 1:
+            return float(self.max)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 2.0 ** level) for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        index = np.searchsorted(cumulative, q * cumulative[-1], side="left")
+        return float(items[order][min(index, len(items) - 1)])
+
+    def custom_quartiles(self):
+        if self.count == 0:
+            return None, None, None
+        q1 = (self.min + self.quantile(0.25)) / 2
+        q2 = self.quantile(0.50)
+        q3 = (self.quantile(0.75) + self.max) / 2
+        return q1, q2, q3
@@ -0,0 +1,259 @@
+import numpy as np
+from noak_engine import years, mic_scenarios
+
+
+# --- Reference implementations ---
+# The per-sample loops of the original scripts (NOAK_mcsim_with_deployment.py, LCOE_sim_NOAK.py,
+# BWRX_comparison_montecarlo.py, benchmark_sim.py), kept as the ground truth for the array
+# engines. Instead of drawing from np.random inside the loop they read sample i of pre-drawn
+# inputs, laid out as the engines' samplers return them, so both can be run on the same draws
+# (see equivalence_check.py). Results are dicts of lists with the engines' nesting.
+def calc_crf(wacc, crp):
+    return wacc / (1 - (1 / (1 + wacc) ** crp))
+
+
+def calc_lcoe(crf, pff, cff, occ, fom, cf, vom=0, fuel=0):
+    return ((crf * pff * cff * occ + fom) * 1000 / (cf * 8760)) + vom + fuel
+
+
+def compute_b(lr):
+    return np.log(1 - lr) / np.log(2)
+
+
+def as_lists(inputs):
+    # Python floats, as the original scripts got them from np.random
+    return {key: value.tolist() for key, value in inputs.items()}
+
+
+def learning_loop(occ_initial, mic_value, lr, deployments):
+    # One sample's FLR and OWLR trajectories over the years
+    b_fixed = compute_b(lr)
+    overhead_fixed = occ_initial - mic_value
+    overhead_dynamic = occ_initial - mic_value
+    occ_prev_dynamic = occ_initial
+    N_prev = 1
+    noak_fixed_path, noak_dynamic_path = [], []
+
+    for N_curr in deployments:
+        # Fixed Learning
+        overhead_fixed_new = overhead_fixed * (N_curr / N_prev) ** b_fixed
+        noak_fixed = mic_value + overhead_fixed_new
+
+        # Dynamic Learning
+        overhead_ratio = overhead_dynamic / occ_prev_dynamic
+        lr_dynamic = min(0.99, lr * (1 + overhead_ratio))
+        b_dynamic = compute_b(lr_dynamic)
+        overhead_dynamic_new = overhead_dynamic * (N_curr / N_prev) ** b_dynamic
+        noak_dynamic = mic_value + overhead_dynamic_new
+
+        noak_fixed_path.append(noak_fixed)
+        noak_dynamic_path.append(noak_dynamic)
+        occ_prev_dynamic = noak_dynamic
+        overhead_fixed = overhead_fixed_new
+        overhead_dynamic = overhead_dynamic_new
+        N_prev = N_curr
+    return noak_fixed_path, noak_dynamic_path
+
+
+# --- NOAK_mcsim_with_deployment.py ---
+def reference_noak(inputs):
+    inputs = as_lists(inputs)
+    results = {f"Deployment {year}": {
+        **{f"noak_{learning}_{mic_name}": [] for mic_name in mic_scenarios for learning in ["fixed", "dynamic"]},
+        "noak_wind_fixed": [],
+        "noak_wind_dynamic": [],
+    } for year in years}
+
+    for sim in range(len(inputs["occ_nuclear"])):
+        # --- Simulate Nuclear ---
+        for k, mic_name in enumerate(mic_scenarios):
+            fixed, dynamic = learning_loop(inputs["occ_nuclear"][sim], inputs["mic_nuclear"][k][sim],
+                                           inputs["lr_nuclear"][sim], inputs["deployment_nuclear"][sim])
+            for j, year in enumerate(years):
+                results[f"Deployment {year}"][f"noak_fixed_{mic_name}"].append(fixed[j])
+                results[f"Deployment {year}"][f"noak_dynamic_{mic_name}"].append(dynamic[j])
+
+        # --- Simulate Wind ---
+        fixed, dynamic = learning_loop(inputs["occ_wind"][sim], inputs["mic_wind"][sim], inputs["lr_wind"][sim],
+                                       inputs["deployment_wind"][sim])
+        for j, year in enumerate(years):
+            results[f"Deployment {year}"]["noak_wind_fixed"].append(fixed[j])
+            results[f"Deployment {year}"]["noak_wind_dynamic"].append(dynamic[j])
+    return results
+
+
+# --- LCOE_sim_NOAK.py ---
+def reference_lcoe(noak_results, year_inputs, params):
+    lcoe_results = {}
+    for year_label, inputs in year_inputs.items():
+        inputs = as_lists(inputs)
+        noak_year = noak_results[year_label]
+        lcoe_year = {learning: {scenario: [] for scenario in mic_scenarios + ["wind"]}
+                     for learning in ["fixed", "dynamic"]}
+        for i in range(len(inputs["cff_nuc"])):
+            # --- Nuclear Scenarios ---
+            for scenario in mic_scenarios:
+                for learning in ["fixed", "dynamic"]:
+                    occ = float(noak_year[f"noak_{learning}_{scenario}"][i])
+                    lcoe_year[learning][scenario].append(calc_lcoe(
+                        params["crf_nuc"], params["pff_nuc"], inputs["cff_nuc"][i], occ, inputs["fom_nuc"][i],
+                        params["cf_nuclear"], inputs["vom_nuc"][i], inputs["fuel_nuc"][i]))
+
+            # --- Wind Scenarios ---
+            for learning in ["fixed", "dynamic"]:
+                occ = float(noak_year[f"noak_wind_{learning}"][i])
+                lcoe_year[learning]["wind"].append(calc_lcoe(
+                    params["crf_wind"], params["pff_wind"], params["cff_wind"], occ, inputs["fom_wind"][i],
+                    inputs["cf_wind"][i]))
+        lcoe_results[year_label] = lcoe_year
+    return lcoe_results
+
+
+# --- BWRX_comparison_montecarlo.py ---
+def reference_nuclear_smr(inputs):
+    inputs = as_lists(inputs)
+    results = {f"Deployment {year}": {
+        f"{prefix}_noak_{learning}_{mic_name}": []
+        for prefix in ["nuc", "smr"] for mic_name in mic_scenarios for learning in ["fixed", "dynamic"]
+    } for year in years}
+
+    for sim in range(len(inputs["occ_nuclear"])):
+        for k, mic_name in enumerate(mic_scenarios):
+            for prefix, tech in [("nuc", "nuclear"), ("smr", "smr")]:
+                fixed, dynamic = learning_loop(inputs[f"occ_{tech}"][sim], inputs[f"mic_{tech}"][k][sim],
+                                               inputs[f"lr_{tech}"][sim], inputs[f"deployment_{tech}"][sim])
+                for j, year in enumerate(years):
+                    results[f"Deployment {year}"][f"{prefix}_noak_fixed_{mic_name}"].append(fixed[j])
+                    results[f"Deployment {year}"][f"{prefix}_noak_dynamic_{mic_name}"].append(dynamic[j])
+    return results
+
+
+def reference_nuclear_smr_lcoe(noak_results, year_inputs, params):
+    lcoe_results = {}
+    for year_label, inputs in year_inputs.items():
+        inputs = as_lists(inputs)
+        noak_year = noak_results[year_label]
+        lcoe_year = {f"{prefix}_lcoe_{learning}_{scenario}": []
+                     for prefix in ["nuc", "smr"] for scenario in mic_scenarios for learning in ["fixed", "dynamic"]}
+        for i in range(len(inputs["cff_nuc"])):
+            for scenario in mic_scenarios:
+                for prefix in ["nuc", "smr"]:
+                    cf = params["cf_nuclear"] if prefix == "nuc" else params["cf_smr"]
+                    for learning in ["fixed", "dynamic"]:
+                        occ = float(noak_year[f"{prefix}_noak_{learning}_{scenario}"][i])
+                        lcoe_year[f"{prefix}_lcoe_{learning}_{scenario}"].append(calc_lcoe(
+                            params["crf_nuc"], params["pff_nuc"], inputs[f"cff_{prefix}"][i], occ,
+                            inputs[f"fom_{prefix}"][i], cf, vom=inputs[f"vom_{prefix}"][i],
+                            fuel=inputs[f"fuel_{prefix}"][i]))
+        lcoe_results[year_label] = lcoe_year
+    return lcoe_results
+
+
+# --- benchmark_sim.py ---
+def reference_benchmark(inputs):
+    inputs = as_lists(inputs)
+    results = {str(year): {"noak_nuclear": [], "noak_smr": [], "noak_wind": []} for year in years}
+
+    for sim in range(len(inputs["occ_nuclear"])):
+        b_fixed_nuclear = compute_b(inputs["lr_nuclear"][sim])
+        b_fixed_wind = compute_b(inputs["lr_wind"][sim])
+        for j, year in enumerate(years):
+            results[str(year)]["noak_nuclear"].append(
+                inputs["occ_nuclear"][sim] * (inputs["deployment_nuclear"][sim][j] ** b_fixed_nuclear))
+            results[str(year)]["noak_smr"].append(
+                inputs["occ_smr"][sim] * (inputs["deployment_smr"][sim][j] ** b_fixed_nuclear))
+            results[str(year)]["noak_wind"].append(
+                inputs["occ_wind"][sim] * (inputs["deployment_wind"][sim][j] ** b_fixed_wind))
+    return results
+
+
+def reference_benchmark_lcoe(benchmark_results, year_inputs, params):
+    lcoe_results = {}
+    for year_label, inputs in year_inputs.items():
+        inputs = as_lists(inputs)
+        noak_year = benchmark_results[year_label.split()[-1]]
+        lcoe_year = {"lcoe_nuc": [], "lcoe_smr": [], "lcoe_wind": []}
+        for i in range(len(inputs["cff_nuc"])):
+            for prefix, series in [("nuc", "noak_nuclear"), ("smr", "noak_smr")]:
+                cf = params["cf_nuclear"] if prefix == "nuc" else params["cf_smr"]
+                lcoe_year[f"lcoe_{prefix}"].append(calc_lcoe(
+                    params["crf_nuc"], params["pff_nuc"], inputs[f"cff_{prefix}"][i], float(noak_year[series][i]),
+                    inputs[f"fom_{prefix}"][i], cf, vom=inputs[f"vom_{prefix}"][i], fuel=inputs[f"fuel_{prefix}"][i]))
+            lcoe_year["lcoe_wind"].append(calc_lcoe(
+                params["crf_wind"], params["pff_wind"], params["cff_wind"], float(noak_year["noak_wind"][i]),
+                inputs["fom_wind"][i], inputs["cf_wind"][i]))
+        lcoe_results[year_label] = lcoe_year
+    return lcoe_results
+
+
+# --- Reference input draws ---
+# The original scripts' per-sample draws, deployments by the `while True:` rejection loop, laid
+# out as the engines' samplers return them. Not the same draws as the fast samplers (those use
+# the truncated inverse CDF and QMC designs), so equivalence_check.py compares them by distribution.
+def sample_deployment_triangular(rng, cons, mod, adv):
+    if np.isclose(cons, adv):
+        return cons
+    return rng.triangular(cons, mod, adv)
+
+
+def reference_deployment_path(rng, quantiles):
+    path = []
+    prev_deployment = 1
+    for cons, mod, adv in quantiles:
+        while True:
+            sampled = sample_deployment_triangular(rng, cons, mod, adv)
+            if sampled >= prev_deployment:
+                path.append(sampled)
+                prev_deployment = sampled
+                break
+    return path
+
+
+def reference_inputs(params, size, rng, occ, mic, lr, deployment):
+    # occ, deployment: technologies; mic: {technology: scenarios, or None for a single MIC};
+    # lr: {input name: per-sample draw}
+    inputs = {f"occ_{tech}": [] for tech in occ}
+    inputs.update({f"mic_{tech}": [] for tech in mic})
+    inputs.update({name: [] for name in lr})
+    inputs.update({f"deployment_{tech}": [] for tech in deployment})
+    for sim in range(size):
+        for tech in occ:
+            occ_range = params[f"occ_range_{tech}"]
+            inputs[f"occ_{tech}"].append(rng.triangular(min(occ_range), occ_range[1], max(occ_range)))
+        for tech, scenarios in mic.items():
+            if scenarios is None:
+                inputs[f"mic_{tech}"].append(rng.normal(*params[f"mic_{tech}"]))
+            else:
+                inputs[f"mic_{tech}"].append([rng.normal(*params[f"mic_{tech}"][name]) for name in scenarios])
+        for name, draw in lr.items():
+            inputs[name].append(draw(rng))
+        for tech in deployment:
+            inputs[f"deployment_{tech}"].append(reference_deployment_path(rng, params[f"deployment_{tech}"]))
+    inputs = {key: np.array(value) for key, value in inputs.items()}
+    for tech, scenarios in mic.items():
+        if scenarios is not None:
+            inputs[f"mic_{tech}"] = inputs[f"mic_{tech}"].T
+    return inputs
+
+
+def sample_lr_nuclear(rng):
+    return rng.triangular(0.05, 0.10, 0.15)
+
+
+def sample_lr_wind(rng):
+    return rng.beta(5, 10) * 0.3
+
+
+def reference_noak_inputs(params, size, rng):
+    return reference_inputs(params, size, rng, ["nuclear", "wind"], {"nuclear": mic_scenarios, "wind": None},
+                            {"lr_nuclear": sample_lr_nuclear, "lr_wind": sample_lr_wind}, ["nuclear", "wind"])
+
+
+def reference_nuclear_smr_inputs(params, size, rng):
+    return reference_inputs(params, size, rng, ["nuclear", "smr"], {"nuclear": mic_scenarios, "smr": mic_scenarios},
+                            {"lr_nuclear": sample_lr_nuclear, "lr_smr": sample_lr_nuclear}, ["nuclear", "smr"])
+
+
+def reference_benchmark_inputs(params, size, rng):
+    return reference_inputs(params, size, rng, ["nuclear", "smr", "wind"], {},
+                            {"lr_nuclear": sample_lr_nuclear, "lr_wind": sample_lr_wind}, ["nuclear", "smr", "wind"])
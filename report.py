@@ -0,0 +1,125 @@
+import argparse
+import importlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+from kde_curves import load_kde_curves
+from mc_stats import load_quartiles
+from result_store import load_results
+from run_report import stage
+
+
+# --- Report builder ---
+# Every plot module declares the result sets it reads (result_sets: samples, quartile_sets:
+# custom quartiles, kde_sets: density curves), its rcParams (style) and figures(datasets), a list of
+# (output path, figure function name, arguments, savefig options). A figure function takes the
+# loaded datasets and returns the figure instead of saving it, so one process can render every
+# module's figures from a single load. Quartiles are computed once by the parent (and cached in
+# the stores, see mc_stats.py); pool workers memory-map the same stores and read that cache.
+plot_modules = [
+    "NOAK_mcsim_with_deployment_hist_plot",
+    "NOAK_mcsim_with_deployment_range_plot",
+    "LCOE_sim_NOAK_hist_plot",
+    "LCOE_sim_NOAK_range_plot",
+    "BWRX_comparison_mc_hist_plot",
+    "BWRX_comparison_mc_range_plot",
+    "benchmark",
+]
+worker_datasets = None
+
+
+def load_datasets(modules):
+    result_sets = sorted({name for module in modules for name in module.result_sets})
+    quartile_sets = sorted({name for module in modules for name in module.quartile_sets})
+    kde_sets = sorted({name for module in modules for name in module.kde_sets})
+    return {
+        "results": {name: load_results(name) for name in result_sets},
+        "quartiles": {name: load_quartiles(name) for name in quartile_sets},
+        "kde": {name: load_kde_curves(name) for name in kde_sets},
+    }
+
+
+def init_worker(module_names):
+    global worker_datasets
+    worker_datasets = load_datasets([importlib.import_module(name) for name in module_names])
+
+
+def build_figure(module_name, function_name, args):
+    module = importlib.import_module(module_name)
+    with plt.rc_context(module.style):
+        return getattr(module, function_name)(worker_datasets, *args)
+
+
+def render_figure(task):
+    # Pool task: builds one figure and either saves it or (multi-page) returns it to the parent
+    module_name, path, function_name, args, savefig_options, save = task
+    fig = build_figure(module_name, function_name, args)
+    if not save:
+        return fig
+    with plt.rc_context(importlib.import_module(module_name).style):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        fig.savefig(path, **savefig_options)
+    plt.close(fig)
+    return path
+
+
+def build_report(module_names=plot_modules, workers=1, multi_page_directory=None):
+    # Renders every figure of the given modules; with multi_page_directory each module's figures
+    # go to "<multi_page_directory>/<module>.pdf", one page per figure, instead of separate files
+    global worker_datasets
+    modules = [importlib.import_module(name) for name in module_names]
+    with stage("load datasets"):
+        worker_datasets = load_datasets(modules)
+    save = multi_page_directory is None
+    tasks = [(module.__name__, path, function_name, args, savefig_options, save)
+             for module in modules for path, function_name, args, savefig_options in module.figures(worker_datasets)]
+
+    # Worker CPU time is counted once the pool has shut down and its processes are reaped
+    if save:
+        written = [task[1] for task in tasks]
+    else:
+        written = [os.path.join(multi_page_directory, name + ".pdf") for name in module_names]
+    with stage("render", outputs=written) as record:
+        record["figures"] = len(tasks)
+        if workers == 1:
+            outputs = map(render_figure, tasks)
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(module_names,))
+            outputs = executor.map(render_figure, tasks)
+
+        pages = {}
+        try:
+            for task, output in zip(tasks, outputs):
+                if save:
+                    continue
+                module_name, _, _, _, savefig_options, _ = task
+                if module_name not in pages:
+                    os.makedirs(multi_page_directory, exist_ok=True)
+                    pages[module_name] = PdfPages(os.path.join(multi_page_directory, module_name + ".pdf"))
+                with plt.rc_context(importlib.import_module(module_name).style):
+                    pages[module_name].savefig(output, **{k: v for k, v in savefig_options.items() if k != "format"})
+                plt.close(output)
+        finally:
+            for pdf in pages.values():
+                pdf.close()
+            if executor is not None:
+                executor.shutdown()
+    return len(tasks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the figures of all plot scripts in one run")
+    parser.add_argument("modules", nargs="*", default=plot_modules,
+                        help=f"plot modules to render (default: all of {', '.join(plot_modules)})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--multi-page", metavar="DIRECTORY",
+                        help="write one multi-page PDF per plot module into DIRECTORY instead of separate files")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.modules if name not in plot_modules]
+    if unknown:
+        parser.error(f"unknown plot modules {unknown}")
+    count = build_report(args.modules, workers=max(1, args.workers), multi_page_directory=args.multi_page)
+    print(f"Rendered {count} figures")
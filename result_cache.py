@@ -0,0 +1,202 @@
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import numpy as np
+import deployment_sampler
+import lcoe_engine
+import noak_engine
+import parallel_runner
+from parallel_runner import default_block_size, run_lcoe_on_noak, run_metadata, run_scenario, scenarios
+from run_report import count
+from result_store import flatten_results, load_store, save_results, store_suffix, write_store
+
+
+# --- Content-addressed cache of simulation results ---
+# An entry is keyed by the SHA-256 of everything that determines the samples: the scenario's
+# built parameters (the values drawn from the ATB table, material_data and comparison_data, so an edit
+# to one input only changes the keys of the scenarios that use it), the seed, the sample count,
+# the block size and the source of the engine modules (the hard-coded sampler settings).
+# Each entry is a directory "<key>/" holding one store per result set and entry.json; its mtime
+# is the last use, and the least recently used entries are evicted beyond max_bytes.
+default_cache_directory = ".mc_cache"
+default_max_bytes = 5 * 1024 ** 3
+entry_manifest_name = "entry.json"
+engine_modules = [noak_engine, lcoe_engine, deployment_sampler, parallel_runner]
+
+
+def update_hash(h, value):
+    if isinstance(value, dict):
+        h.update(b"dict")
+        for key in sorted(value, key=str):
+            update_hash(h, str(key))
+            update_hash(h, value[key])
+    elif isinstance(value, (list, tuple)):
+        h.update(f"list{len(value)}".encode())
+        for item in value:
+            update_hash(h, item)
+    elif isinstance(value, np.ndarray):
+        h.update(f"array{value.dtype.str}{value.shape}".encode())
+        flat = value.reshape(-1)
+        for start in range(0, len(flat), 1 << 22):
+            h.update(np.ascontiguousarray(flat[start:start + (1 << 22)]).tobytes())
+    elif isinstance(value, (float, np.floating)):
+        h.update(float(value).hex().encode())
+    else:
+        h.update(repr(value).encode())
+
+
+def engine_fingerprint():
+    h = hashlib.sha256()
+    for module in engine_modules:
+        h.update(inspect.getsource(module).encode())
+    return h.hexdigest()
+
+
+def cache_key(*parts):
+    h = hashlib.sha256()
+    update_hash(h, list(parts))
+    return h.hexdigest()
+
+
+def directory_size(directory):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names)
+
+
+# --- Entries ---
+def lookup(key, cache_directory=default_cache_directory):
+    entry_directory = os.path.join(cache_directory, key)
+    manifest_path = os.path.join(entry_directory, entry_manifest_name)
+    if not os.path.isfile(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    os.utime(manifest_path)
+    return {name: load_store(os.path.join(entry_directory, name + store_suffix)) for name in manifest["results"]}
+
+
+def store_entry(key, results, description, cache_directory=default_cache_directory, max_bytes=default_max_bytes):
+    entry_directory = os.path.join(cache_directory, key)
+    tmp_directory = entry_directory + ".tmp"
+    shutil.rmtree(tmp_directory, ignore_errors=True)
+    os.makedirs(tmp_directory)
+    for name, result_set in results.items():
+        write_store(result_set, os.path.join(tmp_directory, name + store_suffix))
+    with open(os.path.join(tmp_directory, entry_manifest_name), "w") as f:
+        json.dump({**description, "results": list(results)}, f, indent=1)
+    shutil.rmtree(entry_directory, ignore_errors=True)
+    os.replace(tmp_directory, entry_directory)
+    evict(cache_directory, max_bytes, keep=key)
+
+
+def list_entries(cache_directory=default_cache_directory):
+    entries = []
+    if not os.path.isdir(cache_directory):
+        return entries
+    for key in os.listdir(cache_directory):
+        manifest_path = os.path.join(cache_directory, key, entry_manifest_name)
+        if os.path.isfile(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            entries.append({"key": key, "last_used": os.path.getmtime(manifest_path),
+                            "bytes": directory_size(os.path.join(cache_directory, key)), **manifest})
+    return sorted(entries, key=lambda entry: entry["last_used"])
+
+
+def evict(cache_directory=default_cache_directory, max_bytes=default_max_bytes, keep=None):
+    # Least recently used first; the entry just written is never evicted
+    entries = list_entries(cache_directory)
+    total = sum(entry["bytes"] for entry in entries)
+    evicted = []
+    for entry in entries:
+        if total <= max_bytes:
+            break
+        if entry["key"] == keep:
+            continue
+        shutil.rmtree(os.path.join(cache_directory, entry["key"]))
+        total -= entry["bytes"]
+        evicted.append(entry["key"])
+    return evicted
+
+
+# --- Cached simulations ---
+def scenario_key(scenario, params, seed, num_simulations, block_size):
+    if params is None:
+        params = scenarios[scenario][0]()
+    return cache_key("scenario", scenario, params, seed, num_simulations, block_size, engine_fingerprint())
+
+
+def lcoe_from_noak_key(noak_results, params, seed, block_size):
+    # The NOAK samples themselves are part of the key
+    noak_hash = hashlib.sha256()
+    for path, values in flatten_results(noak_results):
+        update_hash(noak_hash, [path, np.asarray(values, dtype=float)])
+    return cache_key("lcoe_from_noak", noak_hash.hexdigest(), params, seed, block_size, engine_fingerprint())
+
+
+def cached_run_scenario(scenario, num_simulations, seed=42, block_size=default_block_size, workers=1, params=None,
+                        cache_directory=default_cache_directory, max_bytes=default_max_bytes):
+    key = scenario_key(scenario, params, seed, num_simulations, block_size)
+    results = lookup(key, cache_directory)
+    if results is not None:
+        print(f"Cache hit for {scenario} ({num_simulations} samples, seed {seed}): {key[:12]}")
+        count("cache_hits")
+        return results
+    count("cache_misses")
+    results = run_scenario(scenario, num_simulations, seed, block_size, workers, params)
+    store_entry(key, results, {"kind": "scenario", "scenario": scenario, "num_simulations": num_simulations,
+                               "seed": seed, "block_size": block_size}, cache_directory, max_bytes)
+    return results
+
+
+def cached_lcoe_from_noak(noak_results, params, seed=42, block_size=default_block_size,
+                          cache_directory=default_cache_directory, max_bytes=default_max_bytes):
+    # LCOE_sim_NOAK.py on stored NOAK results
+    name = "lcoe_simulation_results_fixed_dynamic"
+    key = lcoe_from_noak_key(noak_results, params, seed, block_size)
+    results = lookup(key, cache_directory)
+    if results is not None:
+        print(f"Cache hit for LCOE on stored NOAK results: {key[:12]}")
+        count("cache_hits")
+        return results[name]
+    count("cache_misses")
+    lcoe_results = run_lcoe_on_noak(noak_results, params, seed, block_size)
+    store_entry(key, {name: lcoe_results}, {"kind": "lcoe_from_noak", "seed": seed, "block_size": block_size},
+                cache_directory, max_bytes)
+    return lcoe_results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Content-addressed cache of simulation results")
+    parser.add_argument("--cache-directory", default=default_cache_directory)
+    parser.add_argument("--max-bytes", type=int, default=default_max_bytes)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run a scenario through the cache and save its result sets")
+    run.add_argument("scenario", choices=sorted(scenarios))
+    run.add_argument("--num-simulations", type=int, default=10000)
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--block-size", type=int, default=default_block_size)
+    run.add_argument("--workers", type=int, default=1)
+    commands.add_parser("list", help="list cache entries, least recently used first")
+    commands.add_parser("evict", help="evict least recently used entries beyond --max-bytes")
+    commands.add_parser("clear", help="remove every cache entry")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = cached_run_scenario(args.scenario, args.num_simulations, args.seed, args.block_size, args.workers,
+                                      cache_directory=args.cache_directory, max_bytes=args.max_bytes)
+        metadata = run_metadata(args.scenario, args.num_simulations, args.seed, args.block_size)
+        for name, result_set in results.items():
+            save_results(result_set, name, metadata)
+            print(f"Saved {name}")
+    elif args.command == "list":
+        for entry in list_entries(args.cache_directory):
+            print(f"{entry['key'][:12]}  {entry['bytes'] / 1024 ** 2:8.1f} MB  {entry['kind']}  "
+                  f"{entry.get('scenario', '')} n={entry.get('num_simulations', '')} seed={entry['seed']}")
+    elif args.command == "evict":
+        print(f"Evicted {len(evict(args.cache_directory, args.max_bytes))} entries")
+    else:
+        shutil.rmtree(args.cache_directory, ignore_errors=True)
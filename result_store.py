@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import pickle
+import shutil
+import numpy as np
+
+
+# --- Columnar result store ---
+# A result set such as {"Deployment 2030": {"fixed": {"premium": [...]}}} is written as a
+# directory "<name>.store/" holding one contiguous float64 .npy per series plus a JSON
+# manifest mapping each key path to its file. Series are memory-mapped on read. The manifest may
+# also carry "run" metadata (scenario, seed, block size, sample count) so a run can be extended.
+store_suffix = ".store"
+manifest_name = "manifest.json"
+# Histogram-only runs (streaming.py, shard_runner.py) leave "<name>_aggregates.pkl" instead of samples
+aggregates_suffix = "_aggregates.pkl"
+
+
+def flatten_results(results, prefix=()):
+    for key, value in results.items():
+        path = prefix + (str(key),)
+        if isinstance(value, dict):
+            yield from flatten_results(value, path)
+        else:
+            yield path, value
+
+
+def series_filename(path):
+    return "__".join(part.replace(" ", "_").lower() for part in path) + ".npy"
+
+
+def write_store(results, directory, metadata=None):
+    # Written to a temporary directory first so readers never see a half-written store
+    tmp_directory = directory + ".tmp"
+    shutil.rmtree(tmp_directory, ignore_errors=True)
+    os.makedirs(tmp_directory)
+
+    entries = []
+    for path, values in flatten_results(results):
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        filename = series_filename(path)
+        np.save(os.path.join(tmp_directory, filename), values)
+        entries.append({"path": list(path), "file": filename, "length": len(values)})
+
+    write_manifest(tmp_directory, entries, metadata)
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp_directory, directory)
+
+
+def write_manifest(directory, entries, metadata=None):
+    manifest = {"version": 1, "dtype": "float64", "series": entries}
+    if metadata is not None:
+        manifest["run"] = metadata
+    with open(os.path.join(directory, manifest_name), "w") as f:
+        json.dump(manifest, f, indent=1)
+
+
+class StoreWriter:
+    # Incremental writer: each series is a preallocated .npy file filled chunk by chunk with
+    # positioned writes, so a run larger than RAM can still be stored. The store appears on close().
+    def __init__(self, directory, length, metadata=None):
+        self.directory = directory
+        self.metadata = metadata
+        self.tmp_directory = directory + ".tmp"
+        self.length = length
+        self.series = {}
+        shutil.rmtree(self.tmp_directory, ignore_errors=True)
+        os.makedirs(self.tmp_directory)
+
+    def write(self, path, start, values):
+        path = tuple(str(p) for p in path)
+        if path not in self.series:
+            f = open(os.path.join(self.tmp_directory, series_filename(path)), "wb")
+            np.lib.format.write_array_header_1_0(f, {"descr": "<f8", "fortran_order": False, "shape": (self.length,)})
+            self.series[path] = (f, f.tell())
+        f, offset = self.series[path]
+        f.seek(offset + 8 * start)
+        f.write(np.ascontiguousarray(values, dtype="<f8").tobytes())
+
+    def write_chunk(self, results, start):
+        for path, values in flatten_results(results):
+            self.write(path, start, values)
+
+    def close(self):
+        entries = []
+        for path, (f, offset) in self.series.items():
+            f.truncate(offset + 8 * self.length)
+            f.close()
+            entries.append({"path": list(path), "file": series_filename(path), "length": self.length})
+        self.series = {}
+        write_manifest(self.tmp_directory, entries, self.metadata)
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.replace(self.tmp_directory, self.directory)
+
+
+def read_manifest(directory):
+    with open(os.path.join(directory, manifest_name)) as f:
+        return json.load(f)
+
+
+def open_series(directory, *path, mmap=True):
+    for entry in read_manifest(directory)["series"]:
+        if tuple(entry["path"]) == path:
+            return np.load(os.path.join(directory, entry["file"]), mmap_mode="r" if mmap else None)
+    raise KeyError(f"{path} not found in {directory}")
+
+
+def load_store(directory, mmap=True):
+    # Rebuild the nested dict; with mmap=True no sample data is read until it is used
+    results = {}
+    for entry in read_manifest(directory)["series"]:
+        node = results
+        for key in entry["path"][:-1]:
+            node = node.setdefault(key, {})
+        node[entry["path"][-1]] = np.load(os.path.join(directory, entry["file"]), mmap_mode="r" if mmap else None)
+    return results
+
+
+# --- Named result sets (store first, legacy pickle as fallback) ---
+def save_results(results, name, metadata=None):
+    write_store(results, name + store_suffix, metadata)
+
+
+def read_run_metadata(name):
+    if not os.path.isdir(name + store_suffix):
+        return None
+    return read_manifest(name + store_suffix).get("run")
+
+
+def has_results(name):
+    return os.path.isdir(name + store_suffix) or os.path.isfile(name + ".pkl")
+
+
+def load_results(name, mmap=True):
+    if os.path.isdir(name + store_suffix):
+        return load_store(name + store_suffix, mmap=mmap)
+    with open(name + ".pkl", "rb") as f:
+        return pickle.load(f)
+
+
+def convert_pickle(pickle_path, directory=None):
+    if directory is None:
+        directory = os.path.splitext(pickle_path)[0] + store_suffix
+    with open(pickle_path, "rb") as f:
+        results = pickle.load(f)
+    write_store(results, directory)
+    return directory
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Columnar result store for the simulation outputs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser("convert", help="convert dict-of-lists result pickles into stores")
+    convert.add_argument("pickles", nargs="+")
+    args = parser.parse_args()
+
+    for pickle_path in args.pickles:
+        print(f"{pickle_path} -> {convert_pickle(pickle_path)}")
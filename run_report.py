@@ -0,0 +1,115 @@
+import atexit
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+
+# --- Run report ---
+# Scripts wrap their stages in stage(name); each stage records wall time, CPU time (this process
+# plus the worker processes it reaped), samples/sec, the peak RSS so far and the bytes of the
+# outputs it wrote. Library code adds to counters with count() (non-finite values dropped by
+# custom_quartiles, truncated deployment draws); pool workers send theirs back with each block
+# (see parallel_runner.iter_blocks). At exit a script that ran a stage writes
+# "run_reports/<script>.json" next to its results; main.py gathers them into run_report.json.
+report_directory = "run_reports"
+counters = {}
+stages = []
+
+
+def count(name, amount=1):
+    counters[name] = counters.get(name, 0) + amount
+
+
+def merge_counters(added):
+    for name, amount in added.items():
+        count(name, amount)
+
+
+def counters_since(before):
+    return {name: value - before.get(name, 0) for name, value in counters.items() if value != before.get(name, 0)}
+
+
+def cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime, children.ru_utime + children.ru_stime
+
+
+def peak_rss_bytes(who=resource.RUSAGE_SELF):
+    # ru_maxrss is in kB on Linux; a high-water mark over the process (or its reaped children)
+    return resource.getrusage(who).ru_maxrss * 1024
+
+
+def output_bytes(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+    return os.path.getsize(path) if os.path.isfile(path) else 0
+
+
+@contextmanager
+def stage(name, samples=None, outputs=()):
+    # The yielded record can be filled in by the caller, e.g. record["samples"] or record["outputs"]
+    # once they are known
+    record = {"stage": name, "samples": samples, "outputs": list(outputs)}
+    counters_before = dict(counters)
+    wall_start = time.perf_counter()
+    own_start, children_start = cpu_seconds()
+    try:
+        yield record
+    except BaseException:
+        # A failing stage is still recorded (and the report still written at exit): its wall time
+        # and memory are the ones most worth looking at
+        record["failed"] = True
+        raise
+    finally:
+        wall = time.perf_counter() - wall_start
+        own_end, children_end = cpu_seconds()
+        record.update({
+            "wall_seconds": wall,
+            "cpu_seconds": own_end - own_start,
+            "worker_cpu_seconds": children_end - children_start,
+            "samples_per_second": record["samples"] / wall if record["samples"] and wall > 0 else None,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "worker_peak_rss_bytes": peak_rss_bytes(resource.RUSAGE_CHILDREN),
+            "bytes_written": sum(output_bytes(path) for path in record["outputs"]),
+            "counters": counters_since(counters_before),
+        })
+        if not stages:
+            atexit.register(write_report)
+        stages.append(record)
+
+
+def script_name():
+    return os.path.splitext(os.path.basename(sys.argv[0]))[0] or "python"
+
+
+def write_report(name=None, directory=report_directory):
+    name = name or script_name()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name + ".json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"script": name, "argv": sys.argv[1:], "finished": time.time(), "stages": stages,
+                   "counters": counters}, f, indent=1)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_report(name, directory=report_directory):
+    path = os.path.join(directory, name + ".json")
+    if not os.path.isfile(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def git_revision():
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
@@ -0,0 +1,211 @@
+import argparse
+import json
+import os
+import shutil
+import numpy as np
+from parallel_runner import block_layout, default_block_size, run_metadata, scenarios
+from result_store import StoreWriter, load_store, flatten_results, store_suffix
+from streaming import (default_edge_specs, edges_from_spec, run_streaming_simulation, merge_aggregates,
+                       save_aggregates, load_aggregates)
+
+
+# --- Sharded runs over a shared directory ---
+# A run directory holds run.json (scenario, seed, block size and each shard's block and sample
+# range) and one "shard_XXXX/" directory per finished shard. Shards run independently on any
+# machine that sees the directory: a node claims a shard by creating "claims/shard_XXXX" (mkdir is
+# atomic), computes it into "shard_XXXX.tmp/" and renames it when done. Block i of the run always
+# draws from SeedSequence(seed).spawn(n_blocks)[i], so the merged result is the same as a one-shot
+# parallel_runner.run_scenario with the same seed and block size.
+#
+# output "samples": every shard writes full stores plus aggregates; merge writes "<name>.store"
+#   sets that load_results (and so every plot script) reads unchanged.
+# output "aggregates": shards write only histograms + sketches; merge writes "<name>_aggregates.pkl",
+#   from which the quartiles, the hist plots and the summary grids render without samples.
+# The histogram bins are fixed in run.json ("edges") so that all shards' histograms merge.
+run_manifest_name = "run.json"
+shard_manifest_name = "shard.json"
+merge_step = 1000000
+
+
+def shard_name(shard):
+    return f"shard_{shard:04d}"
+
+
+def plan_run(directory, scenario, num_simulations, shards, seed=42, block_size=default_block_size,
+             output="samples", edge_specs=default_edge_specs):
+    if scenario not in scenarios:
+        raise ValueError(f"Unknown scenario {scenario}")
+    if output not in ("samples", "aggregates"):
+        raise ValueError(f"Unknown output {output}")
+    layout = block_layout(num_simulations, block_size)
+    shard_blocks = [blocks for blocks in np.array_split(np.arange(len(layout)), shards) if len(blocks)]
+    manifest = {
+        "version": 1,
+        "scenario": scenario,
+        "seed": seed,
+        "block_size": block_size,
+        "num_simulations": num_simulations,
+        "n_blocks": len(layout),
+        "output": output,
+        "edges": {kind: [float(start), float(stop), int(bins)] for kind, (start, stop, bins) in edge_specs.items()},
+        "shards": [
+            {
+                "shard": shard,
+                "blocks": [int(blocks[0]), int(blocks[-1]) + 1],
+                "samples": [layout[blocks[0]][0], layout[blocks[-1]][1]],
+            }
+            for shard, blocks in enumerate(shard_blocks)
+        ],
+    }
+    os.makedirs(os.path.join(directory, "claims"), exist_ok=True)
+    with open(os.path.join(directory, run_manifest_name), "w") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+def read_run(directory):
+    with open(os.path.join(directory, run_manifest_name)) as f:
+        return json.load(f)
+
+
+def shard_complete(directory, shard):
+    return os.path.isfile(os.path.join(directory, shard_name(shard), shard_manifest_name))
+
+
+def claim_shard(directory, shard):
+    try:
+        os.mkdir(os.path.join(directory, "claims", shard_name(shard)))
+        return True
+    except FileExistsError:
+        return False
+
+
+def run_shard(directory, shard, workers=1):
+    run = read_run(directory)
+    entry = run["shards"][shard]
+    tmp_directory = os.path.join(directory, shard_name(shard) + ".tmp")
+    shutil.rmtree(tmp_directory, ignore_errors=True)
+    os.makedirs(tmp_directory)
+
+    # Runs planned before the edges were recorded used the defaults
+    edges = {kind: edges_from_spec(spec) for kind, spec in run.get("edges", default_edge_specs).items()}
+    aggregates = run_streaming_simulation(
+        run["num_simulations"], seed=run["seed"], block_size=run["block_size"], scenario=run["scenario"],
+        flush=run["output"] == "samples", workers=workers, blocks=range(*entry["blocks"]), directory=tmp_directory,
+        noak_edges=edges["noak"], lcoe_edges=edges["lcoe"])
+    for result_name, result_aggregates in aggregates.items():
+        save_aggregates(result_aggregates, os.path.join(tmp_directory, result_name))
+
+    with open(os.path.join(tmp_directory, shard_manifest_name), "w") as f:
+        json.dump({**entry, "scenario": run["scenario"], "seed": run["seed"], "block_size": run["block_size"],
+                   "results": sorted(aggregates)}, f, indent=1)
+    final_directory = os.path.join(directory, shard_name(shard))
+    shutil.rmtree(final_directory, ignore_errors=True)
+    os.replace(tmp_directory, final_directory)
+
+
+def run_pending_shards(directory, workers=1):
+    # Claims and runs shards until every shard is claimed by this or another node
+    done = []
+    for entry in read_run(directory)["shards"]:
+        shard = entry["shard"]
+        if not shard_complete(directory, shard) and claim_shard(directory, shard):
+            run_shard(directory, shard, workers)
+            done.append(shard)
+    return done
+
+
+def shard_status(directory):
+    status = {}
+    for entry in read_run(directory)["shards"]:
+        shard = entry["shard"]
+        if shard_complete(directory, shard):
+            status[shard] = "complete"
+        elif os.path.isdir(os.path.join(directory, "claims", shard_name(shard))):
+            status[shard] = "claimed"
+        else:
+            status[shard] = "pending"
+    return status
+
+
+def merge_shards(directory, output_directory="."):
+    run = read_run(directory)
+    missing = [shard for shard, state in shard_status(directory).items() if state != "complete"]
+    if missing:
+        raise RuntimeError(f"Shards not complete: {missing}")
+    shard_directories = [os.path.join(directory, shard_name(entry["shard"])) for entry in run["shards"]]
+    with open(os.path.join(shard_directories[0], shard_manifest_name)) as f:
+        result_names = json.load(f)["results"]
+
+    os.makedirs(output_directory, exist_ok=True)
+    for result_name in result_names:
+        aggregates = None
+        for shard_directory in shard_directories:
+            shard_aggregates = load_aggregates(os.path.join(shard_directory, result_name))
+            aggregates = shard_aggregates if aggregates is None else merge_aggregates(aggregates, shard_aggregates)
+        save_aggregates(aggregates, os.path.join(output_directory, result_name))
+
+        if run["output"] != "samples":
+            continue
+        # Shard stores are memory-mapped and copied in slices, so memory stays bounded
+        metadata = run_metadata(run["scenario"], run["num_simulations"], run["seed"], run["block_size"])
+        writer = StoreWriter(os.path.join(output_directory, result_name + store_suffix), run["num_simulations"],
+                             metadata)
+        for entry, shard_directory in zip(run["shards"], shard_directories):
+            store = os.path.join(shard_directory, result_name + store_suffix)
+            for path, values in flatten_results(load_store(store)):
+                for offset in range(0, len(values), merge_step):
+                    writer.write(path, entry["samples"][0] + offset, values[offset:offset + merge_step])
+        writer.close()
+    return result_names
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sharded Monte Carlo runs over a shared directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    plan = commands.add_parser("plan", help="write run.json splitting a run into shards")
+    plan.add_argument("directory")
+    plan.add_argument("scenario", choices=sorted(scenarios))
+    plan.add_argument("--num-simulations", type=int, required=True)
+    plan.add_argument("--shards", type=int, required=True)
+    plan.add_argument("--block-size", type=int, default=default_block_size)
+    plan.add_argument("--seed", type=int, default=42)
+    plan.add_argument("--output", choices=["samples", "aggregates"], default="samples")
+    plan.add_argument("--noak-edges", nargs=3, type=float, metavar=("START", "STOP", "BINS"),
+                      default=default_edge_specs["noak"], help="histogram bins of the NOAK series ($/kW)")
+    plan.add_argument("--lcoe-edges", nargs=3, type=float, metavar=("START", "STOP", "BINS"),
+                      default=default_edge_specs["lcoe"], help="histogram bins of the LCOE series ($/MWh)")
+
+    run = commands.add_parser("run", help="run the given shards, or claim pending shards until none are left")
+    run.add_argument("directory")
+    run.add_argument("--shard", type=int, action="append",
+                     help="run this shard even if claimed (e.g. after a node failed); repeatable")
+    run.add_argument("--workers", type=int, default=1)
+
+    status = commands.add_parser("status", help="show which shards are complete, claimed or pending")
+    status.add_argument("directory")
+
+    merge = commands.add_parser("merge", help="combine complete shards into result sets")
+    merge.add_argument("directory")
+    merge.add_argument("--output-directory", default=".")
+
+    args = parser.parse_args()
+    if args.command == "plan":
+        manifest = plan_run(args.directory, args.scenario, args.num_simulations, args.shards, seed=args.seed,
+                            block_size=args.block_size, output=args.output,
+                            edge_specs={"noak": args.noak_edges, "lcoe": args.lcoe_edges})
+        print(f"Planned {len(manifest['shards'])} shards of {manifest['n_blocks']} blocks in {args.directory}")
+    elif args.command == "run":
+        if args.shard:
+            for shard in args.shard:
+                run_shard(args.directory, shard, args.workers)
+            print(f"Completed shards {args.shard}")
+        else:
+            print(f"Completed shards {run_pending_shards(args.directory, args.workers)}")
+    elif args.command == "status":
+        for shard, state in shard_status(args.directory).items():
+            print(f"{shard_name(shard)}: {state}")
+    else:
+        for result_name in merge_shards(args.directory, args.output_directory):
+            print(f"Merged {result_name}")
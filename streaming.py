@@ -0,0 +1,219 @@
+import argparse
+import os
+import pickle
+from functools import partial
+import numpy as np
+from result_store import StoreWriter, aggregates_suffix, flatten_results, store_suffix
+from parallel_runner import block_layout, default_block_size, iter_blocks, run_metadata
+from quantile_sketch import KLLSketch
+
+
+# --- Running aggregates ---
+# Fixed bin edges per result kind; samples outside the range land in the under/overflow counts.
+# Quantiles come from the histogram, so their resolution is one bin width inside the range;
+# ranks that fall in the under/overflow come from a KLL sketch (see quantile_sketch.py).
+# Edges are given as (start, stop, bins) and are the same for every year, so the histograms also
+# cover the summary grids' fixed axes (0-9000 $/kW, 0-150 $/MWh); aggregates only merge with
+# aggregates of identical edges.
+default_edge_specs = {
+    "noak": (0, 20000, 4000),  # 5 $/kW bins
+    "lcoe": (0, 400, 4000),  # 0.1 $/MWh bins
+}
+
+
+def edges_from_spec(spec):
+    start, stop, bins = spec
+    return np.linspace(start, stop, int(bins) + 1)
+
+
+default_edges = {kind: edges_from_spec(spec) for kind, spec in default_edge_specs.items()}
+
+
+class SeriesAggregate:
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self.count = 0
+        self.nonfinite = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sum = 0.0
+        self.sum_sq = 0.0
+        self.sketch = KLLSketch()
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        finite = np.isfinite(values)
+        self.nonfinite += int(values.size - finite.sum())
+        values = values[finite]
+        if values.size == 0:
+            return
+        self.count += values.size
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.sum += values.sum()
+        self.sum_sq += np.dot(values, values)
+        self.underflow += int((values < self.edges[0]).sum())
+        self.overflow += int((values > self.edges[-1]).sum())
+        self.counts += np.histogram(values, bins=self.edges)[0]
+        self.sketch.update(values)
+
+    def merge(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge aggregates with different bin edges")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        self.count += other.count
+        self.nonfinite += other.nonfinite
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sum += other.sum
+        self.sum_sq += other.sum_sq
+        self.sketch.merge(other.sketch)
+        return self
+
+    def mean(self):
+        return self.sum / self.count
+
+    def std(self):
+        return np.sqrt(max(self.sum_sq / self.count - self.mean() ** 2, 0.0))
+
+    def quantile(self, q):
+        # Linear interpolation inside the bin holding rank q * count
+        target = q * self.count
+        if 0 < q < 1 and (target <= self.underflow or target > self.count - self.overflow):
+            return self.sketch.quantile(q)
+        positions = np.clip(np.concatenate([[self.min], self.edges, [self.max]]), self.min, self.max)
+        cumulative = np.concatenate([[0], np.cumsum(np.concatenate([[self.underflow], self.counts, [self.overflow]]))])
+        upper = np.searchsorted(cumulative, target, side="left")
+        if upper == 0:
+            return float(self.min)
+        lower = upper - 1
+        fraction = (target - cumulative[lower]) / (cumulative[upper] - cumulative[lower])
+        return float(positions[lower] + fraction * (positions[upper] - positions[lower]))
+
+    def custom_quartiles(self):
+        if self.count == 0:
+            return None, None, None
+        q1 = (self.min + self.quantile(0.25)) / 2
+        q2 = self.quantile(0.50)
+        q3 = (self.quantile(0.75) + self.max) / 2
+        return q1, q2, q3
+
+
+def aggregates_like(results, edges):
+    return {key: aggregates_like(value, edges) if isinstance(value, dict) else SeriesAggregate(edges)
+            for key, value in results.items()}
+
+
+def update_aggregates(aggregates, results):
+    for key, value in results.items():
+        if isinstance(value, dict):
+            update_aggregates(aggregates[key], value)
+        else:
+            aggregates[key].update(value)
+
+
+def merge_aggregates(target, other):
+    for key, value in other.items():
+        if isinstance(value, dict):
+            merge_aggregates(target[key], value)
+        else:
+            target[key].merge(value)
+    return target
+
+
+def save_aggregates(aggregates, name):
+    with open(name + aggregates_suffix, "wb") as f:
+        pickle.dump(aggregates, f)
+
+
+def load_aggregates(name):
+    with open(name + aggregates_suffix, "rb") as f:
+        return pickle.load(f)
+
+
+# --- Streaming NOAK (+ LCOE) run ---
+def result_edges(result_name, noak_edges=default_edges["noak"], lcoe_edges=default_edges["lcoe"]):
+    return lcoe_edges if "lcoe" in result_name else noak_edges
+
+
+def block_aggregates(block, noak_edges=default_edges["noak"], lcoe_edges=default_edges["lcoe"]):
+    aggregates = {}
+    for result_name, chunk in block.items():
+        aggregates[result_name] = aggregates_like(chunk, result_edges(result_name, noak_edges, lcoe_edges))
+        update_aggregates(aggregates[result_name], chunk)
+    return aggregates
+
+
+def run_streaming_simulation(num_simulations, seed=42, block_size=default_block_size, lcoe=True, flush=False,
+                             workers=1, scenario=None, blocks=None, directory=".",
+                             noak_edges=default_edges["noak"], lcoe_edges=default_edges["lcoe"]):
+    # Only a few blocks of samples are in memory at a time. Without flush the workers reduce their
+    # blocks to aggregates (histogram + sketch) and only those are sent back and merged; with
+    # flush=True the raw blocks come back and are also written into "<result name>.store" stores
+    # under directory. The blocks are the same as in parallel_runner.run_scenario, so the samples
+    # are too; blocks (a range of block indices) restricts the run to part of them, as for a shard.
+    # Returns {result set name: aggregates}.
+    if scenario is None:
+        scenario = "noak_lcoe" if lcoe else "noak"
+    reduce_block = partial(block_aggregates, noak_edges=noak_edges, lcoe_edges=lcoe_edges)
+    layout = block_layout(num_simulations, block_size)
+    if blocks is None:
+        blocks = range(len(layout))
+    offset = layout[blocks[0]][0]
+    length = layout[blocks[-1]][1] - offset
+    # Only a complete run can later be extended; a shard's stores are tagged by shard_runner's merge
+    metadata = run_metadata(scenario, num_simulations, seed, block_size) if length == num_simulations else None
+
+    writers = {}
+    aggregates = None
+    for start, stop, block in iter_blocks(scenario, num_simulations, seed, block_size, workers,
+                                          reducer=None if flush else reduce_block, blocks=blocks):
+        if flush:
+            for result_name, chunk in block.items():
+                if result_name not in writers:
+                    writers[result_name] = StoreWriter(os.path.join(directory, result_name + store_suffix), length,
+                                                          metadata)
+                writers[result_name].write_chunk(chunk, start - offset)
+            block = reduce_block(block)
+        aggregates = block if aggregates is None else merge_aggregates(aggregates, block)
+
+    for writer in writers.values():
+        writer.close()
+    return aggregates
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Block-streamed NOAK/LCOE Monte Carlo with bounded memory")
+    parser.add_argument("--num-simulations", type=int, default=10000)
+    parser.add_argument("--block-size", type=int, default=default_block_size)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-lcoe", action="store_true", help="run the NOAK stage only")
+    parser.add_argument("--flush", action="store_true", help="also write every block to the on-disk stores")
+    parser.add_argument("--noak-edges", nargs=3, type=float, metavar=("START", "STOP", "BINS"),
+                        default=default_edge_specs["noak"], help="histogram bins of the NOAK series ($/kW)")
+    parser.add_argument("--lcoe-edges", nargs=3, type=float, metavar=("START", "STOP", "BINS"),
+                        default=default_edge_specs["lcoe"], help="histogram bins of the LCOE series ($/MWh)")
+    args = parser.parse_args()
+
+    # Run through the imported module so the saved aggregates pickle as streaming.SeriesAggregate
+    # (not __main__.SeriesAggregate) and load in the plot scripts and shard_runner
+    from streaming import run_streaming_simulation, save_aggregates
+
+    aggregates = run_streaming_simulation(args.num_simulations, seed=args.seed, block_size=args.block_size,
+                                          lcoe=not args.no_lcoe, flush=args.flush, workers=args.workers,
+                                          noak_edges=edges_from_spec(args.noak_edges),
+                                          lcoe_edges=edges_from_spec(args.lcoe_edges))
+    for result_name, result_aggregates in aggregates.items():
+        save_aggregates(result_aggregates, result_name)
+
+    for result_name, result_aggregates in aggregates.items():
+        print(f"\n{result_name} (Q1 / Q2 / Q3):")
+        for path, aggregate in flatten_results(result_aggregates):
+            q1, q2, q3 = aggregate.custom_quartiles()
+            print(f"  {' / '.join(path)}: {q1:.1f} / {q2:.1f} / {q3:.1f}")
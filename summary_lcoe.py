@@ -1,13 +1,12 @@
 import pickle
-import pandas as pd
+from mc_stats import load_quartiles
+from run_report import stage
 import numpy as np
 
-with open("lcoe_simulation_results_fixed_dynamic.pkl", "rb") as f:
-    lcoe_results = pickle.load(f)
-with open("benchmark_lcoe_simulation_results.pkl", "rb") as f:
-    benchmark_data_lcoe = pickle.load(f)
-with open("lcoe_simulation_results_nuclear_smr.pkl", "rb") as f:
-    lcoe_results_smr = pickle.load(f)
+with stage("quartiles"):
+    lcoe_quartiles = load_quartiles("lcoe_simulation_results_fixed_dynamic")
+    benchmark_quartiles_lcoe = load_quartiles("benchmark_lcoe_simulation_results")
+    lcoe_quartiles_smr = load_quartiles("lcoe_simulation_results_nuclear_smr")
 with open("deterministic_lcoe.pkl", "rb") as f:
     deterministic_lcoe = pickle.load(f)
 
@@ -27,23 +26,6 @@ for tech_key, tech_name in tech_labels.items():
         year_values = ", ".join([f"{year}: {val:.1f}" for year, val in zip(years, values)])
         print(f"  {q.upper()}: {year_values}")
 
-# Define custom quartiles function
-def custom_quartiles(data):
-    data = np.array(data)
-    data = data[np.isfinite(data)]
-    if len(data) == 0:
-        return None, None, None
-    min_val = np.min(data)
-    p25 = np.percentile(data, 25)
-    median = np.percentile(data, 50)
-    p75 = np.percentile(data, 75)
-    max_val = np.max(data)
-    q1 = (min_val + p25) / 2
-    q2 = median
-    q3 = (p75 + max_val) / 2
-    return q1, q2, q3
-
-
 #Printing Benchmark
 simulated_benchmark_lcoe_nuclear = {q: [] for q in ["q1", "q2", "q3"]}
 simulated_benchmark_lcoe_smr = {q: [] for q in ["q1", "q2", "q3"]}
@@ -51,13 +33,9 @@ simulated_benchmark_lcoe_wind = {q: [] for q in ["q1", "q2", "q3"]}
 years = [f"Deployment {y}" for y in ["2030", "2035", "2040", "2045", "2050"]]
 
 for year_key in years:
-    sim_nuc = np.array(benchmark_data_lcoe[year_key]["lcoe_nuc"])
-    sim_smr =np.array(benchmark_data_lcoe[year_key]["lcoe_smr"])
-    sim_wind = np.array(benchmark_data_lcoe[year_key]["lcoe_wind"])
-
-    q1_nuc, q2_nuc, q3_nuc = custom_quartiles(sim_nuc)
-    q1_smr,q2_smr,q3_smr = custom_quartiles(sim_smr)
-    q1_wind, q2_wind, q3_wind = custom_quartiles(sim_wind)
+    q1_nuc, q2_nuc, q3_nuc = benchmark_quartiles_lcoe[year_key]["lcoe_nuc"]
+    q1_smr,q2_smr,q3_smr = benchmark_quartiles_lcoe[year_key]["lcoe_smr"]
+    q1_wind, q2_wind, q3_wind = benchmark_quartiles_lcoe[year_key]["lcoe_wind"]
 
     simulated_benchmark_lcoe_nuclear["q1"].append(q1_nuc)
     simulated_benchmark_lcoe_nuclear["q2"].append(q2_nuc)
@@ -91,9 +69,8 @@ lcoe_keys = [f"lcoe_{m}_{s}" for m in methods for s in techs if not (s in scenar
 simulated_lcoe_fd = {key: {"q1": [], "q2": [], "q3": []} for key in lcoe_keys}
 for year in years:
     for method in methods:
-        for scenario in lcoe_results[year][method]:
-            values = np.array(lcoe_results[year][method][scenario])
-            q1, q2, q3 = custom_quartiles(values)
+        for scenario in lcoe_quartiles[year][method]:
+            q1, q2, q3 = lcoe_quartiles[year][method][scenario]
             key = f"lcoe_{method}_{scenario}"
             if key not in simulated_lcoe_fd:
                 continue  # Skip if wind_dynamic doesn't exist
@@ -123,8 +100,7 @@ sim_lcoe_smr = {key: {"q1": [], "q2": [], "q3": []} for key in keys_of_interest_
 
 for year in years:
     for key in keys_of_interest_smr:
-        values = np.array(lcoe_results_smr[year][key])
-        q1, q2, q3 = custom_quartiles(values)
+        q1, q2, q3 = lcoe_quartiles_smr[year][key]
         sim_lcoe_smr[key]["q1"].append(q1)
         sim_lcoe_smr[key]["q2"].append(q2)
         sim_lcoe_smr[key]["q3"].append(q3)
@@ -1,15 +1,15 @@
 import pickle
-import pandas as pd
+from mc_stats import load_quartiles
+from run_report import stage
 import numpy as np
 
 
 
-with open("noak_simulation_results_fixed_dynamic.pkl", "rb") as f:
-    noak_results = pickle.load(f)
-with open("benchmark_simulation_results.pkl", "rb") as f:
-    benchmark_data_noak = pickle.load(f)
-with open("noak_simulation_results_nuclear_smr.pkl", "rb") as f:
-    noak_results_smr = pickle.load(f)
+# Q1/Q2/Q3 of every series, computed in one batched pass and cached with the stores (mc_stats.py)
+with stage("quartiles"):
+    noak_quartiles = load_quartiles("noak_simulation_results_fixed_dynamic")
+    benchmark_quartiles_noak = load_quartiles("benchmark_simulation_results")
+    noak_quartiles_smr = load_quartiles("noak_simulation_results_nuclear_smr")
 with open("deterministic_noak.pkl", "rb") as f:
     deterministic_noak = pickle.load(f)
 
@@ -30,22 +30,6 @@ for tech_key, tech_name in tech_labels.items():
         print(f"  {q.upper()}: {year_values}")
 
 
-# Define custom quartiles function
-def custom_quartiles(data):
-    data = np.array(data)
-    data = data[np.isfinite(data)]
-    if len(data) == 0:
-        return None, None, None
-    min_val = np.min(data)
-    p25 = np.percentile(data, 25)
-    median = np.percentile(data, 50)
-    p75 = np.percentile(data, 75)
-    max_val = np.max(data)
-    q1 = (min_val + p25) / 2
-    q2 = median
-    q3 = (p75 + max_val) / 2
-    return q1, q2, q3
-
 # Setup
 simulated_benchmark_noak_nuclear = {q: [] for q in ["q1", "q2", "q3"]}
 simulated_benchmark_noak_smr = {q: [] for q in ["q1", "q2", "q3"]}
@@ -53,13 +37,9 @@ simulated_benchmark_noak_wind = {q: [] for q in ["q1", "q2", "q3"]}
 sim_years = [y.split()[-1] for y in years] 
 
 for year_label, year_key in zip(years, sim_years):
-    sim_nuc = np.array(benchmark_data_noak[year_key]["noak_nuclear"])
-    sim_smr =np.array(benchmark_data_noak[year_key]["noak_smr"])
-    sim_wind = np.array(benchmark_data_noak[year_key]["noak_wind"])
-
-    q1_nuc, q2_nuc, q3_nuc = custom_quartiles(sim_nuc)
-    q1_smr,q2_smr,q3_smr = custom_quartiles(sim_smr)
-    q1_wind, q2_wind, q3_wind = custom_quartiles(sim_wind)
+    q1_nuc, q2_nuc, q3_nuc = benchmark_quartiles_noak[year_key]["noak_nuclear"]
+    q1_smr,q2_smr,q3_smr = benchmark_quartiles_noak[year_key]["noak_smr"]
+    q1_wind, q2_wind, q3_wind = benchmark_quartiles_noak[year_key]["noak_wind"]
 
     simulated_benchmark_noak_nuclear["q1"].append(q1_nuc)
     simulated_benchmark_noak_nuclear["q2"].append(q2_nuc)
@@ -93,8 +73,7 @@ years = ["Deployment 2030", "Deployment 2035", "Deployment 2040", "Deployment 20
 simulated_noak_fd = {key: {"q1": [], "q2": [], "q3": []} for key in keys_of_interest}
 for year in years:
     for key in keys_of_interest:
-        values = np.array(noak_results[year][key])
-        q1, q2, q3 = custom_quartiles(values)
+        q1, q2, q3 = noak_quartiles[year][key]
         simulated_noak_fd[key]["q1"].append(q1)
         simulated_noak_fd[key]["q2"].append(q2)
         simulated_noak_fd[key]["q3"].append(q3)
@@ -114,8 +93,7 @@ keys_of_interest_smr=["nuc_noak_fixed_premium","nuc_noak_dynamic_premium", "nuc_
 sim_noak_smr = {key: {"q1": [], "q2": [], "q3": []} for key in keys_of_interest_smr}
 for year in years:
     for key in keys_of_interest_smr:
-        values = np.array(noak_results_smr[year][key])
-        q1, q2, q3 = custom_quartiles(values)
+        q1, q2, q3 = noak_quartiles_smr[year][key]
         sim_noak_smr[key]["q1"].append(q1)
         sim_noak_smr[key]["q2"].append(q2)
         sim_noak_smr[key]["q3"].append(q3)